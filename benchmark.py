@@ -0,0 +1,328 @@
+'''
+Benchmark of the search procedures of planpath on generated maps. The maps are made by seeded generators, so the same
+arguments always give the same maps, and the results are written as JSON to be compared between versions
+'''
+import argparse as ap
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import planpath
+
+MIN_SIZE = 10               # the smallest map size of the benchmark
+MAX_SIZE = 8192             # the largest map size of the benchmark
+SIZES = (10, 64, 256, 1024) # the map sizes used when none are given
+ROOM_SIZE = 16              # the height and width of the rooms of the rooms generator, including one wall
+DENSITY = 0.25              # the share of ridges on the maps of the random generator
+
+def random_map(size, seed):
+    '''
+    generate a map with ridges placed at random on DENSITY of the cells, apart from the corners of the map
+    @param size: the height and width of the map
+    @param seed: the seed of the random generator
+    @return: the rows of the map as bytearrays
+    '''
+    generator = random.Random(seed)
+    # map every random byte to a ridge or a free cell, so that no work is done for each cell in python
+    table = bytes(ord('X') if value < DENSITY * 256 else ord('R') for value in range(256))
+    rows = [bytearray(generator.randbytes(size).translate(table)) for x in range(size)]
+    # keep the corners of the start and the goal free, so that they are not walled in
+    for x in range(3):
+        rows[x][:3] = b'RRR'
+        rows[size - 1 - x][size - 3:] = b'RRR'
+    return rows
+
+def maze_map(size, seed):
+    '''
+    generate a maze with corridors of one cell, dug by a randomised depth first search. The corridors join the cells
+    on odd rows and columns, so every free cell can be reached from every other by exactly one path
+    @param size: the height and width of the map
+    @param seed: the seed of the random generator
+    @return: the rows of the map as bytearrays
+    '''
+    generator = random.Random(seed)
+    rows = [bytearray(b'X' * size) for x in range(size)]
+    cells = (size - 1) // 2                     # the number of maze cells on each side
+    if cells == 0:
+        return rows
+    visited = bytearray(cells * cells)
+    visited[0] = 1
+    rows[1][1] = ord('R')
+    stack = [0]
+    while len(stack) > 0:
+        x, y = divmod(stack[-1], cells)
+        moves = [(i, j) for i, j in ((0, 1), (1, 0), (0, -1), (-1, 0))
+                 if 0 <= x + i < cells and 0 <= y + j < cells and not visited[(x + i) * cells + y + j]]
+        if len(moves) == 0:
+            stack.pop()
+            continue
+        # dig the wall between the two cells and go on from the new cell
+        i, j = generator.choice(moves)
+        visited[(x + i) * cells + y + j] = 1
+        rows[2 * x + 1 + i][2 * y + 1 + j] = ord('R')
+        rows[2 * (x + i) + 1][2 * (y + j) + 1] = ord('R')
+        stack.append((x + i) * cells + y + j)
+    return rows
+
+def rooms_map(size, seed):
+    '''
+    generate a map of square rooms of ROOM_SIZE cells separated by walls, with a door of two cells at a random place
+    in each wall between two rooms
+    @param size: the height and width of the map
+    @param seed: the seed of the random generator
+    @return: the rows of the map as bytearrays
+    '''
+    generator = random.Random(seed)
+    rows = [bytearray(b'R' * size) for x in range(size)]
+    walls = range(ROOM_SIZE, size, ROOM_SIZE)
+    for x in range(size):
+        if x in walls:
+            rows[x][:] = b'X' * size
+        else:
+            for y in walls:
+                rows[x][y] = ord('X')
+
+    # every wall is split by the crossing walls into one piece for each room it separates
+    for wall in walls:
+        for first in range(0, size, ROOM_SIZE):
+            last = min(first + ROOM_SIZE, size) - 1
+            if last - first < 2:
+                continue
+            door = generator.randrange(first + 1, last)
+            for cell in (door, door + 1):
+                rows[wall][cell] = ord('R')
+            door = generator.randrange(first + 1, last)
+            for cell in (door, door + 1):
+                rows[cell][wall] = ord('R')
+    return rows
+
+def open_map(size, seed):
+    '''
+    generate a map without ridges
+    @param size: the height and width of the map
+    @param seed: the seed of the random generator, not used
+    @return: the rows of the map as bytearrays
+    '''
+    return [bytearray(b'R' * size) for x in range(size)]
+
+GENERATORS = {                  # the map generators by name
+    'random': random_map,
+    'maze': maze_map,
+    'rooms': rooms_map,
+    'open': open_map
+}
+
+def generate_map(generator_name, size, seed):
+    '''
+    generate a map and place the start on the first free cell from the top left corner and the goal on the last free
+    cell from the bottom right corner
+    @param generator_name: the name of the generator in GENERATORS
+    @param size: the height and width of the map
+    @param seed: the seed of the random generator
+    @return: the map with the size on the first row, as read by planpath.read_from_file
+    '''
+    rows = GENERATORS[generator_name](size, seed)
+    for x in range(size):
+        y = rows[x].find(b'R')
+        if y >= 0:
+            rows[x][y] = ord('S')
+            break
+    for x in range(size - 1, -1, -1):
+        y = rows[x].rfind(b'R')
+        if y >= 0:
+            rows[x][y] = ord('G')
+            break
+    return [str(size)] + [row.decode('ascii') for row in rows]
+
+def load_map(map, loader, directory):
+    '''
+    convert a generated map to the form read by one of the loaders of planpath
+    @param map: the map with the size on the first row
+    @param loader: list for the rows as read by read_from_file, grid for a NumPy grid or mmap for a memory mapped
+    binary grid file
+    @param directory: the directory of the binary grid files
+    @return: the map to be given to planpath.load_graph
+    '''
+    if loader == 'grid':
+        size = int(map[0])
+        grid = planpath.numpy.frombuffer(''.join(map[1:]).encode('ascii'), dtype=planpath.numpy.uint8)
+        return grid.reshape(size, size)
+    if loader == 'mmap':
+        file_name = os.path.join(directory, 'map.grid')
+        planpath.write_grid_file(map, file_name)
+        return planpath.map_file(file_name)
+    return map
+
+def run_search(map, procedure_name):
+    '''
+    load a map into a new search graph and search it without any output
+    @param map: the map to be given to planpath.load_graph
+    @param procedure_name: name of the algorithm as given to planpath
+    @return: the search graph and the time taken to load and to search the map in seconds
+    '''
+    start = time.perf_counter()
+    search_graph = planpath.load_graph(map)
+    load_seconds = time.perf_counter() - start
+    planpath.set_procedure(search_graph, procedure_name)
+    search_graph.options['display_output'] = False
+    start = time.perf_counter()
+    search_graph.search()
+    return search_graph, load_seconds, time.perf_counter() - start
+
+def run_case(map, procedure_name, repeat=3, memory=True):
+    '''
+    measure one procedure on one map. The times are the lowest of the repeated runs, and the peak memory is measured
+    with tracemalloc in one more run so that the tracing does not slow down the timed runs
+    @param map: the map to be given to planpath.load_graph
+    @param procedure_name: name of the algorithm as given to planpath
+    @param repeat: the number of timed runs
+    @param memory: flag to measure the peak memory
+    @return: the measurements as a dictionary
+    '''
+    load_seconds = None
+    search_seconds = None
+    for run in range(repeat):
+        search_graph, load_time, search_time = run_search(map, procedure_name)
+        if load_seconds is None or load_time < load_seconds:
+            load_seconds = load_time
+        if search_seconds is None or search_time < search_seconds:
+            search_seconds = search_time
+
+    peak_memory = None
+    if memory:
+        tracemalloc.start()
+        try:
+            run_search(map, procedure_name)
+            peak_memory = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    # the expansion count is the order of the next expansion, it starts at 1
+    expanded = search_graph.expansion_count - 1
+    solution = search_graph.solution
+    return {
+        'found': solution is not None,
+        'cost': search_graph.NODES.cost[solution] if solution is not None else None,
+        'load_seconds': load_seconds,
+        'search_seconds': search_seconds,
+        'nodes_generated': search_graph.node_count,
+        'nodes_expanded': expanded,
+        'expansions_per_second': expanded / search_seconds if search_seconds > 0 else None,
+        'peak_memory_bytes': peak_memory
+    }
+
+def run_benchmark(generator_names, sizes, procedure_names, seeds=(0,), loader='list', repeat=3, memory=True,
+                  progress=None):
+    '''
+    driver method used to measure every procedure on the map of every generator, size and seed
+    @param generator_names: the names of the generators in GENERATORS
+    @param sizes: the map sizes
+    @param procedure_names: the names of the algorithms as given to planpath
+    @param seeds: the seeds of the generators
+    @param loader: how the maps are given to planpath: list, grid or mmap
+    @param repeat: the number of timed runs of each case
+    @param memory: flag to measure the peak memory
+    @param progress: a function called with a line of text after each case, None for no progress
+    @return: the environment and the results as a dictionary that can be written as JSON
+    '''
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        for generator_name in generator_names:
+            for size in sizes:
+                for seed in seeds:
+                    start = time.perf_counter()
+                    map = generate_map(generator_name, size, seed)
+                    generate_seconds = time.perf_counter() - start
+                    loaded = load_map(map, loader, directory)
+                    # the lowest cost of the map, to report how far the cost of each procedure is above it
+                    optimal_cost = None
+                    if 'A' not in procedure_names:
+                        search_graph = run_search(loaded, 'A')[0]
+                        if search_graph.solution is not None:
+                            optimal_cost = search_graph.NODES.cost[search_graph.solution]
+                    map_results = []
+                    for procedure_name in procedure_names:
+                        result = {
+                            'generator': generator_name,
+                            'size': size,
+                            'seed': seed,
+                            'procedure': procedure_name,
+                            'loader': loader,
+                            'generate_seconds': generate_seconds
+                        }
+                        result.update(run_case(loaded, procedure_name, repeat, memory))
+                        if procedure_name == 'A':
+                            optimal_cost = result['cost']
+                        map_results.append(result)
+                    for result in map_results:
+                        result['optimal_cost'] = optimal_cost
+                        result['suboptimality'] = None
+                        if result['cost'] is not None and optimal_cost:
+                            result['suboptimality'] = result['cost'] / optimal_cost - 1
+                        results.append(result)
+                        if progress is not None:
+                            over = ''
+                            if result['suboptimality'] is not None:
+                                over = ', cost %.1f%% over the lowest' % (100 * result['suboptimality'])
+                            progress('%s %d seed %d %s: %.6f s, %d expanded%s' % (generator_name, size, seed,
+                                     result['procedure'], result['search_seconds'], result['nodes_expanded'], over))
+                    if isinstance(loaded, planpath.MappedMap):
+                        loaded.close()
+    return {
+        'environment': {
+            'python': platform.python_version(),
+            'implementation': platform.python_implementation(),
+            'platform': platform.platform(),
+            'numpy': planpath.numpy.__version__ if planpath.numpy is not None else None
+        },
+        'results': results
+    }
+
+def main():
+    parser = ap.ArgumentParser(description="measure the search procedures of planpath on generated maps and write "
+                                           "the results as JSON")
+    parser.add_argument("--generators", help="the map generators to use", nargs='+', choices=sorted(GENERATORS),
+                        default=sorted(GENERATORS))
+    parser.add_argument("--sizes", help="the map sizes, from %d to %d" % (MIN_SIZE, MAX_SIZE), nargs='+', type=int,
+                        default=list(SIZES))
+    parser.add_argument("--procedures", help="the procedures to measure, or all", nargs='+', default=["D", "A"])
+    parser.add_argument("--seeds", help="the seeds of the generators", nargs='+', type=int, default=[0])
+    parser.add_argument("--loader", help="read the maps as rows (list), as a NumPy grid (grid) or as a memory mapped "
+                                         "file (mmap)", choices=['list', 'grid', 'mmap'], default='list')
+    parser.add_argument("--repeat", help="the number of timed runs of each case", type=int, default=3)
+    parser.add_argument("--no-memory", help="do not measure the peak memory", action="store_true")
+    parser.add_argument("--output", help="write the JSON results to this file instead of the standard output",
+                        type=str)
+    arguments = parser.parse_args()
+
+    procedure_names = arguments.procedures
+    if procedure_names == ['all']:
+        procedure_names = list(planpath.PROCEDURES)
+    for procedure_name in procedure_names:
+        if procedure_name not in planpath.PROCEDURES:
+            parser.error("invalid procedure name " + procedure_name)
+    for size in arguments.sizes:
+        if not MIN_SIZE <= size <= MAX_SIZE:
+            parser.error("the map size should be from %d to %d" % (MIN_SIZE, MAX_SIZE))
+    if arguments.loader == 'grid' and planpath.numpy is None:
+        parser.error("the grid loader needs NumPy")
+    if arguments.repeat < 1:
+        parser.error("the number of runs should be at least 1")
+
+    report = run_benchmark(arguments.generators, arguments.sizes, procedure_names, arguments.seeds,
+                           arguments.loader, arguments.repeat, not arguments.no_memory,
+                           lambda line: print(line, file=sys.stderr))
+    if arguments.output is not None:
+        with open(arguments.output, 'w') as file_handle:
+            json.dump(report, file_handle, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,27 @@
 import argparse as ap
+import contextlib
+import io
 import re
+import sys
 import platform
 import time
+import mmap
+import struct
+import zlib
+import heapq
+import hashlib
+import json
+import os
+import cProfile
+import threading
+from collections import OrderedDict
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+try:
+    import numpy
+except ImportError:
+    numpy = None
 ######## RUNNING THE CODE ####################################################
 #   You can run this code from terminal by executing the following command
 #   python planpath.py <INPUT/input#.txt> <OUTPUT/output#.txt> <flag> <algorithm>
@@ -10,121 +30,1758 @@ import time
 ###############################################################################
 
 
+########################################################################################################################
+########################################################################################################################
+
+class TileIndex(dict):
+    '''
+    The TileIndex Class maps the tile numbers of a TileArray to the tiles that were written. A tile that is not in the
+    index is read as the blank tile, without adding it, so the index only grows with the tiles written
+    '''
+    __slots__ = ('blank',)
+
+    def __init__(self, blank):
+        '''
+        Method used to instantiate an empty index
+        @param blank: the tile of the cells that were not written
+        '''
+        super().__init__()
+        self.blank = blank
+
+    def __missing__(self, tile_number):
+        return self.blank
+
+class TileArray:
+    '''
+    The TileArray Class is an array with a value for each cell of the map (x * size + y) that only allocates the tiles
+    of TILE_CELLS cells that are written to. A tile is a run of cells on a row, so the tile of a cell is found with a
+    shift of the cell, which is several times faster than square tiles. The cells of the other tiles read as the
+    default value from a shared blank tile, so the memory grows with the part of the map the search reaches rather
+    than with the map, and creating the array does not depend on the size of the map
+    '''
+    __slots__ = ('typecode', 'blank', 'tiles')
+
+    def __init__(self, typecode, default=0):
+        '''
+        Method used to instantiate an array with every cell at the default value and no tile allocated
+        @param typecode: the type code of the values as for array
+        @param default: the value of the cells that were not written
+        '''
+        self.typecode = typecode                                # the type code of the values
+        self.blank = array(typecode, [default]) * TILE_CELLS    # the tile of the cells that were not written
+        self.tiles = TileIndex(self.blank)                      # the tiles written, by tile number
+
+    def __getitem__(self, cell):
+        '''
+        get the value of a cell
+        @param cell: the cell on the map
+        @return: the value
+        '''
+        return self.tiles[cell >> TILE_SHIFT][cell & TILE_MASK]
+
+    def __setitem__(self, cell, value):
+        '''
+        set the value of a cell, allocating its tile first if it was not written before
+        @param cell: the cell on the map
+        @param value: the value
+        @return: none
+        '''
+        tile = self.tiles[cell >> TILE_SHIFT]
+        if tile is self.blank:
+            tile = self.tiles[cell >> TILE_SHIFT] = array(self.typecode, self.blank)
+        tile[cell & TILE_MASK] = value
+
+    def clear(self):
+        '''
+        set every cell back to the default value and release the tiles
+        @return: none
+        '''
+        self.tiles.clear()
+
+    def get_tile_count(self):
+        '''
+        get the number of tiles allocated
+        @return: the number of tiles written to
+        '''
+        return len(self.tiles)
+
+########################################################################################################################
+########################################################################################################################
+
+class NodeStore:
+    '''
+    The NodeStore Class keeps the data of every node in the graph in parallel arrays indexed by the cell of the node
+    (x * size + y), instead of one object per node. A cell holds at most one node, and a node takes 25 bytes. A dense
+    store allocates the arrays for every cell of the map, which is the fastest for maps that fit in memory. A tiled
+    store keeps each array as a TileArray, so only the tiles of the map where nodes are generated take memory, and the
+    memory grows with the nodes generated rather than with the map
+    '''
+    OPERATORS = ['S', 'LU', 'U', 'RU', 'L', 'O', 'R', 'LD', 'D', 'RD']    # operator names indexed by operator code
+
+    def __init__(self, size, tiled=False):
+        '''
+        Method used to instantiate a class with room for every cell on the map
+        @param size: the height and width of the map (size x size)
+        @param tiled: True to allocate the arrays tile by tile as nodes are generated
+        '''
+        self.size = size                                        # the height and width of the map
+        self.tiled = tiled                                      # whether the arrays are TileArrays
+        self.identifier = self.new_array('i', -1)               # an unique integer value for the node, -1 if none
+        self.operator = self.new_array('B', 0)                  # code of the operator that generated the node
+        self.order_of_expansion = self.new_array('i', 0)        # the order in which the node was expanded
+        self.cost = self.new_array('i', 0)                      # the cost to reach the node
+        self.heuristic = self.new_array('i', 0)                 # the estimated cost to reach the goal from the node
+        self.parent = self.new_array('i', -1)                   # the cell of the parent node, -1 for the root
+        self.depth = self.new_array('i', 0)                     # the number of moves from the root to the node
+        self.generated = array('i')                             # the cells of the generated nodes
+
+    def new_array(self, typecode, default):
+        '''
+        allocate an array with a value for each cell of the map
+        @param typecode: the type code of the values as for array
+        @param default: the value of the cells without a node
+        @return: a TileArray for a tiled store, else an array
+        '''
+        if self.tiled:
+            return TileArray(typecode, default)
+        return array(typecode, [default]) * (self.size * self.size)
+
+    def add(self, cell, identifier, operator, order_of_expansion, cost, heuristic, parent):
+        '''
+        Method used to generate a new node on a cell
+        @param cell: the cell of the node
+        @param identifier: an unique integer value for the node
+        @param operator: the code of the operator that generated the node from parent
+        @param order_of_expansion: the order in which this node was expanded
+        @param cost: the cost to reach this node
+        @param heuristic: the estimated cost to reach the goal from this node
+        @param parent: the cell of the parent node
+        @return: none
+        '''
+        self.identifier[cell] = identifier
+        self.order_of_expansion[cell] = order_of_expansion
+        self.generated.append(cell)
+        self.update(cell, operator, cost, heuristic, parent)
+
+    def update(self, cell, operator, cost, heuristic, parent):
+        '''
+        Method used to replace the path to an existing node
+        @param cell: the cell of the node
+        @param operator: the code of the operator that generated the node from parent
+        @param cost: the cost to reach this node
+        @param heuristic: the estimated cost to reach the goal from this node
+        @param parent: the cell of the parent node
+        @return: none
+        '''
+        self.operator[cell] = operator
+        self.cost[cell] = cost
+        self.heuristic[cell] = heuristic
+        self.parent[cell] = parent
+        self.depth[cell] = self.depth[parent] + 1 if parent >= 0 else 0
+
+    def reset(self):
+        '''
+        Method used to remove all the nodes, only the cells that have a node are cleared, and a tiled store releases
+        its tiles
+        @return: none
+        '''
+        if self.tiled:
+            for values in (self.identifier, self.operator, self.order_of_expansion, self.cost, self.heuristic,
+                           self.parent, self.depth):
+                values.clear()
+            del self.generated[:]
+            return
+        for cell in self.generated:
+            self.identifier[cell] = -1
+            self.parent[cell] = -1
+        del self.generated[:]
+
+    def has_ancestor(self, cell, ancestor):
+        '''
+        This method is used to check whether a node is on the path from the root to the node on a cell. The cost of a
+        parent is always lower than the cost of its child, so the traversal stops as soon as the cost drops to the
+        cost of the given node instead of walking all the way to the root
+        @param cell: the cell of the node
+        @param ancestor: the cell of the node to be checked
+        @return: True if the node is an ancestor of the node on the cell
+        '''
+        current = self.parent[cell]
+        # Loop through the parents that are more expensive than the given node
+        while current >= 0 and self.cost[current] > self.cost[ancestor]:
+            current = self.parent[current]
+        return current == ancestor
+
+    def __contains__(self, cell):
+        '''
+        check whether a node has been generated on the cell
+        @param cell: the cell to be checked
+        @return: True if there is a node on the cell
+        '''
+        return self.identifier[cell] >= 0
+
 ########################################################################################################################
 ########################################################################################################################
 
 class Node:
     '''
-    The Node Class that is used to maintain the data for each node in the graph. It also contains the necessary methods
-    to print and display the values of the node
+    The Node Class is a view of the data of one node in the node store of a search graph. It contains the necessary
+    methods to print and display the values of the node
+    '''
+    __slots__ = ('graph', 'cell', 'children')
+
+    def __init__(self, graph, cell, children=()):
+        '''
+        Method used to instantiate a class
+        @param graph: the search graph that stores the node
+        @param cell: the cell of the node on the map (x * size + y)
+        @param children: the cells of the child nodes generated when the node was expanded
+        '''
+        self.graph = graph                                              # the search graph that stores the node
+        self.cell = cell                                                # the cell of the node on the map
+        self.children = [Node(graph, child) for child in children]     # the list of child nodes of this node
+
+    @property
+    def identifier(self):
+        return self.graph.NODES.identifier[self.cell]
+
+    @property
+    def operator(self):
+        return NodeStore.OPERATORS[self.graph.NODES.operator[self.cell]]
+
+    @property
+    def order_of_expansion(self):
+        return self.graph.NODES.order_of_expansion[self.cell]
+
+    @property
+    def cost(self):
+        return self.graph.NODES.cost[self.cell]
+
+    @property
+    def heuristic(self):
+        return self.graph.NODES.heuristic[self.cell]
+
+    @property
+    def f(self):
+        return self.graph.NODES.cost[self.cell] + self.graph.NODES.heuristic[self.cell]
+
+    @property
+    def parent(self):
+        parent = self.graph.NODES.parent[self.cell]
+        if parent < 0:
+            return None
+        return Node(self.graph, parent)
+
+    def get_operators_to_root(self):
+        '''
+        This method is used to generate the path from the node to the root(start), traversing through the parent
+        @return: the path from the start node as a string
+        '''
+        nodes = self.graph.NODES
+        operators = []
+        goals = 0
+        current = self.cell
+        # Loop to the start node, a goal on the path is marked at the end of the path
+        while current >= 0:
+            operators.append(NodeStore.OPERATORS[nodes.operator[current]])
+            if self.graph.check_goal(*divmod(current, self.graph.size)):
+                goals += 1
+            current = nodes.parent[current]
+        return '-'.join(reversed(operators)) + '-G' * goals
+
+    def __len__(self):
+        '''
+        This method is used to return the depth of the node from the root node
+        @return: the depth of the node as an integer
+        '''
+        return self.graph.NODES.depth[self.cell]
+
+    def __str__(self):
+        '''
+        This method converts the node into a string for output
+        @return: a string with all the data as a string
+        '''
+
+        # Converts the child array to a string
+        children_str = ','.join('N' + str(child.identifier) + ':' + child.get_operators_to_root()
+                                for child in self.children)
+
+        # Combined all the data and return as a string
+        return "N" + str(self.identifier) + ':' \
+               + self.get_operators_to_root() + '\t' \
+               + str(self.order_of_expansion) + ' ' \
+               + str(self.cost) + ' ' \
+               + str(self.heuristic) + ' ' \
+               + str(self.f) + '\n' \
+               + 'Children:\t{' + children_str + '}'
+
+########################################################################################################################
+########################################################################################################################
+
+class PriorityQueue:
+    '''
+    An indexed binary min-heap used as the frontier for the A star algorithm. The items are cells on the map and every
+    cell keeps track of the position of its entry in the heap, so that its priority can be changed in place
+    (decrease-key) without adding a duplicate entry. Nodes with the same priority are popped first in first out. The
+    frontier used to be re-sorted after every expansion with a comparison that was not a strict order for nodes of
+    the same f cost, so the order of those nodes was left to the sort and cannot be given by any key. The paths are
+    the same apart from input 6, but the traces of A star with a flag of 3 or more list and expand the nodes of the
+    same f cost in another order on inputs 1, 3, 5, 6, 8 and 9. The priorities are integers, and each entry of the
+    heap is one integer that packs the priority, the push count and the cell, so that the entries compare in the order
+    of the priority and then of the push count, and an entry takes about 48 bytes
+    '''
+    def __init__(self, capacity, position=None):
+        '''
+        Instantiate an empty priority queue
+        @param capacity: the number of cells that can be stored in the queue
+        @param position: the array to keep the position of each cell in, such as a TileArray with the default -1, None
+        for an array of the capacity
+        '''
+        if position is None:
+            position = array('i', [-1]) * capacity
+        self.heap = []                                      # list of priority << 64 | push count << 32 | cell entries
+        self.position = position                            # index of the entry of each cell in the heap, -1 if none
+        self.push_count = 0                                 # number of pushes, used to break ties first in first out
+
+    def push(self, item, priority):
+        '''
+        add an item to the queue, or update its priority if it is already in the queue
+        @param item: the cell to be added
+        @param priority: the priority of the item as an integer, lower values are popped first
+        @return: none
+        '''
+        if self.position[item] >= 0:
+            self.update(item, priority)
+            return
+        # add the entry to the end of the heap and move it up to its place
+        self.heap.append(priority << 64 | self.push_count << 32 | item)
+        self.push_count += 1
+        self.sift_up(len(self.heap) - 1)
+
+    def pop(self):
+        '''
+        remove the item with the lowest priority from the queue
+        @return: the cell with the lowest priority
+        '''
+        # swap the root with the last entry, remove it and move the new root down to its place
+        last = self.heap.pop()
+        if len(self.heap) == 0:
+            self.position[last & CELL_MASK] = -1
+            return last & CELL_MASK
+        root = self.heap[0]
+        self.heap[0] = last
+        self.position[root & CELL_MASK] = -1
+        self.sift_down(0)
+        return root & CELL_MASK
+
+    def peek(self):
+        '''
+        get the item with the lowest priority without removing it from the queue
+        @return: the cell with the lowest priority
+        '''
+        return self.heap[0] & CELL_MASK
+
+    def get_priority(self, item):
+        '''
+        get the priority an item was last added to the queue with
+        @param item: the cell in the queue
+        @return: the priority of the item as an integer
+        '''
+        return self.heap[self.position[item]] >> 64
+
+    def remove(self, item):
+        '''
+        remove an item from the queue wherever it is in the heap
+        @param item: the cell to be removed
+        @return: none
+        '''
+        index = self.position[item]
+        self.position[item] = -1
+        last = self.heap.pop()
+        if index == len(self.heap):
+            return
+        # move the last entry into the place of the item and restore the heap order from there
+        self.heap[index] = last
+        self.position[last & CELL_MASK] = index
+        self.sift_up(index)
+        self.sift_down(self.position[last & CELL_MASK])
+
+    def update(self, item, priority):
+        '''
+        change the priority of an item that is already in the queue and restore the heap order in place
+        @param item: the cell to be updated
+        @param priority: the new priority of the item as an integer
+        @return: none
+        '''
+        index = self.position[item]
+        self.heap[index] = priority << 64 | self.push_count << 32 | item
+        self.push_count += 1
+        self.sift_up(index)
+        self.sift_down(self.position[item])
+
+    def sift_up(self, index):
+        '''
+        move the entry at the index towards the root until its parent has a lower priority
+        @param index: the index of the entry in the heap
+        @return: none
+        '''
+        heap = self.heap
+        position = self.position
+        entry = heap[index]
+        while index > 0:
+            parent = (index - 1) >> 1
+            if entry >= heap[parent]:
+                break
+            heap[index] = heap[parent]
+            position[heap[index] & CELL_MASK] = index
+            index = parent
+        heap[index] = entry
+        position[entry & CELL_MASK] = index
+
+    def sift_down(self, index):
+        '''
+        move the entry at the index away from the root until both children have a higher priority
+        @param index: the index of the entry in the heap
+        @return: none
+        '''
+        heap = self.heap
+        position = self.position
+        entry = heap[index]
+        size = len(heap)
+        child = 2 * index + 1
+        while child < size:
+            # pick the child with the lower priority
+            if child + 1 < size and heap[child + 1] < heap[child]:
+                child += 1
+            if entry <= heap[child]:
+                break
+            heap[index] = heap[child]
+            position[heap[index] & CELL_MASK] = index
+            index = child
+            child = 2 * index + 1
+        heap[index] = entry
+        position[entry & CELL_MASK] = index
+
+    def clear(self):
+        '''
+        remove all the items from the queue, only the positions of the items in the queue are cleared
+        @return: none
+        '''
+        if isinstance(self.position, TileArray):
+            self.position.clear()
+        else:
+            for entry in self.heap:
+                self.position[entry & CELL_MASK] = -1
+        self.heap = []
+        self.push_count = 0
+
+    def __contains__(self, item):
+        '''
+        check whether the item is currently in the queue
+        @param item: the cell to be checked
+        @return: True if the item is in the queue
+        '''
+        return self.position[item] >= 0
+
+    def __len__(self):
+        '''
+        This method is used to return the number of items in the queue
+        @return: the number of items as an integer
+        '''
+        return len(self.heap)
+
+    def __iter__(self):
+        '''
+        iterate over the items from the highest to the lowest priority value, so the item that will be popped next
+        comes last, in the same order as the sorted frontier list
+        @return: an iterator over the cells
+        '''
+        for entry in sorted(self.heap, reverse=True):
+            yield entry & CELL_MASK
+
+########################################################################################################################
+########################################################################################################################
+
+class TranspositionTable:
+    '''
+    The TranspositionTable Class keeps the lowest depth or cost at which the cells were reached in an iteration of the
+    iterative deepening search, in a fixed number of slots. A cell goes in the slot given by a hash of the cell and
+    replaces the cell that was there, so the table does not grow with the map, and a cell that was replaced is only
+    explored again
+    '''
+    __slots__ = ('cells', 'lengths', 'mask')
+
+    def __init__(self, size):
+        '''
+        Method used to instantiate an empty table
+        @param size: the number of slots, a power of two
+        '''
+        self.cells = array('i', [-1]) * size                  # the cell in each slot, -1 if none
+        self.lengths = array('i', [0]) * size                 # the depth or cost of the cell in each slot
+        self.mask = size - 1                                  # the bits of the slot of a hash
+
+    def get(self, cell):
+        '''
+        get the lowest depth or cost at which a cell was reached
+        @param cell: the cell on the map
+        @return: the depth or cost, None if the cell is not in the table
+        '''
+        slot = (cell * 2654435761 >> 16) & self.mask
+        if self.cells[slot] == cell:
+            return self.lengths[slot]
+        return None
+
+    def put(self, cell, length):
+        '''
+        keep the depth or cost at which a cell was reached, in place of the cell in its slot
+        @param cell: the cell on the map
+        @param length: the depth or cost
+        @return: none
+        '''
+        slot = (cell * 2654435761 >> 16) & self.mask
+        self.cells[slot] = cell
+        self.lengths[slot] = length
+
+    def clear(self):
+        '''
+        remove all the cells from the table
+        @return: none
+        '''
+        self.cells = array('i', [-1]) * len(self.cells)
+
+class DeepeningPath:
+    '''
+    The DeepeningPath Class is the path from a start node to the node being expanded in the iterative deepening search.
+    The depth of a node is its place on the path, and the cells on the path are kept in a set so that the moves back
+    onto the path are found at once
+    '''
+    def __init__(self):
+        '''
+        Method used to instantiate an empty path
+        '''
+        self.cells = array('i')                 # the cells of the nodes on the path
+        self.operators = array('B')             # the code of the operator that generated each node
+        self.costs = array('i')                 # the cost to reach each node
+        self.records = array('i')               # the record of each node in the CutoffFrontier, -1 if none
+        self.sources = array('i')               # the record of each node in the last CutoffFrontier, -1 if none
+        self.on_path = set()                    # the cells of the nodes on the path
+
+    def append(self, cell, operator, cost, source=-1):
+        '''
+        add a node at the end of the path
+        @param cell: the cell of the node
+        @param operator: the code of the operator that generated the node
+        @param cost: the cost to reach the node
+        @param source: the record of the node in the frontier of the last iteration, -1 if none
+        @return: none
+        '''
+        self.cells.append(cell)
+        self.operators.append(operator)
+        self.costs.append(cost)
+        self.records.append(-1)
+        self.sources.append(source)
+        self.on_path.add(cell)
+
+    def truncate(self, length):
+        '''
+        go back along the path until it has a number of nodes
+        @param length: the number of nodes to keep
+        @return: none
+        '''
+        for cell in self.cells[length:]:
+            self.on_path.discard(cell)
+        del self.cells[length:]
+        del self.operators[length:]
+        del self.costs[length:]
+        del self.records[length:]
+        del self.sources[length:]
+
+    def __len__(self):
+        return len(self.cells)
+
+class CutoffFrontier:
+    '''
+    The CutoffFrontier Class keeps the nodes that an iteration of the iterative deepening search cut off at the bound,
+    with the paths to them, so that the next iteration goes on from these nodes instead of exploring the nodes within
+    the last bound again. The paths are kept as a tree of records that share the part they have in common. The number
+    of records is limited: when the frontier would need more, it is dropped and the next iteration starts again from
+    the start nodes, so the memory of the search does not grow with the map
+    '''
+    def __init__(self, limit):
+        '''
+        Method used to instantiate an empty frontier
+        @param limit: the highest number of records
+        '''
+        self.limit = limit                      # the highest number of records
+        self.cell = array('i')                  # the cell of each record
+        self.operator = array('B')              # the code of the operator that generated the node of each record
+        self.cost = array('i')                  # the cost to reach the node of each record
+        self.parent = array('i')                # the record of the parent node, -1 for a start node
+        self.depth = array('i')                 # the depth of the node of each record
+        self.entries = array('i')               # the records of the nodes cut off, in the order they were cut off
+        self.values = array('i')                # the depth or f cost of the nodes cut off
+        self.dropped = False                    # True if the frontier went over the limit
+
+    def add(self, path, cell, operator, cost, value):
+        '''
+        keep a node cut off at the bound and the path to it. The nodes of the path get a record the first time a node
+        after them is cut off
+        @param path: the DeepeningPath to the parent of the node
+        @param cell: the cell of the node
+        @param operator: the code of the operator that generated the node
+        @param cost: the cost to reach the node
+        @param value: the depth or f cost of the node
+        @return: none
+        '''
+        if self.dropped:
+            return
+        first = len(path)
+        while first > 0 and path.records[first - 1] < 0:
+            first -= 1
+        if len(self.cell) + len(path) - first + 1 > self.limit:
+            self.drop()
+            return
+        parent = path.records[first - 1] if first > 0 else -1
+        for index in range(first, len(path)):
+            parent = path.records[index] = self.add_record(path.cells[index], path.operators[index],
+                                                           path.costs[index], parent)
+        self.entries.append(self.add_record(cell, operator, cost, parent))
+        self.values.append(value)
+
+    def drop(self):
+        '''
+        remove all the records, the next iteration starts again from the start nodes
+        @return: none
+        '''
+        self.dropped = True
+        for values in (self.cell, self.operator, self.cost, self.parent, self.depth, self.entries, self.values):
+            del values[:]
+
+    def add_record(self, cell, operator, cost, parent):
+        '''
+        add a record of a node
+        @param cell: the cell of the node
+        @param operator: the code of the operator that generated the node
+        @param cost: the cost to reach the node
+        @param parent: the record of the parent node, -1 for a start node
+        @return: the record
+        '''
+        self.cell.append(cell)
+        self.operator.append(operator)
+        self.cost.append(cost)
+        self.parent.append(parent)
+        self.depth.append(self.depth[parent] + 1 if parent >= 0 else 0)
+        return len(self.cell) - 1
+
+    def set_path(self, path, record):
+        '''
+        set a DeepeningPath to the path to the parent of a node that was cut off. The nodes at the start of the path
+        that are on the path to the node are kept, the nodes cut off one after the other share most of their paths
+        @param path: the DeepeningPath
+        @param record: the record of the node
+        @return: none
+        '''
+        records = []
+        record = self.parent[record]
+        while record >= 0 and not (self.depth[record] < len(path) and path.sources[self.depth[record]] == record):
+            records.append(record)
+            record = self.parent[record]
+        path.truncate(self.depth[record] + 1 if record >= 0 else 0)
+        for record in reversed(records):
+            path.append(self.cell[record], self.operator[record], self.cost[record], record)
+
+########################################################################################################################
+########################################################################################################################
+
+class Trace:
+    '''
+    The Trace Class is used to display the node expansions of a search in debug mode. The current node, the open list
+    and the closed list are only converted to strings while the trace is active, so a search without a trace does not
+    build any of them
+    '''
+    frontier = False            # flag to state whether the trace is told about each change of the frontier
+
+    def __init__(self, expansions=0, output=print):
+        '''
+        Method used to instantiate a class
+        @param expansions: the number of node expansions to display
+        @param output: the function that receives each trace record as a string
+        '''
+        self.expansions = expansions                        # number of node expansions left to display
+        self.output = output                                # consumer of the trace records
+
+    @property
+    def active(self):
+        '''
+        check whether the next node expansion should be displayed
+        @return: True if there are node expansions left to display
+        '''
+        return self.expansions > 0
+
+    def stop(self):
+        '''
+        stop displaying node expansions
+        @return: none
+        '''
+        self.expansions = 0
+
+    def start(self, graph):
+        '''
+        method called before the search starts, a trace that records the changes of the frontier writes the state of
+        the search here
+        @param graph: the search graph
+        @return: none
+        '''
+        pass
+
+    def push(self, graph, cell):
+        '''
+        method called before a node is added to the frontier when frontier is set
+        @param graph: the search graph
+        @param cell: the cell of the node
+        @return: none
+        '''
+        pass
+
+    def pop(self, graph, cell):
+        '''
+        method called after a node is taken from the frontier when frontier is set
+        @param graph: the search graph
+        @param cell: the cell of the node
+        @return: none
+        '''
+        pass
+
+    def record(self, graph, cell):
+        '''
+        convert the node that was just expanded, the open list and the closed list to a string and display it
+        @param graph: the search graph
+        @param cell: the cell of the node that was just expanded
+        @return: none
+        '''
+        output = ''.join([str(Node(graph, cell, graph.CHILDREN.get(cell, ()))), '\n',
+                          # print the open list as a string
+                          'OPEN:\t{', graph.get_open_list_as_string(), '}\n',
+                          # print the close list as a string
+                          'CLOSED:\t{', graph.get_closed_list_as_string(), '}\n'])
+
+        # decrement the number of node expansions to display in debug mode
+        self.expansions -= 1
+
+        # display the output
+        self.output(output)
+
+########################################################################################################################
+########################################################################################################################
+
+class TraceWriter(Trace):
+    '''
+    The TraceWriter Class writes the trace records of the node expansions to a file while they are produced. The
+    nodes of the open and closed lists are written one at a time, so a record is never built as one string and the
+    memory used does not grow with the number of records. The records are written in the text format of the trace
+    that is printed, or as JSON lines with one object for each record
+    '''
+    FORMATS = ('text', 'json')                              # formats of the records
+
+    def __init__(self, expansions, file_handle, format='text'):
+        '''
+        Method used to instantiate a class
+        @param expansions: the number of node expansions to write
+        @param file_handle: the file to write the records to
+        @param format: text for the printed format, json for JSON lines
+        '''
+        Trace.__init__(self, expansions)
+        self.file_handle = file_handle                      # the file the records are written to
+        self.format = format                                # the format of the records
+        self.step = 0                                       # number of records written
+
+    def record(self, graph, cell):
+        '''
+        write the node that was just expanded, the open list and the closed list
+        @param graph: the search graph
+        @param cell: the cell of the node that was just expanded
+        @return: none
+        '''
+        self.expansions -= 1
+        self.step += 1
+        if self.format == 'json':
+            self.write_json(graph, cell)
+        else:
+            self.write_text(graph, cell)
+
+    def write_text(self, graph, cell):
+        '''
+        write a record in the printed format
+        @param graph: the search graph
+        @param cell: the cell of the node that was just expanded
+        @return: none
+        '''
+        write = self.file_handle.write
+        write(str(Node(graph, cell, graph.CHILDREN.get(cell, ()))) + '\n')
+        write('OPEN:\t{')
+        for open_cell in graph.get_open_cells():
+            write(graph.get_open_string(open_cell))
+        write('}\n')
+        write('CLOSED:\t{')
+        for closed_cell in graph.CLOSED:
+            write(graph.get_closed_string(closed_cell))
+        # the printed records end with an empty line
+        write('}\n\n')
+
+    def write_json(self, graph, cell):
+        '''
+        write a record as one line of JSON. The nodes of the open list are [identifier, path, cost, heuristic, f] and
+        the nodes of the closed list are [identifier, path, order of expansion, cost, heuristic, f]
+        @param graph: the search graph
+        @param cell: the cell of the node that was just expanded
+        @return: none
+        '''
+        write = self.file_handle.write
+        node = Node(graph, cell, graph.CHILDREN.get(cell, ()))
+        write('{"step": ' + str(self.step) + ', "node": ' + json.dumps({
+            'identifier': node.identifier,
+            'path': node.get_operators_to_root(),
+            'order_of_expansion': node.order_of_expansion,
+            'cost': node.cost,
+            'heuristic': node.heuristic,
+            'f': node.f,
+            'children': [[child.identifier, child.get_operators_to_root()] for child in node.children]
+        }))
+        write(', "open": [')
+        separator = ''
+        for open_cell in graph.get_open_cells():
+            open_node = Node(graph, open_cell)
+            write(separator + json.dumps([open_node.identifier, open_node.get_operators_to_root(), open_node.cost,
+                                          open_node.heuristic, open_node.f]))
+            separator = ', '
+        write('], "closed": [')
+        separator = ''
+        for closed_cell in graph.CLOSED:
+            closed_node = Node(graph, closed_cell)
+            write(separator + json.dumps([closed_node.identifier, closed_node.get_operators_to_root(),
+                                          closed_node.order_of_expansion, closed_node.cost, closed_node.heuristic,
+                                          closed_node.f]))
+            separator = ', '
+        write(']}\n')
+
+########################################################################################################################
+########################################################################################################################
+
+class DeltaTrace(Trace):
+    '''
+    The DeltaTrace Class writes the trace of the node expansions as the changes since the last record instead of the
+    whole open and closed lists. The first line of the file is the state of the search when it starts, and each
+    following line is one record with the changes of the frontier in the order they happened: a node pushed
+    ["+", cell, identifier, parent, operator, cost, heuristic, f], a node re-prioritised with the same fields after
+    "~", and a node popped ["-", cell], followed by the node expanded with its order of expansion and its children. The
+    full open and closed lists at any record are rebuilt from the changes by tracereplay.py. Only the searches that
+    change the frontier through SearchGraph.push and SearchGraph.pop are recorded, which are D, A and J
+    '''
+    frontier = True             # flag to state whether the trace is told about each change of the frontier
+    PROCEDURES = ('D', 'A', 'J')                            # the procedures whose frontier can be rebuilt
+
+    def __init__(self, expansions, file_handle):
+        '''
+        Method used to instantiate a class
+        @param expansions: the number of node expansions to write
+        @param file_handle: the file to write the records to
+        '''
+        Trace.__init__(self, expansions)
+        self.file_handle = file_handle                      # the file the records are written to
+        self.changes = []                                   # the changes of the frontier since the last record
+        self.step = 0                                       # number of records written
+
+    def get_fields(self, graph, cell):
+        '''
+        get the fields of a node that are written for each change
+        @param graph: the search graph
+        @param cell: the cell of the node
+        @return: the list of the cell, identifier, parent cell, operator code, cost, heuristic and f of the node
+        '''
+        nodes = graph.NODES
+        return [cell, nodes.identifier[cell], nodes.parent[cell], nodes.operator[cell], nodes.cost[cell],
+                nodes.heuristic[cell], nodes.cost[cell] + nodes.heuristic[cell]]
+
+    def start(self, graph):
+        '''
+        write the state of the search when it starts: the map size, the goal cells, the order of the frontier, every
+        node generated and the open and closed lists
+        @param graph: the search graph
+        @return: none
+        '''
+        nodes = graph.NODES
+        priority = graph.options['algorithm'] in ('A', 'J', 'B') and not graph.options['deepen']
+        self.file_handle.write(json.dumps({
+            'size': graph.size,
+            'goals': sorted(graph.GOALS),
+            'operators': NodeStore.OPERATORS,
+            'best_operators': graph.BEST_OPERATORS,
+            'frontier': 'priority' if priority else 'stack',
+            'nodes': [self.get_fields(graph, cell) + [nodes.order_of_expansion[cell]] for cell in nodes.generated],
+            # the open list from the node to be expanded last to the node to be expanded next
+            'open': list(graph.OPEN),
+            'closed': list(graph.CLOSED)
+        }) + '\n')
+
+    def push(self, graph, cell):
+        '''
+        keep a node added to the frontier, or re-prioritised if it is already in the priority queue
+        @param graph: the search graph
+        @param cell: the cell of the node
+        @return: none
+        '''
+        if self.expansions > 0:
+            moved = isinstance(graph.OPEN, PriorityQueue) and cell in graph.OPEN
+            self.changes.append(['~' if moved else '+'] + self.get_fields(graph, cell))
+
+    def pop(self, graph, cell):
+        '''
+        keep a node taken from the frontier
+        @param graph: the search graph
+        @param cell: the cell of the node
+        @return: none
+        '''
+        if self.expansions > 0:
+            self.changes.append(['-', cell])
+
+    def record(self, graph, cell):
+        '''
+        write the changes since the last record and the node that was just expanded, which is added to the closed list
+        @param graph: the search graph
+        @param cell: the cell of the node that was just expanded
+        @return: none
+        '''
+        self.expansions -= 1
+        self.step += 1
+        self.file_handle.write(json.dumps({
+            'step': self.step,
+            'changes': self.changes,
+            'closed': cell,
+            'order_of_expansion': graph.NODES.order_of_expansion[cell],
+            'children': graph.CHILDREN.get(cell, [])
+        }) + '\n')
+        self.changes = []
+
+########################################################################################################################
+########################################################################################################################
+
+class SearchStats:
+    '''
+    The SearchStats Class collects the time spent in each phase of the searches and the counters of the frontier
+    operations. The times are measured with time.perf_counter. The phases can be nested: the time of the expand phase
+    is part of the time of the search phase, and the ordering phase (adding nodes to and removing nodes from the
+    frontier) is partly within the expand phase. The stats of several searches are added up. The procedures that keep
+    their own frontiers (B, H, DL and the distance field of F) count their frontier operations with add_push and
+    add_pop, but their ordering time is part of the search phase only
+    '''
+    PHASES = ('parse', 'add_map', 'search', 'expand', 'ordering', 'output')      # names of the timed phases
+
+    def __init__(self):
+        '''
+        Method used to instantiate a class with all the times and counters at zero
+        '''
+        self.seconds = dict.fromkeys(self.PHASES, 0.0)     # time spent in each phase
+        self.pushes = 0                                     # number of nodes added to or moved in the frontier
+        self.pops = 0                                       # number of nodes taken from the frontier
+        self.stale_pops = 0                                 # number of nodes taken that had a shorter path since
+        self.reopenings = 0                                 # number of nodes reached again by a cheaper path
+        self.max_open = 0                                   # largest number of nodes in the frontier
+        self.searches = 0                                   # number of searches
+        self.nodes_generated = 0                            # number of nodes generated by the searches
+        self.nodes_expanded = 0                             # number of nodes expanded by the searches
+        self.task_seconds = []                              # time of each query or file searched by a process
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        '''
+        measure the time of a block of code as part of a phase
+        @param name: the name of the phase
+        @return: a context manager
+        '''
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.seconds[name] += time.perf_counter() - start
+
+    def add_time(self, name, start):
+        '''
+        add the time since start to a phase, used in the search loops instead of phase to avoid its overhead
+        @param name: the name of the phase
+        @param start: the value of time.perf_counter at the start
+        @return: none
+        '''
+        self.seconds[name] += time.perf_counter() - start
+
+    def timed(self, iterator, name):
+        '''
+        measure the time taken to produce each item of an iterator as part of a phase
+        @param iterator: the iterator
+        @param name: the name of the phase
+        @return: an iterator over the same items
+        '''
+        iterator = iter(iterator)
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                self.add_time(name, start)
+                return
+            self.add_time(name, start)
+            yield item
+
+    def add_push(self, open_size):
+        '''
+        count a node added to or moved in the frontier
+        @param open_size: the number of nodes in the frontier after the push
+        @return: none
+        '''
+        self.pushes += 1
+        if open_size > self.max_open:
+            self.max_open = open_size
+
+    def add_pop(self, stale=False):
+        '''
+        count a node taken from the frontier
+        @param stale: True if the node is skipped as it had a shorter path since it was added
+        @return: none
+        '''
+        self.pops += 1
+        if stale:
+            self.stale_pops += 1
+
+    def add_task(self, seconds):
+        '''
+        add the time taken by a process of a pool to answer a query or to search a file
+        @param seconds: the time in seconds
+        @return: none
+        '''
+        self.task_seconds.append(seconds)
+
+    def add_search(self, graph):
+        '''
+        add the number of nodes generated and expanded by a finished search
+        @param graph: the search graph
+        @return: none
+        '''
+        self.searches += 1
+        self.nodes_generated += graph.node_count
+        # the expansion count is the order of the next expansion, it starts at 1
+        self.nodes_expanded += graph.expansion_count - 1
+
+    def as_dict(self):
+        '''
+        get the times and counters
+        @return: a dictionary that can be written as JSON
+        '''
+        return {
+            'seconds': dict(self.seconds),
+            'searches': self.searches,
+            'nodes_generated': self.nodes_generated,
+            'nodes_expanded': self.nodes_expanded,
+            'pushes': self.pushes,
+            'pops': self.pops,
+            'stale_pops': self.stale_pops,
+            'reopenings': self.reopenings,
+            'max_open': self.max_open,
+            'task_seconds': list(self.task_seconds)
+        }
+
+    def to_json(self):
+        '''
+        get the times and counters as JSON
+        @return: the JSON text
+        '''
+        return json.dumps(self.as_dict(), indent=2)
+
+########################################################################################################################
+########################################################################################################################
+
+class Profiler:
+    '''
+    The Profiler Class profiles a part of the program with cProfile, and at the same time samples the stack of the
+    profiled thread from a second thread at a fixed interval. The cProfile stats are written as a pstats file and the
+    samples as collapsed stacks, one line for each stack with its number of samples, as read by flame graph tools.
+    The frames of the functions of the main subsystems are tagged with the name of the subsystem
+    '''
+    SUBSYSTEMS = {                                          # subsystem of the functions tagged in the stacks
+        'SearchGraph.expand': 'expand',
+        'SearchGraph.expand_jump_points': 'expand',
+        'SearchGraph.jump': 'expand',
+        'SearchGraph.check_ridge': 'check_ridge',
+        'SearchGraph.get_moves': 'check_ridge',
+        'SearchGraph.add_moves': 'check_ridge',
+        'SearchGraph.push': 'order',
+        'SearchGraph.pop': 'order',
+        'SearchGraph.priority': 'order',
+        'PriorityQueue.push': 'order',
+        'PriorityQueue.pop': 'order',
+        'PriorityQueue.update': 'order',
+        'PriorityQueue.remove': 'order',
+        'PriorityQueue.sift_up': 'order',
+        'PriorityQueue.sift_down': 'order',
+        'SearchGraph.display': 'display',
+        'SearchGraph.get_open_list_as_string': 'display',
+        'SearchGraph.get_closed_list_as_string': 'display',
+        'Trace.record': 'display',
+        'Node.__str__': 'display',
+        'Node.get_operators_to_root': 'get_operators_to_root'
+    }
+
+    def __init__(self, file_name, interval=0.001):
+        '''
+        Method used to instantiate a class
+        @param file_name: the name of the files without the extension, .pstats and .collapsed are added
+        @param interval: the time between two samples in seconds
+        '''
+        self.file_name = file_name                          # the name of the files without the extension
+        self.interval = interval                            # the time between two samples in seconds
+        self.profile = cProfile.Profile()                   # the deterministic profiler
+        self.samples = {}                                   # the number of samples of each stack
+        self.thread = None                                  # the thread that takes the samples
+        self.thread_id = None                               # the identifier of the profiled thread
+        self.running = threading.Event()                    # set while the samples are taken
+
+    def start(self):
+        '''
+        start profiling the current thread
+        @return: none
+        '''
+        self.thread_id = threading.get_ident()
+        self.running.set()
+        self.thread = threading.Thread(target=self.sample, daemon=True)
+        self.thread.start()
+        self.profile.enable()
+
+    def stop(self):
+        '''
+        stop profiling and write the pstats and collapsed stack files
+        @return: none
+        '''
+        self.profile.disable()
+        self.running.clear()
+        self.thread.join()
+        self.profile.dump_stats(self.file_name + '.pstats')
+        with open(self.file_name + '.collapsed', 'w') as file_handle:
+            for stack, count in sorted(self.samples.items()):
+                file_handle.write(stack + ' ' + str(count) + '\n')
+
+    def sample(self):
+        '''
+        take samples of the stack of the profiled thread until the profiling stops
+        @return: none
+        '''
+        while self.running.is_set():
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                stack = self.get_stack(frame)
+                self.samples[stack] = self.samples.get(stack, 0) + 1
+            del frame
+            time.sleep(self.interval)
+
+    def get_name(self, frame):
+        '''
+        get the qualified name of the function of a frame, such as SearchGraph.expand. Before Python 3.11 the code
+        has no co_qualname, so the class is taken from the self argument of a method: the first class in its method
+        resolution order that defines the function with this code
+        @param frame: the frame of the function
+        @return: the name of the function, with its class for a method
+        '''
+        code = frame.f_code
+        if hasattr(code, 'co_qualname'):
+            return code.co_qualname
+        if code.co_argcount > 0 and code.co_varnames[0] == 'self':
+            instance = frame.f_locals.get('self')
+            for klass in type(instance).__mro__:
+                function = klass.__dict__.get(code.co_name)
+                if getattr(function, '__code__', None) is code:
+                    return klass.__name__ + '.' + code.co_name
+        return code.co_name
+
+    def get_stack(self, frame):
+        '''
+        convert the stack of a frame to one line, from the outermost frame to the frame, separated by semicolons
+        @param frame: the innermost frame of the stack
+        @return: the stack as a string
+        '''
+        names = []
+        while frame is not None:
+            code = frame.f_code
+            name = self.get_name(frame)
+            label = os.path.splitext(os.path.basename(code.co_filename))[0] + ':' + name
+            if name in self.SUBSYSTEMS:
+                label += ' [' + self.SUBSYSTEMS[name] + ']'
+            names.append(label.replace(';', ','))
+            frame = frame.f_back
+        return ';'.join(reversed(names))
+
+########################################################################################################################
+########################################################################################################################
+
+class MappedMap:
+    '''
+    The MappedMap Class gives access to a map stored in a buffer, such as a read only memory map of a map file or a
+    block of shared memory, instead of reading it into lists. Each row is stored with a fixed width in the buffer, so
+    every cell can be found directly
+    '''
+    MAGIC = b'PPGRID2\n'                                    # first bytes of the binary grid format
+
+    def __init__(self, data, size, offset, width, starts=None, goals=None):
+        '''
+        Method used to instantiate a class
+        @param data: the buffer that stores the map
+        @param size: the height and width of the map (size x size)
+        @param offset: the position of the first cell in the buffer
+        @param width: the distance between the first cells of two rows in the buffer
+        @param starts: the start cells if they are known without reading the map, None to find them
+        @param goals: the goal cells if they are known without reading the map, None to find them
+        '''
+        self.data = data                                    # the buffer that stores the map
+        self.size = size                                    # the height and width of the map
+        self.offset = offset                                # the position of the first cell in the buffer
+        self.width = width                                  # the distance between two rows in the buffer
+        self.starts = starts                                # the start cells, None if not known
+        self.goals = goals                                  # the goal cells, None if not known
+
+    def find(self, terrain):
+        '''
+        find all the cells of a given terrain in a memory mapped file. This reads the whole map, so it is only used
+        when the cells are not known from the header of a binary grid
+        @param terrain: the terrain character to look for
+        @return: the list of cells in the order they appear in the map
+        '''
+        cells = []
+        position = self.data.find(terrain.encode('ascii'), self.offset)
+        while position >= 0:
+            x, y = divmod(position - self.offset, self.width)
+            if x < self.size and y < self.size:
+                cells.append(x * self.size + y)
+            position = self.data.find(terrain.encode('ascii'), position + 1)
+        return cells
+
+    def __getitem__(self, x):
+        '''
+        get a row of the map, the cells are only read from the file when they are accessed
+        @param x: the index of the row
+        @return: the row as a MappedRow
+        '''
+        if x < 0 or x >= self.size:
+            raise IndexError('row out of range')
+        return MappedRow(self.data, self.offset + x * self.width, self.size)
+
+    def __len__(self):
+        '''
+        This method is used to return the number of rows on the map
+        @return: the size of the map as an integer
+        '''
+        return self.size
+
+    def close(self):
+        '''
+        close the memory map of the file
+        @return: none
+        '''
+        self.data.close()
+
+class MappedRow:
+    '''
+    The MappedRow Class is a view of one row of a MappedMap
+    '''
+    __slots__ = ('data', 'offset', 'size')
+
+    def __init__(self, data, offset, size):
+        '''
+        Method used to instantiate a class
+        @param data: the memory map of the file
+        @param offset: the position of the first cell of the row in the file
+        @param size: the number of cells in the row
+        '''
+        self.data = data
+        self.offset = offset
+        self.size = size
+
+    def __getitem__(self, y):
+        if y < 0 or y >= self.size:
+            raise IndexError('cell out of range')
+        return chr(self.data[self.offset + y])
+
+    def __len__(self):
+        return self.size
+
+    def __iter__(self):
+        return iter(bytes(self.data[self.offset:self.offset + self.size]).decode('ascii'))
+
+class MoveCache(dict):
+    '''
+    The MoveCache Class stores the move masks of the cells that have been expanded. The mask of a cell is computed
+    from the map the first time it is needed
+    '''
+    def __init__(self, graph):
+        '''
+        Method used to instantiate a class
+        @param graph: the search graph that computes the move masks
+        '''
+        dict.__init__(self)
+        self.graph = graph
+
+    def __missing__(self, cell):
+        mask = self.graph.get_moves(cell)
+        self[cell] = mask
+        return mask
+
+########################################################################################################################
+########################################################################################################################
+
+class Hierarchy:
+    '''
+    The Hierarchy Class is the abstract graph of a map used by hierarchical path finding (HPA star). The map is split
+    into square clusters. The cells on both sides of an opening between two clusters are the entrances, and the
+    entrances of a cluster are joined by the cheapest paths inside the cluster. Each edge keeps the operator codes of
+    its path, so a path on the abstract graph can be turned back into the moves on the map
+    '''
+    MAGIC = b'PPHPA\n\0\0'                               # first bytes of the hierarchy file format
+
+    def __init__(self, size, cluster_size):
+        '''
+        Method used to instantiate an empty hierarchy
+        @param size: the height and width of the map (size x size)
+        @param cluster_size: the height and width of the clusters
+        '''
+        self.size = size                                    # the height and width of the map
+        self.cluster_size = cluster_size                    # the height and width of the clusters
+        self.cells = []                                     # the cell of each entrance
+        self.index = {}                                     # the entrance of each cell
+        self.edges = []                                     # the (cell, cost, operators) edges of each entrance
+        self.clusters = {}                                  # the entrances of each cluster
+        self.checksum = 0                                   # the checksum of the map
+
+    def add_entrance(self, cell):
+        '''
+        Method used to add an entrance on a cell, if the cell is not an entrance already
+        @param cell: the cell of the entrance
+        @return: the entrance
+        '''
+        if cell not in self.index:
+            self.index[cell] = len(self.cells)
+            self.cells.append(cell)
+            self.edges.append([])
+            self.clusters.setdefault(self.get_cluster(cell), []).append(cell)
+        return self.index[cell]
+
+    def add_edge(self, first, second, cost, operators):
+        '''
+        Method used to add an edge from one entrance to another
+        @param first: the entrance the edge starts from
+        @param second: the entrance the edge ends on
+        @param cost: the cost of the path of the edge
+        @param operators: the operator codes of the path as bytes
+        @return: none
+        '''
+        self.edges[first].append((self.cells[second], cost, operators))
+
+    def get_cluster(self, cell):
+        '''
+        get the cluster of a cell
+        @param cell: the cell on the map
+        @return: the (row, column) of the cluster
+        '''
+        x, y = divmod(cell, self.size)
+        return (x // self.cluster_size, y // self.cluster_size)
+
+    def get_area(self, cluster):
+        '''
+        get the cells covered by a cluster, the clusters on the last row and column can be smaller
+        @param cluster: the (row, column) of the cluster
+        @return: the first row, the first column, the row after the last and the column after the last
+        '''
+        x = cluster[0] * self.cluster_size
+        y = cluster[1] * self.cluster_size
+        return (x, y, min(x + self.cluster_size, self.size), min(y + self.cluster_size, self.size))
+
+    def get_neighbours(self, cell):
+        '''
+        get the edges from a cell of the abstract graph
+        @param cell: the cell of the entrance
+        @return: a list of (cell, cost, operators) edges
+        '''
+        if cell not in self.index:
+            return []
+        return self.edges[self.index[cell]]
+
+########################################################################################################################
+########################################################################################################################
+
+class DistanceField:
+    '''
+    The DistanceField Class stores the cost of the cheapest path from every cell on the map to the nearest of a set of
+    source cells, and the first move of that path. Every move can be made in reverse at the same cost, so the field
+    also gives the cheapest paths from the sources to every cell. Any path to or from the sources is then found by
+    following the moves, without a search
+    '''
+    def __init__(self, graph, sources):
+        '''
+        Method used to calculate the field of a set of source cells with Dijkstra's algorithm
+        @param graph: the search graph of the map
+        @param sources: the source cells
+        '''
+        self.graph = graph                                          # the search graph of the map
+        self.sources = frozenset(sources)                           # the source cells
+        self.operators = bytearray(graph.size * graph.size)         # the first move towards the sources, 0 if none
+        self.distances = graph.get_distances(list(self.sources), self.operators, graph.stats)   # the cost to sources
+
+    def get_predecessor(self, cell):
+        '''
+        get the next cell on the cheapest path from a cell to the sources
+        @param cell: the cell on the map
+        @return: the next cell, -1 if the cell is a source or cannot reach a source
+        '''
+        action = self.operators[cell]
+        if action == 0:
+            return -1
+        i, j, code, step = self.graph.DIRECTIONS[self.graph.DIRECTION_BITS[action]]
+        return cell + i * self.graph.size + j
+
+    def get_path(self, cell):
+        '''
+        get the cheapest path from a cell to the nearest source
+        @param cell: the first cell of the path
+        @return: the list of cells from the cell to the source, None if no source can be reached
+        '''
+        if self.distances[cell] == UNREACHABLE:
+            return None
+        path = [cell]
+        while self.operators[path[-1]] != 0:
+            path.append(self.get_predecessor(path[-1]))
+        return path
+
+########################################################################################################################
+########################################################################################################################
+
+class Replanner:
+    '''
+    The Replanner Class keeps the state of a D* Lite search from the goal cells towards the start cell between
+    searches. Every cell has the cost g of its cheapest path to the goals found so far and the cost rhs computed from
+    the g of its neighbours, and only the cells where the two differ are kept in the queue. When cells of the map
+    change, only the cells whose moves changed are queued again, so a new search repairs the part of the last search
+    that was affected instead of starting over. The start cell can move between searches
+    '''
+    def __init__(self, graph, goals):
+        '''
+        Method used to instantiate a class with the goal cells as the only consistent cells
+        @param graph: the search graph of the map
+        @param goals: the goal cells
+        '''
+        cells = graph.size * graph.size
+        self.graph = graph                                      # the search graph of the map
+        self.goals = frozenset(goals)                           # the goal cells
+        self.g = array('I', [UNREACHABLE]) * cells              # the cost to the goals found so far
+        self.rhs = array('I', [UNREACHABLE]) * cells            # the cost to the goals through the best neighbour
+        self.queue = PriorityQueue(cells)                       # the cells where g and rhs differ
+        self.start = -1                                         # the start cell of the last search
+        self.offset = 0                                         # the sum of the heuristic moves of the start cell
+        for goal in self.goals:
+            self.rhs[goal] = 0
+            self.queue.push(goal, self.get_key(goal))
+
+    def heuristic(self, cell):
+        '''
+        get a lower bound of the cost between the start cell and a cell, the same as SearchGraph.lower_bound
+        @param cell: the cell on the map
+        @return: the lower bound of the cost
+        '''
+        if self.start < 0:
+            return 0
+        x, y = divmod(cell, self.graph.size)
+        start_X, start_Y = divmod(self.start, self.graph.size)
+        dx = abs(x - start_X)
+        dy = abs(y - start_Y)
+        return max(dx, dy) + (dx + dy) % 2
+
+    def get_key(self, cell):
+        '''
+        get the priority of a cell in the queue, the estimated cost of a path from the start through the cell and then
+        the cost to the goals, packed in one integer
+        @param cell: the cell on the map
+        @return: the priority as an integer
+        '''
+        cost = min(self.g[cell], self.rhs[cell])
+        return (cost + self.heuristic(cell) + self.offset) << 32 | cost
+
+    def set_start(self, cell):
+        '''
+        move the start cell. The priorities in the queue are not recalculated, instead the lower bound of the move is
+        added to the priorities from now on
+        @param cell: the new start cell
+        @return: none
+        '''
+        if self.start >= 0:
+            self.offset += self.heuristic(cell)
+        self.start = cell
+
+    def update_cell(self, cell):
+        '''
+        recalculate the rhs of a cell from its neighbours, and add it to or remove it from the queue
+        @param cell: the cell on the map
+        @return: none
+        '''
+        graph = self.graph
+        if cell not in self.goals:
+            best = UNREACHABLE
+            for i, j, action, step in graph.MOVE_TABLE[graph.MOVES[cell]]:
+                cost = self.g[cell + i * graph.size + j]
+                if cost != UNREACHABLE and cost + step < best:
+                    best = cost + step
+            self.rhs[cell] = best
+        if self.g[cell] != self.rhs[cell]:
+            self.queue.push(cell, self.get_key(cell))
+            if graph.stats is not None:
+                graph.stats.add_push(len(self.queue))
+        elif cell in self.queue:
+            self.queue.remove(cell)
+
+    def update_cells(self, cells):
+        '''
+        queue again the cells whose moves changed. The moves go both ways, so both ends of a changed move are given
+        @param cells: the cells whose move masks changed
+        @return: none
+        '''
+        for cell in cells:
+            self.update_cell(cell)
+
+    def search(self):
+        '''
+        method used to process the queue until the cost of the start cell is known
+        @return: the number of cells taken from the queue
+        '''
+        graph = self.graph
+        queue = self.queue
+        stats = graph.stats
+        g = self.g
+        count = 0
+        while len(queue) > 0:
+            cell = queue.peek()
+            key = queue.get_priority(cell)
+            if key >= self.get_key(self.start) and self.rhs[self.start] == g[self.start]:
+                break
+            count += 1
+            new_key = self.get_key(cell)
+            if key < new_key:
+                # the start moved since the cell was added, add it again with its current priority
+                queue.push(cell, new_key)
+                if stats is not None:
+                    stats.add_push(len(queue))
+            elif g[cell] > self.rhs[cell]:
+                # the cell got cheaper, pass its cost on to the neighbours
+                g[cell] = self.rhs[cell]
+                queue.pop()
+                if stats is not None:
+                    stats.add_pop()
+                for i, j, action, step in graph.MOVE_TABLE[graph.MOVES[cell]]:
+                    self.update_cell(cell + i * graph.size + j)
+            else:
+                # the cell got more expensive, recalculate it and the neighbours that may depend on it
+                g[cell] = UNREACHABLE
+                queue.pop()
+                if stats is not None:
+                    stats.add_pop()
+                self.update_cell(cell)
+                for i, j, action, step in graph.MOVE_TABLE[graph.MOVES[cell]]:
+                    self.update_cell(cell + i * graph.size + j)
+        return count
+
+    def get_path(self):
+        '''
+        get the cheapest path from the start cell to the goals by moving to the neighbour with the lowest cost each time
+        @return: the list of cells from the start to a goal, None if no goal can be reached
+        '''
+        graph = self.graph
+        cell = self.start
+        if self.g[cell] == UNREACHABLE:
+            return None
+        path = [cell]
+        while cell not in self.goals:
+            best = None
+            for i, j, action, step in graph.MOVE_TABLE[graph.MOVES[cell]]:
+                new_cell = cell + i * graph.size + j
+                if self.g[new_cell] != UNREACHABLE and (best is None or self.g[new_cell] + step < best[0]):
+                    best = (self.g[new_cell] + step, new_cell)
+            cell = best[1]
+            path.append(cell)
+        return path
+
+########################################################################################################################
+########################################################################################################################
+
+class GoalIndex:
+    '''
+    The GoalIndex Class finds the distance to the nearest of a set of points, as the larger of the distances in the x
+    and y directions. The points are put in square buckets on a grid, and the buckets are searched in square rings of
+    growing distance around the query until no bucket of the next ring can hold a nearer point
     '''
-    def __init__(self, identifier, operator, order_of_expansion, cost, heuristic, parent, coordinates):
+    def __init__(self, points, bucket_size):
         '''
         Method used to instantiate a class
-        @param identifier: an unique integer value for the node
-        @param operator: the operator that generated the node from parent
-        @param order_of_expansion: the order in which this node was expanded
-        @param cost: the cost to reach this node
-        @param heuristic: the estimated cost to reach the goal from this node
-        @param parent: reference to the parent node
-        @param coordinates: the coordinates of this node on the node map
-        '''
-        self.identifier = identifier                        # an unique integer value for the node
-        self.operator = operator                            # the operator that generated the node from parent
-        self.order_of_expansion = order_of_expansion        # the order in which this node was expanded
-        self.cost = cost                                    # the cost to reach this node
-        self.heuristic = heuristic                          # the estimated cost to reach the goal from this node
-        self.f = cost + heuristic                           # the sum of the actual cost and estimated cost
-        self.parent = parent                                # reference to the parent node
-        self.children = []                                  # the list of child nodes of this node
-        self.coordinates = coordinates                      # the coordinates of this node on the node map
-        self.isGOAL = False                                 # flag to determine whether its a goal state or not
-        self.best_operators = ['LU', 'RU', 'LD', 'RD']
-
-    def get_ancestors(self):
-        '''
-        This method is used to generate the ancestors of a given node
-        @return: a list of ancestors of the node
-        '''
-        ancestor_list = []
-        current_node = self.parent
-        # Loop to the start node and get the list of ancestors
-        while current_node != None:
-            ancestor_list.append(current_node)
-            current_node = current_node.parent
-        return ancestor_list
+        @param points: the list of (x, y) points
+        @param bucket_size: the height and width of the buckets
+        '''
+        self.bucket_size = bucket_size                      # the height and width of the buckets
+        self.buckets = {}                                   # the points in each bucket
+        for x, y in points:
+            self.buckets.setdefault((x // bucket_size, y // bucket_size), []).append((x, y))
+        self.first_X = min(bucket[0] for bucket in self.buckets)       # the range of the buckets with points
+        self.last_X = max(bucket[0] for bucket in self.buckets)
+        self.first_Y = min(bucket[1] for bucket in self.buckets)
+        self.last_Y = max(bucket[1] for bucket in self.buckets)
 
-    def get_operators_to_root(self):
+    def nearest(self, x, y):
         '''
-        This method is used to generate the path from the node to the root(start), traversing through the parent
-        @return: the path from the start node as a string
+        get the distance from a point to the nearest point in the index
+        @param x: the x coordinate
+        @param y: the y coordinate
+        @return: the distance as max(dx, dy)
         '''
-        current = self
-        output = ''
-        first = True
-        while current != None:
-            if current.isGOAL:
-                output += '-G'
-            if first:
-                output = str(current.operator) + output
-                first = False
-            else:
-                output =  str(current.operator) + '-' + output
-            current = current.parent
-        return output
+        bucket_X = x // self.bucket_size
+        bucket_Y = y // self.bucket_size
+        # the ring that reaches the farthest bucket with points
+        last_ring = max(abs(bucket_X - self.first_X), abs(bucket_X - self.last_X),
+                        abs(bucket_Y - self.first_Y), abs(bucket_Y - self.last_Y))
+        best = None
+        ring = 0
+        while ring <= last_ring:
+            # a point in a bucket of the ring is more than (ring - 1) * bucket_size away
+            if best is not None and best <= (ring - 1) * self.bucket_size:
+                break
+            for i in range(-ring, ring + 1):
+                # the top and bottom rows of the ring, then the left and right columns without their corners
+                if abs(i) == ring:
+                    buckets = [(bucket_X + i, bucket_Y + j) for j in range(-ring, ring + 1)]
+                else:
+                    buckets = [(bucket_X + i, bucket_Y - ring), (bucket_X + i, bucket_Y + ring)]
+                for bucket in buckets:
+                    for point_X, point_Y in self.buckets.get(bucket, ()):
+                        distance = max(abs(x - point_X), abs(y - point_Y))
+                        if best is None or distance < best:
+                            best = distance
+            ring += 1
+        return best
 
-    def __lt__(self, other):
+########################################################################################################################
+########################################################################################################################
+
+class ResultCache:
+    '''
+    The ResultCache Class stores the results of searches so that a search that was already run is not run again. The
+    results are kept in two tiers: the most recently used results in memory, and all the results in files in a
+    directory on disk. When the files go over the size limit, the least recently used ones are removed. A solution
+    longer than result_size is not kept, so that a long solution is not held in memory to be cached
+    '''
+    def __init__(self, directory=None, entries=128, disk_size=64 * 1024 * 1024, result_size=1024 * 1024):
         '''
-        This method is used to override the less than operator in python to use the f cost for comparison
-        @param other: the other node to be compared
-        @return: boolean value stating whether its less than or not
+        Method used to instantiate an empty cache
+        @param directory: the directory of the files on disk, None to keep the results in memory only
+        @param entries: the number of results kept in memory
+        @param disk_size: the total size of the files on disk in bytes
+        @param result_size: the length of the longest solution kept in characters
         '''
-        if (self.f < other.f):
-            return True
-        elif(self.f == other.f ):
-            if self.operator in self.best_operators:
-                return True
-            elif other.operator in other.best_operators:
-                return False
-            else:
-                return True
-        else:
-            return False
+        self.directory = directory                          # the directory of the files on disk
+        self.entries = entries                              # the number of results kept in memory
+        self.disk_size = disk_size                          # the total size of the files on disk in bytes
+        self.result_size = result_size                      # the length of the longest solution kept
+        self.memory = OrderedDict()                         # the results in memory from the least recently used
+        self.disk_used = None                               # the total size of the files, None until counted
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
 
-    def __len__(self):
+    @staticmethod
+    def get_key(map_digest, procedure_name, bound, flag, query=None, options=()):
         '''
-        This method is used to return the depth of the node from the root node. It traverse though the parents to get
-        to the root node.
-        @return: the depth of the node as an integer
+        get the key of the result of a search
+        @param map_digest: the digest of the map from map_digest
+        @param procedure_name: name of the algorithm used
+        @param bound: the bound of the search, None if it has no bound
+        @param flag: the number of node expansions displayed
+        @param query: the (start x, start y, goal x, goal y) coordinates, None for the start and goal on the map
+        @param options: any other setting that changes the result
+        @return: the key as a string of hexadecimal digits
         '''
-        count = 0
-        current_node = self
-        while current_node != None:
-            count += 1
-            current_node = current_node.parent
-        return count - 1
+        return hashlib.sha256(repr((map_digest, procedure_name, bound, flag, query, tuple(options)))
+                              .encode('ascii')).hexdigest()
 
-    def __str__(self):
+    def get(self, key):
         '''
-        This method converts the node into a string for output
-        @return: a string with all the data as a string
+        get a result from the cache, a result found on disk is also kept in memory
+        @param key: the key of the result
+        @return: the result, None if it is not in the cache
         '''
+        if key in self.memory:
+            self.memory.move_to_end(key)
+            return self.memory[key]
+        if self.directory is None:
+            return None
+        file_name = os.path.join(self.directory, key)
+        try:
+            with open(file_name) as file_handle:
+                value = json.load(file_handle)
+            # mark the file as used so that it is removed last
+            os.utime(file_name)
+        except (FileNotFoundError, ValueError):
+            return None
+        self.remember(key, value)
+        return value
 
-        # Converts the child array to a string
-        children_str = ''
-        if (len(self.children)) > 0:
-            for i in range(len(self.children) - 1):
-                children_str += 'N' + str(self.children[i].identifier) + ':' + self.children[i].get_operators_to_root() + ','
-            children_str += 'N' + str(self.children[-1].identifier) + ':' + self.children[-1].get_operators_to_root()
+    def put(self, key, value):
+        '''
+        add a result to the cache
+        @param key: the key of the result
+        @param value: the result, any value that can be written as JSON
+        @return: none
+        '''
+        self.remember(key, value)
+        if self.directory is None:
+            return
+        # write to a temporary file first so that other processes never read a partly written file
+        file_name = os.path.join(self.directory, key)
+        temporary_name = file_name + '.' + str(os.getpid()) + '.tmp'
+        with open(temporary_name, 'w') as file_handle:
+            json.dump(value, file_handle)
+        os.replace(temporary_name, file_name)
+        if self.disk_used is not None:
+            self.disk_used += os.path.getsize(file_name)
+        if self.disk_used is None or self.disk_used > self.disk_size:
+            self.evict()
 
-        # Combined all the data and return as a string
-        return "N" + str(self.identifier) + ':' \
-               + self.get_operators_to_root() + '\t' \
-               + str(self.order_of_expansion) + ' ' \
-               + str(self.cost) + ' ' \
-               + str(self.heuristic) + ' ' \
-               + str(self.f) + '\n' \
-               + 'Children:\t{' + children_str + '}'
+    def remember(self, key, value):
+        '''
+        add a result to the memory tier, removing the least recently used result when it is full
+        @param key: the key of the result
+        @param value: the result
+        @return: none
+        '''
+        self.memory[key] = value
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.entries:
+            self.memory.popitem(last=False)
+
+    def evict(self):
+        '''
+        count the size of the files on disk and remove the least recently used files until it is within the limit
+        @return: none
+        '''
+        files = []
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and not entry.name.endswith('.tmp'):
+                status = entry.stat()
+                files.append((status.st_mtime, status.st_size, entry.path))
+        files.sort()
+        self.disk_used = sum(size for modified, size, path in files)
+        for modified, size, path in files:
+            if self.disk_used <= self.disk_size:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            self.disk_used -= size
 
 ########################################################################################################################
 ########################################################################################################################
@@ -133,30 +1790,90 @@ class SearchGraph:
     '''
     This class is used to maintain all the necessary information for the search
     '''
-    def __init__(self, size):
+    def __init__(self, size, tiled=None):
         '''
         Instantiate the class with the default values and gets the size as an input
         @param size: the height and width of the map (size x size)
+        @param tiled: True to keep the nodes, the explored flags and the frontier positions in TileArrays, False for
+        arrays of every cell, None to use TileArrays for maps of more than TILED_CELLS cells
         '''
-        self.OPEN = []                                                              # Frontier list
-        self.CLOSED = []                                                            # Explored list
+        self.size = int(size)                                                       # Height and width of the map
+        if tiled is None:
+            tiled = self.size * self.size > TILED_CELLS
+        self.tiled = tiled                                                          # Whether the arrays are tiled
+        self.OPEN = []                                                              # Frontier list/queue of cells
+        self.CLOSED = []                                                            # Explored list of traced cells
+        self.CLOSED_MAP = self.new_array('B', 0)                                    # Explored flags for each cell
         self.ACTIONS = [['LU','U','RU'],['L','O','R'],['LD','D','RD']]              # All Actions
-        self.MAP = [[0 for h in range(int(size))] for w in range(int(size))]        # Real map
-        self.NODEMAP = [[None for h in range(int(size))] for w in range(int(size))] # Node map
+        self.ACTION_CODES = [[NodeStore.OPERATORS.index(action) for action in row]  # Operator codes of the actions
+                             for row in self.ACTIONS]
+        self.BEST_OPERATORS = [NodeStore.OPERATORS.index(action)                    # Codes of the diagonal actions
+                               for action in ['LU', 'RU', 'LD', 'RD']]
+        self.DIRECTIONS = [(i, j, self.ACTION_CODES[i + 1][j + 1],                  # Moves in the order of the bits
+                            self.get_cost(self.check_diagonal(i, j)))               # of a move mask
+                           for i in range(-1, 2) for j in range(-1, 2) if i != 0 or j != 0]
+        self.MOVE_TABLE = [[move for bit, move in enumerate(self.DIRECTIONS)        # Moves allowed by each move mask
+                            if mask >> bit & 1] for mask in range(256)]
+        self.DIRECTION_BITS = {action: bit for bit, (i, j, action, step)             # Bit of each operator code
+                               in enumerate(self.DIRECTIONS)}
+        self.OPPOSITE_ACTIONS = bytearray(range(256))                               # Operator code of the opposite
+        for i, j, action, step in self.DIRECTIONS:                                  # move of each operator code
+            self.OPPOSITE_ACTIONS[action] = self.ACTION_CODES[1 - i][1 - j]
+        self.NATURAL = self.get_natural_moves()                                     # Jump moves after each move
+        self.ALTERNATIVES = self.get_alternative_moves()                            # Paths that replace other moves
+        self.MOVES = None                                                           # Move mask of each cell
+        self.FREE = self.new_array('B', 0)                                          # Open area flags of the cells
+        self.FORCED = {}                                                            # Forced moves of reached cells
+        self.MAP = []                                                               # Real map, a string per row
+        self.NODES = NodeStore(self.size, tiled)                                    # Node data for each cell
+        self.BACKWARD = None                                                        # Backward node data for each cell
+        self.BACKWARD_OPEN = None                                                   # Backward frontier queue of cells
+        self.STARTS = []                                                            # Cells of the start nodes
+        self.CHILDREN = {}                                                          # Child cells of traced nodes
         self.GOAL_COORD = [0,0]                                                     # Coordinates of the goal node
+        self.GOAL_COORDS = [self.GOAL_COORD]                                        # Coordinates of all goal nodes
+        self.GOAL_INDEX = None                                                      # Spatial index of many goals
+        self.GOALS = set()                                                          # Cells of the goal nodes
+        self.LANDMARKS = None                                                       # Cells of the landmarks
+        self.LANDMARK_TABLES = None                                                 # Distances to each landmark
+        self.GOAL_DISTANCES = []                                                    # Landmark distances of the goals
+        self.HIERARCHY = None                                                       # Abstract graph of the clusters
+        self.FIELDS = OrderedDict()                                                 # Distance fields of the sources
+        self.field_limit = 4                                                        # Number of distance fields kept
+        self.INCONS = []                                                            # Explored cells improved later
+        self.weight = None                                                          # Weight of the anytime round
+        self.REPLANNER = None                                                       # Kept state of the D* Lite search
+        self.solution = None                                                        # Cell of the goal reached
         self.node_count = 0                                                         # Number of nodes generated
         self.expansion_count = 1                                                    # Number of nodes expanded
+        self.trace = Trace()                                                        # Debug display of expansions
+        self.stats = None                                                           # Times and counters, if kept
 
         self.options = {                            # set of options for the graph search
             'display_output' : True,                # flag to decide whether to display the output or not
             'display_map' : True,                   # flag to decide whether to display the map in the output
-            'display_node_expansion' : 0,           # integer to keep track of the count of node expansions to print
             'goal_reached': False,                  # flag to keep track whether the goal has been reached
             'algorithm' : 'D',                      # stores which algorithm to use for the search
             'bound' : None,                           # stores the bound for the DLS search
+            'deepen' : False,                       # flag to grow the bound by iterative deepening
+            'jump' : False,                         # flag to expand jump points instead of neighbours
+            'anytime' : False,                      # flag to improve a weighted A star path until the deadline
+            'weight' : ARA_WEIGHT,                  # stores the weight of the heuristic in the first anytime round
+            'deadline' : None,                      # stores the time in seconds for the anytime search, None if none
             'show_time' : True                      # flag to store whether to display time taken
         }
 
+    def new_array(self, typecode, default):
+        '''
+        allocate an array with a value for each cell of the map, a TileArray if the graph is tiled
+        @param typecode: the type code of the values as for array
+        @param default: the value of every cell
+        @return: the array
+        '''
+        if self.tiled:
+            return TileArray(typecode, default)
+        return array(typecode, [default]) * (self.size * self.size)
+
     def add_map(self, map):
         '''
         add the input map into the graph search instance, generate the initial start node and determine the coordinates
@@ -164,104 +1881,1154 @@ class SearchGraph:
         @param map: the input map after reading the file
         @return: none
         '''
-        for i in range(len(self.MAP)):
-            for j in range(len(self.MAP)):
-                self.MAP[i][j] = map[i + 1][j]                                      # add the content to the map
-                if map[i+1][j] == 'S':
-                    new_Node = Node(self.node_count, 'S', 1, 0, 0, None, [i, j])    # generate the start node
-                    self.NODEMAP[i][j] = new_Node                                   # add the start node to the node map
-                    self.OPEN.append(new_Node)                                      # add start node to open list
-                    self.node_count += 1                                            # increase node count
-                if map[i + 1][j] == 'G':
-                    self.GOAL_COORD[0] = i + 1                                      # store the goal coordinates
-                    self.GOAL_COORD[1] = j
+        goals = []
+        for i in range(self.size):
+            row = ''.join(map[i + 1][:self.size])
+            self.MAP.append(row)                                                    # add the content to the map
+            j = row.find('S')
+            while j >= 0:
+                self.add_start(i * self.size + j)                                   # generate the start node
+                j = row.find('S', j + 1)
+            j = row.find('G')
+            while j >= 0:
+                goals.append(i * self.size + j)
+                j = row.find('G', j + 1)
+        self.set_goals(goals)                                                       # store the goal coordinates
+        self.add_moves()
+
+    def add_grid(self, grid):
+        '''
+        add a map read by read_grid into the graph search instance. The start and goal cells are located with array
+        operations and the map is copied row by row, so no work is done for each cell in python
+        @param grid: the map as a size x size NumPy array of terrain codes
+        @return: none
+        '''
+        self.MAP = [row.tobytes().decode('ascii') for row in grid]
+        for cell in numpy.flatnonzero(grid == ord('S')):
+            self.add_start(int(cell))                                               # generate the start node
+        self.set_goals([int(cell) for cell in numpy.flatnonzero(grid == ord('G'))])  # store the goal coordinates
+        self.add_moves(grid)
+
+    def add_mapped_map(self, mapped_map):
+        '''
+        add a map opened by map_file into the graph search instance without copying it. The map stays in the mapped
+        file and the move mask of a cell is only computed when the cell is expanded, so only the parts of a binary grid
+        that the search reaches are read. A text map is read once to find the start and goal cells
+        @param mapped_map: the map as a MappedMap
+        @return: none
+        '''
+        self.MAP = mapped_map
+        # the start and goal cells of a binary grid are in its header, a text map is searched for them
+        starts = mapped_map.starts if mapped_map.starts is not None else mapped_map.find('S')
+        goals = mapped_map.goals if mapped_map.goals is not None else mapped_map.find('G')
+        for cell in starts:
+            self.add_start(cell)                                                    # generate the start node
+        self.set_goals(goals)                                                       # store the goal coordinates
+        self.MOVES = MoveCache(self)
+
+    def set_goals(self, cells):
+        '''
+        set the goal cells of the search. The heuristic estimates the distance to the nearest goal. A single goal is
+        stored one row down in GOAL_COORD as the map reading has always done, so that the output of single goal maps
+        does not change. With several goals, the estimate one row down could make a goal look farther than another
+        goal and lose the tie to it, so GOAL_COORDS holds the coordinates of the goals themselves. With many goals, the
+        goals are also put in a spatial index
+        @param cells: the list of goal cells
+        @return: none
+        '''
+        self.GOALS = set(cells)
+        if len(cells) > 0:
+            x, y = divmod(cells[-1], self.size)
+            self.GOAL_COORD = [x + 1, y]
+            self.GOAL_COORDS = [self.GOAL_COORD]
+            if len(cells) > 1:
+                self.GOAL_COORDS = [list(divmod(cell, self.size)) for cell in cells]
+        else:
+            self.GOAL_COORDS = [self.GOAL_COORD]
+        self.GOAL_INDEX = None
+        if len(self.GOAL_COORDS) >= GOAL_INDEX_MIN:
+            # buckets of about one goal each when the goals are spread over the map
+            bucket_size = max(4, self.size // int(len(self.GOAL_COORDS) ** 0.5))
+            self.GOAL_INDEX = GoalIndex(self.GOAL_COORDS, bucket_size)
+        self.set_landmark_goals()
+
+    def reset(self):
+        '''
+        remove the nodes and the search state of the last search so that the graph can be searched again with a new
+        start and goal. The map, the move masks and the allocated arrays are kept, and only the cells touched by the
+        last search are cleared
+        @return: none
+        '''
+        if self.tiled:
+            self.CLOSED_MAP.clear()
+        else:
+            for cell in self.NODES.generated:
+                self.CLOSED_MAP[cell] = 0
+        self.NODES.reset()
+        if self.BACKWARD is not None:
+            self.BACKWARD.reset()
+            self.BACKWARD_OPEN.clear()
+        if isinstance(self.OPEN, PriorityQueue):
+            self.OPEN.clear()
+        else:
+            self.OPEN = []
+        self.CLOSED = []
+        self.CHILDREN = {}
+        self.STARTS = []
+        self.INCONS = []
+        self.weight = None
+        self.node_count = 0
+        self.expansion_count = 1
+        self.solution = None
+        self.options['goal_reached'] = False
+        self.trace = Trace()
+
+    def add_start(self, cell):
+        '''
+        generate a start node on a cell and add it to the open list
+        @param cell: the cell of the start node
+        @return: none
+        '''
+        self.NODES.add(cell, self.node_count, 0, 1, 0, 0, -1)                       # generate the start node
+        self.push(cell)                                                             # add start node to open list
+        self.STARTS.append(cell)                                                    # keep the start cell to replan
+        self.node_count += 1                                                        # increase node count
+
+    def add_moves(self, grid=None):
+        '''
+        precompute the legal moves from every cell as a mask with one bit for each move in DIRECTIONS, following the
+        same rules as check_ridge: a move cannot end on a ridge and a diagonal move cannot pass a ridge on either of
+        the two cells next to both the current and the new cell
+        @param grid: the map as a NumPy array of terrain codes to compute the masks with array operations, if None the
+        masks are computed from self.MAP
+        @return: none
+        '''
+        size = self.size
+        self.MOVES = bytearray(size * size)
+        if grid is not None:
+            # surround the map with ridges so that the moves out of bounds are never legal
+            passable = numpy.zeros((size + 2, size + 2), dtype=bool)
+            passable[1:-1, 1:-1] = grid != ord('X')
+            centre = passable[1:-1, 1:-1]
+            up = centre & passable[:-2, 1:-1]
+            down = centre & passable[2:, 1:-1]
+            left = centre & passable[1:-1, :-2]
+            right = centre & passable[1:-1, 2:]
+            moves = [up & left & passable[:-2, :-2], up, up & right & passable[:-2, 2:], left, right,
+                     down & left & passable[2:, :-2], down, down & right & passable[2:, 2:]]
+            masks = numpy.zeros((size, size), dtype=numpy.uint8)
+            for bit, move in enumerate(moves):
+                masks |= move.astype(numpy.uint8) << bit
+            self.MOVES = bytearray(masks.tobytes())
+            return
+
+        # each row is an integer with a byte for each cell, 1 if the cell is not a ridge, so that a move is worked out
+        # for the whole row at once. A shift by 8 bits moves the row by one cell, and as every byte is 0 or 1, a shift
+        # by less than 8 bits puts the move in its bit of the mask without reaching the next byte
+        passable = [int.from_bytes(row.encode('ascii').translate(PASSABLE), 'big') for row in self.MAP]
+        for x in range(size):
+            centre = passable[x]
+            above = passable[x - 1] if x > 0 else 0
+            below = passable[x + 1] if x < size - 1 else 0
+            # check the straight moves first, a diagonal move needs both of its straight neighbours
+            up = centre & above
+            down = centre & below
+            left = centre & centre >> 8
+            right = centre & centre << 8
+            masks = (up & left & above >> 8) \
+                    | up << 1 \
+                    | (up & right & above << 8) << 2 \
+                    | left << 3 \
+                    | right << 4 \
+                    | (down & left & below >> 8) << 5 \
+                    | down << 6 \
+                    | (down & right & below << 8) << 7
+            self.MOVES[x * size:(x + 1) * size] = masks.to_bytes(size, 'big')
+
+    def get_moves(self, cell):
+        '''
+        compute the move mask of a single cell using check_ridge, for maps where the masks are not precomputed
+        @param cell: the cell on the map
+        @return: the move mask of the cell
+        '''
+        current_X, current_Y = divmod(cell, self.size)
+        if self.MAP[current_X][current_Y] == 'X':
+            return 0
+        mask = 0
+        for bit, (i, j, action, step) in enumerate(self.DIRECTIONS):
+            new_X = current_X + i
+            new_Y = current_Y + j
+            if new_X >= 0 and new_Y >= 0 and new_X < self.size and new_Y < self.size and \
+                    not self.check_ridge(current_X, current_Y, new_X, new_Y, self.check_diagonal(i, j)):
+                mask |= 1 << bit
+        return mask
 
-    def expand(self, node):
+    def expand(self, cell):
         '''
         method used to expand the node based on the rules and possible actions
-        @param node: reference to the current node
+        @param cell: the cell of the current node
+        @return: none
+        '''
+        nodes = self.NODES
+        current_X, current_Y = divmod(cell, self.size)
+        # the children are only kept while the node expansions are displayed
+        children = None
+        if self.trace.active:
+            children = self.CHILDREN.setdefault(cell, [])
+
+        # get the i and j values for all the legal actions around the current node, the moves that go out of bounds
+        # or hit a ridge are already removed from the move mask of the cell
+        for i, j, action, step in self.MOVE_TABLE[self.MOVES[cell]]:
+            # get the new coodinate
+            new_X = current_X + i
+            new_Y = current_Y + j
+            new_cell = new_X * self.size + new_Y
+
+            # calculate the cost for the move
+            new_cost = nodes.cost[cell] + step
+
+            # Check if its in the ancestor list
+            # check whether the new location is on the path to the current node
+            if not self.check_ancestor(cell, new_cell):
+
+                # check whether if there already exist a path
+                if new_cell in nodes:
+
+                    if new_cost < nodes.cost[new_cell]:
+                        # if less, then update the node to the new action, cost, heuristic and parent
+                        nodes.update(new_cell, action, new_cost, self.heuristic(new_X, new_Y), cell)
+                        if self.stats is not None:
+                            self.stats.reopenings += 1
+
+                        # if the path cost is less than the current, add the node to the open list
+                        # or re-prioritise it in place if it is already there
+                        self.push(new_cell)
+
+                else:
+                    # if a path doesnt exist
+                    nodes.add(new_cell,                             # set the cell
+                              self.node_count,                      # set the identifier
+                              action,                               # set the action
+                              0,                                    # set the expansion order
+                              new_cost,                             # set the new cost
+                              self.heuristic(new_X, new_Y),         # calculate the heuristic
+                              cell                                  # set the parent
+                              )
+
+                    # increment the node identifier count
+                    self.node_count += 1
+
+                    # add the node to the open list
+                    self.push(new_cell)
+
+                # add the node to the children list
+                if children is not None:
+                    children.append(new_cell)
+
+    def bidirectional(self):
+        '''
+        method used to run a bidirectional A star search, with a forward search from the start nodes and a backward
+        search from the goal nodes. The side with the smaller frontier is expanded next. Every time one side reaches a
+        node of the other side, the cost of the path through that node is recorded. Both frontiers are ordered by
+        balanced_priority, and the search stops when the sum of the lowest priorities of the two frontiers reaches
+        twice the cost of the best path found, as no path through both frontiers can be cheaper. The backward search
+        follows the moves in reverse: a cell is a predecessor when the move from it is legal, so the ridge rule of
+        check_ridge holds in both directions
+        @return: the cell of the goal node reached, None if there is no path
+        '''
+        nodes = self.NODES
+        if self.BACKWARD is None:
+            self.BACKWARD = NodeStore(self.size, self.tiled)
+            self.BACKWARD_OPEN = PriorityQueue(self.size * self.size, self.new_array('i', -1))
+        backward = self.BACKWARD
+        backward_open = self.BACKWARD_OPEN
+        stats = self.stats
+        starts = list(self.OPEN)
+        goals = list(self.GOALS)
+
+        # generate the goal nodes of the backward search and estimate the cost of the start nodes
+        for cell in goals:
+            backward.add(cell, 0, 0, 0, 0, self.lower_bound(cell, starts), -1)
+            backward_open.push(cell, self.balanced_priority(backward, cell, goals))
+            if stats is not None:
+                stats.add_push(len(backward_open))
+        # the start nodes are pushed again with their balanced priority
+        self.OPEN.clear()
+        for cell in starts:
+            nodes.update(cell, 0, 0, self.lower_bound(cell, goals), -1)
+            self.OPEN.push(cell, self.balanced_priority(nodes, cell, starts))
+            if stats is not None:
+                stats.add_push(len(self.OPEN) + len(backward_open))
+
+        # the cost of the best path found and the cell where the two searches met
+        best = None
+        meeting = -1
+        for cell in starts:
+            if cell in backward:
+                best, meeting = 0, cell
+
+        while len(self.OPEN) > 0 and len(backward_open) > 0:
+            # stop when no path through both frontiers can be cheaper than the best path
+            if best is not None and \
+                    (self.balanced_priority(nodes, self.OPEN.peek(), starts) >> 1) + \
+                    (self.balanced_priority(backward, backward_open.peek(), goals) >> 1) >= 2 * best:
+                break
+
+            if len(self.OPEN) <= len(backward_open):
+                # expand the next node of the forward search
+                current = self.OPEN.pop()
+                if stats is not None:
+                    stats.add_pop()
+                self.CLOSED_MAP[current] = 1
+                children = None
+                if self.trace.active:
+                    self.CLOSED.append(current)
+                    children = self.CHILDREN.setdefault(current, [])
+
+                current_X, current_Y = divmod(current, self.size)
+                for i, j, action, step in self.MOVE_TABLE[self.MOVES[current]]:
+                    new_cell = (current_X + i) * self.size + current_Y + j
+                    new_cost = nodes.cost[current] + step
+                    if new_cell in nodes:
+                        if new_cost >= nodes.cost[new_cell]:
+                            continue
+                        nodes.update(new_cell, action, new_cost, nodes.heuristic[new_cell], current)
+                    else:
+                        nodes.add(new_cell, self.node_count, action, 0, new_cost,
+                                  self.lower_bound(new_cell, goals), current)
+                        self.node_count += 1
+                    self.OPEN.push(new_cell, self.balanced_priority(nodes, new_cell, starts))
+                    if stats is not None:
+                        stats.add_push(len(self.OPEN) + len(backward_open))
+                    if children is not None:
+                        children.append(new_cell)
+                    # record the path if the backward search has reached the node
+                    if new_cell in backward and (best is None or new_cost + backward.cost[new_cell] < best):
+                        best, meeting = new_cost + backward.cost[new_cell], new_cell
+
+                nodes.order_of_expansion[current] = self.expansion_count
+                self.expansion_count += 1
+                if self.trace.active:
+                    self.trace.record(self, current)
+            else:
+                # expand the next node of the backward search, the children are the cells that can move to it
+                current = backward_open.pop()
+                if stats is not None:
+                    stats.add_pop()
+                current_X, current_Y = divmod(current, self.size)
+                for bit, (i, j, action, step) in enumerate(self.DIRECTIONS):
+                    new_X = current_X - i
+                    new_Y = current_Y - j
+                    if new_X < 0 or new_Y < 0 or new_X >= self.size or new_Y >= self.size:
+                        continue
+                    new_cell = new_X * self.size + new_Y
+                    if not self.MOVES[new_cell] >> bit & 1:
+                        continue
+                    new_cost = backward.cost[current] + step
+                    if new_cell in backward:
+                        if new_cost >= backward.cost[new_cell]:
+                            continue
+                        backward.update(new_cell, action, new_cost, backward.heuristic[new_cell], current)
+                    else:
+                        backward.add(new_cell, 0, action, 0, new_cost, self.lower_bound(new_cell, starts), current)
+                    backward_open.push(new_cell, self.balanced_priority(backward, new_cell, goals))
+                    if stats is not None:
+                        stats.add_push(len(self.OPEN) + len(backward_open))
+                    # record the path if the forward search has reached the node
+                    if new_cell in nodes and (best is None or new_cost + nodes.cost[new_cell] < best):
+                        best, meeting = new_cost + nodes.cost[new_cell], new_cell
+                self.expansion_count += 1
+
+        if meeting < 0:
+            return None
+
+        # add the path of the backward search from the meeting node to the goal to the forward search
+        current = meeting
+        while backward.parent[current] >= 0:
+            parent = backward.parent[current]
+            action = backward.operator[current]
+            step = self.DIRECTIONS[self.DIRECTION_BITS[action]][3]
+            if parent in nodes:
+                nodes.update(parent, action, nodes.cost[current] + step, nodes.heuristic[parent], current)
+            else:
+                nodes.add(parent, self.node_count, action, 0, nodes.cost[current] + step,
+                          self.lower_bound(parent, goals), current)
+                self.node_count += 1
+            current = parent
+        return current
+
+    def add_hierarchy(self, cluster_size=16):
+        '''
+        build the abstract graph of the map for hierarchical path finding. An opening between two clusters is a run
+        of cells along their border where the straight move across the border is legal. A short opening has one
+        entrance on each side in its middle and a long opening has one at each end and one every ENTRANCE_SPACING
+        cells between them, so that a path along the opening does not have to go round by its ends. A diagonal move
+        across a border needs the two straight moves next to it to be legal, so these entrances keep every connection
+        between the clusters. The entrances of each cluster are then joined by the cheapest paths that stay inside the
+        cluster
+        @param cluster_size: the height and width of the clusters
         @return: none
         '''
+        size = self.size
+        hierarchy = Hierarchy(size, cluster_size)
+        hierarchy.checksum = self.map_checksum()
+        down = self.DIRECTION_BITS[NodeStore.OPERATORS.index('D')]
+        right = self.DIRECTION_BITS[NodeStore.OPERATORS.index('R')]
+        for bit, opposite, border, along in [(down, NodeStore.OPERATORS.index('U'), size, 1),
+                                             (right, NodeStore.OPERATORS.index('L'), 1, size)]:
+            action = self.DIRECTIONS[bit][2]
+            step = self.DIRECTIONS[bit][3]
+            for line in range(cluster_size - 1, size - 1, cluster_size):
+                for first in range(0, size, cluster_size):
+                    # the cells before the border in this pair of clusters, with a legal move across it
+                    cells = [line * border + position * along for position in range(first, min(first + cluster_size,
+                                                                                                  size))]
+                    run = []
+                    for cell in cells + [-1]:
+                        if cell >= 0 and self.MOVES[cell] >> bit & 1:
+                            run.append(cell)
+                            continue
+                        if len(run) > 0:
+                            entrances = [run[len(run) // 2]]
+                            if len(run) >= 6:
+                                entrances = run[:-1:ENTRANCE_SPACING] + [run[-1]]
+                            for entrance in entrances:
+                                inside = hierarchy.add_entrance(entrance)
+                                outside = hierarchy.add_entrance(entrance + border)
+                                hierarchy.add_edge(inside, outside, step, bytes([action]))
+                                hierarchy.add_edge(outside, inside, step, bytes([opposite]))
+                        run = []
+
+        # join the entrances of each cluster by the paths inside the cluster
+        for cluster, entrances in hierarchy.clusters.items():
+            paths = self.get_cluster_paths(entrances, hierarchy.get_area(cluster))
+            for index, entrance in enumerate(entrances):
+                for other, (cost, operators) in paths[index].items():
+                    hierarchy.add_edge(hierarchy.index[entrance], hierarchy.index[other], cost, operators)
+                    hierarchy.add_edge(hierarchy.index[other], hierarchy.index[entrance], cost,
+                                       self.reverse_operators(operators))
+        self.HIERARCHY = hierarchy
+
+    def get_cluster_paths(self, entrances, area):
+        '''
+        method used to find the cheapest paths between the entrances of a cluster without leaving the cluster. The
+        moves that stay inside the cluster are listed once for the cluster, by the place of the cell in the cluster,
+        and the paths from each entrance are then found by Dijkstra's algorithm over a ring of buckets as in
+        get_area_paths, on lists indexed by the places instead of dictionaries of the cells
+        @param entrances: the cells of the entrances of the cluster
+        @param area: the first row, the first column, the row after the last and the column after the last
+        @return: a list with a dictionary for each entrance, of the (cost, operator codes) of the path to each of the
+        later entrances that it reaches
+        '''
+        first_X, first_Y, last_X, last_Y = area
+        width = last_Y - first_Y
+        count = (last_X - first_X) * width
+        moves = []
+        for place in range(count):
+            x = first_X + place // width
+            y = first_Y + place % width
+            moves.append([((x + i - first_X) * width + y + j - first_Y, action, step)
+                          for i, j, action, step in self.MOVE_TABLE[self.MOVES[x * self.size + y]]
+                          if first_X <= x + i < last_X and first_Y <= y + j < last_Y])
+        places = [(cell // self.size - first_X) * width + cell % self.size - first_Y for cell in entrances]
+
+        paths = []
+        for index, source in enumerate(places):
+            distances = [UNREACHABLE] * count
+            distances[source] = 0
+            parents = [-1] * count
+            actions = bytearray(count)
+            buckets = [[source], [], []]
+            pending = 1
+            cost = 0
+            # the search stops when the paths to all the later entrances are known
+            targets = set(places[index + 1:])
+            while pending > 0 and len(targets) > 0:
+                bucket = buckets[cost % 3]
+                while len(bucket) > 0:
+                    place = bucket.pop()
+                    pending -= 1
+                    if distances[place] != cost:
+                        continue
+                    targets.discard(place)
+                    for new_place, action, step in moves[place]:
+                        if cost + step < distances[new_place]:
+                            distances[new_place] = cost + step
+                            parents[new_place] = place
+                            actions[new_place] = action
+                            buckets[(cost + step) % 3].append(new_place)
+                            pending += 1
+                cost += 1
+
+            # the operator codes of the paths to the later entrances
+            reached = {}
+            for other, place in zip(entrances[index + 1:], places[index + 1:]):
+                if distances[place] != UNREACHABLE:
+                    path_cost = distances[place]
+                    operators = bytearray()
+                    while place != source:
+                        operators.append(actions[place])
+                        place = parents[place]
+                    operators.reverse()
+                    reached[other] = (path_cost, bytes(operators))
+            paths.append(reached)
+        return paths
+
+    def get_area_paths(self, source, area):
+        '''
+        method used to find the cheapest paths from a cell to the cells of an area of the map, without leaving the
+        area, with Dijkstra's algorithm over a ring of buckets as in get_distances
+        @param source: the source cell
+        @param area: the first row, the first column, the row after the last and the column after the last
+        @return: a dictionary with the cost of each cell reached and a dictionary with the parent cell and the operator
+        code of the move that reached it
+        '''
+        first_X, first_Y, last_X, last_Y = area
+        distances = {source: 0}
+        parents = {}
+        buckets = [[source], [], []]
+        pending = 1
+        cost = 0
+        while pending > 0:
+            bucket = buckets[cost % 3]
+            while len(bucket) > 0:
+                cell = bucket.pop()
+                pending -= 1
+                if distances[cell] != cost:
+                    continue
+                current_X, current_Y = divmod(cell, self.size)
+                for i, j, action, step in self.MOVE_TABLE[self.MOVES[cell]]:
+                    new_X = current_X + i
+                    new_Y = current_Y + j
+                    if new_X < first_X or new_Y < first_Y or new_X >= last_X or new_Y >= last_Y:
+                        continue
+                    new_cell = new_X * self.size + new_Y
+                    if cost + step < distances.get(new_cell, UNREACHABLE):
+                        distances[new_cell] = cost + step
+                        parents[new_cell] = (cell, action)
+                        buckets[(cost + step) % 3].append(new_cell)
+                        pending += 1
+            cost += 1
+        return distances, parents
+
+    def get_area_operators(self, parents, cell):
+        '''
+        get the operator codes of the path to a cell found by get_area_paths
+        @param parents: the parents found by get_area_paths
+        @param cell: the last cell of the path
+        @return: the operator codes from the source to the cell as bytes
+        '''
+        operators = bytearray()
+        while cell in parents:
+            cell, action = parents[cell]
+            operators.append(action)
+        operators.reverse()
+        return bytes(operators)
+
+    def reverse_operators(self, operators):
+        '''
+        get the operator codes of a path followed backwards
+        @param operators: the operator codes of the path as bytes
+        @return: the operator codes of the reverse path as bytes
+        '''
+        return operators[::-1].translate(self.OPPOSITE_ACTIONS)
+
+    def hierarchical(self):
+        '''
+        method used to run the search on the abstract graph of the clusters. The start nodes are joined to the
+        entrances of their clusters, and the entrances of the clusters of the goals are joined to the goals, by the
+        paths inside the clusters. A star then searches the abstract graph, and the operators of the edges on the path
+        are followed from the start to add the nodes of the path to the node store. The cheapest path that crosses the
+        clusters at their entrances can cost more than the cheapest path on the map, so it is shortened by refine_path
+        first, which leaves it within a few percent of the lowest cost on the maps of benchmark.py
+        @return: the cell of the goal node reached, None if there is no path
+        '''
+        if self.HIERARCHY is None:
+            self.add_hierarchy()
+        hierarchy = self.HIERARCHY
+        starts = list(self.OPEN)
+        goals = list(self.GOALS)
+
+        # the edges from the start nodes and the edges to the goal nodes
+        start_edges = {}
+        for cell in starts:
+            cluster = hierarchy.get_cluster(cell)
+            distances, parents = self.get_area_paths(cell, hierarchy.get_area(cluster))
+            start_edges[cell] = [(other, distances[other], self.get_area_operators(parents, other))
+                                 for other in hierarchy.clusters.get(cluster, [])
+                                 if other in distances and other != cell]
+            # a goal in the same or the next cluster is also joined by a path inside the two clusters
+            for goal in goals:
+                goal_cluster = hierarchy.get_cluster(goal)
+                if abs(goal_cluster[0] - cluster[0]) <= 1 and abs(goal_cluster[1] - cluster[1]) <= 1:
+                    first = hierarchy.get_area((min(cluster[0], goal_cluster[0]), min(cluster[1], goal_cluster[1])))
+                    last = hierarchy.get_area((max(cluster[0], goal_cluster[0]), max(cluster[1], goal_cluster[1])))
+                    distances, parents = self.get_area_paths(cell, (first[0], first[1], last[2], last[3]))
+                    if goal in distances:
+                        start_edges[cell].append((goal, distances[goal], self.get_area_operators(parents, goal)))
+        goal_edges = {}
+        for goal in goals:
+            distances, parents = self.get_area_paths(goal, hierarchy.get_area(hierarchy.get_cluster(goal)))
+            for other in hierarchy.clusters.get(hierarchy.get_cluster(goal), []):
+                if other in distances and other != goal:
+                    goal_edges.setdefault(other, []).append(
+                        (goal, distances[other], self.reverse_operators(self.get_area_operators(parents, other))))
+
+        # A star on the abstract graph
+        stats = self.stats
+        costs = {}
+        parents = {}
+        queue = []
+        for cell in starts:
+            costs[cell] = 0
+            heapq.heappush(queue, (self.lower_bound(cell, goals), len(queue), 0, cell))
+            if stats is not None:
+                stats.add_push(len(queue))
+        count = len(queue)
+        reached = None
+        while len(queue) > 0:
+            f, order, cost, cell = heapq.heappop(queue)
+            # skip the entry if the cell was reached at a lower cost after it was added
+            if cost > costs[cell]:
+                if stats is not None:
+                    stats.add_pop(stale=True)
+                continue
+            if stats is not None:
+                stats.add_pop()
+            self.expansion_count += 1
+            if cell in self.GOALS:
+                reached = cell
+                break
+            for edges in (hierarchy.get_neighbours(cell), start_edges.get(cell, ()), goal_edges.get(cell, ())):
+                for other, step, operators in edges:
+                    if cost + step < costs.get(other, UNREACHABLE):
+                        costs[other] = cost + step
+                        parents[other] = (cell, operators)
+                        heapq.heappush(queue, (cost + step + self.lower_bound(other, goals), count, cost + step,
+                                               other))
+                        count += 1
+                        if stats is not None:
+                            stats.add_push(len(queue))
+        if reached is None:
+            return None
+
+        # get the operators of the path, follow them from the start node and shorten the path
+        edges = []
+        cell = reached
+        while cell in parents:
+            cell, operators = parents[cell]
+            edges.append(operators)
+        operators = b''.join(reversed(edges))
+        path = [cell]
+        for action in operators:
+            i, j, code, step = self.DIRECTIONS[self.DIRECTION_BITS[action]]
+            path.append(path[-1] + i * self.size + j)
+        path = self.refine_path(self.remove_loops(path), REFINE_WINDOW)
+
+        nodes = self.NODES
+        moves = {i * self.size + j: (action, step) for i, j, action, step in self.DIRECTIONS}
+        for parent, cell in zip(path, path[1:]):
+            action, step = moves[cell - parent]
+            x, y = divmod(cell, self.size)
+            if cell in nodes:
+                nodes.update(cell, action, nodes.cost[parent] + step, self.heuristic(x, y), parent)
+            else:
+                nodes.add(cell, self.node_count, action, 0, nodes.cost[parent] + step, self.heuristic(x, y), parent)
+                self.node_count += 1
+        return path[-1]
+
+    def remove_loops(self, path):
+        '''
+        method used to remove the loops of a path, where the path comes back to a cell it went through before
+        @param path: the cells of the path
+        @return: the cells of the path without loops
+        '''
+        cells = []
+        positions = {}
+        for cell in path:
+            if cell in positions:
+                for removed in cells[positions[cell] + 1:]:
+                    del positions[removed]
+                del cells[positions[cell] + 1:]
+                continue
+            positions[cell] = len(cells)
+            cells.append(cell)
+        return cells
+
+    def refine_path(self, path, window):
+        '''
+        method used to shorten a path found on the abstract graph, which only crosses the clusters at their entrances.
+        The cheapest path between the ends of a window of the path is searched again inside the rectangle around the
+        window, widened by half a window on each side, and replaces the window when it is cheaper. The windows overlap
+        by half, so the shortcut of a window can go on in the next one, and the time taken grows with the length of
+        the path and not with the map
+        @param path: the cells of the path
+        @param window: the number of moves in a window
+        @return: the cells of the refined path
+        '''
+        steps = {i * self.size + j: step for i, j, action, step in self.DIRECTIONS}
+        margin = window // 2
+        first = 0
+        while first < len(path) - 1:
+            last = min(first + window, len(path) - 1)
+            rows = [cell // self.size for cell in path[first:last + 1]]
+            columns = [cell % self.size for cell in path[first:last + 1]]
+            area = (max(0, min(rows) - margin), max(0, min(columns) - margin),
+                    min(self.size, max(rows) + margin + 1), min(self.size, max(columns) + margin + 1))
+            cost = sum(steps[cell - parent] for parent, cell in zip(path[first:last], path[first + 1:last + 1]))
+            shortcut = self.get_area_path(path[first], path[last], area, cost)
+            if shortcut is not None:
+                path = self.remove_loops(path[:first] + shortcut + path[last + 1:])
+            if last >= len(path) - 1:
+                break
+            first += margin
+        return path
+
+    def get_area_path(self, source, target, area, limit):
+        '''
+        method used to find the cheapest path between two cells without leaving an area of the map, with A star
+        @param source: the first cell of the path
+        @param target: the last cell of the path
+        @param area: the first row, the first column, the row after the last and the column after the last
+        @param limit: the cost the path has to be cheaper than
+        @return: the cells of the path, None if there is no path cheaper than the limit
+        '''
+        first_X, first_Y, last_X, last_Y = area
+        targets = [target]
+        costs = {source: 0}
+        parents = {source: -1}
+        queue = [(self.lower_bound(source, targets), 0, source)]
+        while len(queue) > 0:
+            f, cost, cell = heapq.heappop(queue)
+            if f >= limit:
+                return None
+            if cell == target:
+                path = []
+                while cell >= 0:
+                    path.append(cell)
+                    cell = parents[cell]
+                path.reverse()
+                return path
+            if cost > costs[cell]:
+                continue
+            current_X, current_Y = divmod(cell, self.size)
+            for i, j, action, step in self.MOVE_TABLE[self.MOVES[cell]]:
+                new_X = current_X + i
+                new_Y = current_Y + j
+                if new_X < first_X or new_Y < first_Y or new_X >= last_X or new_Y >= last_Y:
+                    continue
+                new_cell = new_X * self.size + new_Y
+                if cost + step < costs.get(new_cell, UNREACHABLE):
+                    costs[new_cell] = cost + step
+                    parents[new_cell] = cell
+                    heapq.heappush(queue, (cost + step + self.lower_bound(new_cell, targets), cost + step, new_cell))
+        return None
+
+    def get_field(self, sources):
+        '''
+        get the distance field of a set of source cells. The fields are kept with the map, so the field of the same
+        sources is only calculated once, and the least recently used field is removed when there are too many
+        @param sources: the source cells
+        @return: the DistanceField of the sources
+        '''
+        key = frozenset(sources)
+        if key in self.FIELDS:
+            self.FIELDS.move_to_end(key)
+            return self.FIELDS[key]
+        field = DistanceField(self, key)
+        self.FIELDS[key] = field
+        while len(self.FIELDS) > self.field_limit:
+            self.FIELDS.popitem(last=False)
+        return field
+
+    def fieldsearch(self):
+        '''
+        method used to find the path from the start node to the nearest goal with the distance field of the goals.
+        The field is calculated by the first search to the goals and later searches to the same goals only follow the
+        moves from their start node
+        @return: the cell of the goal node reached, None if there is no path
+        '''
+        field = self.get_field(self.GOALS)
+        starts = [cell for cell in self.OPEN if field.distances[cell] != UNREACHABLE]
+        if len(starts) == 0:
+            return None
+        # start from the start node nearest to a goal
+        start = min(starts, key=field.distances.__getitem__)
+
+        nodes = self.NODES
+        path = field.get_path(start)
+        for parent, cell in zip(path, path[1:]):
+            action = field.operators[parent]
+            step = self.DIRECTIONS[self.DIRECTION_BITS[action]][3]
+            x, y = divmod(cell, self.size)
+            if cell in nodes:
+                nodes.update(cell, action, nodes.cost[parent] + step, self.heuristic(x, y), parent)
+            else:
+                nodes.add(cell, self.node_count, action, 0, nodes.cost[parent] + step, self.heuristic(x, y), parent)
+                self.node_count += 1
+        return path[-1]
+
+    def incremental(self):
+        '''
+        method used to find the path from the start node to the nearest goal with D* Lite. The search runs from the
+        goals towards the start and its state is kept in REPLANNER, so that the next search on the graph, after the
+        start moved or cells of the map changed, only repairs the part of the last search that was affected. With
+        several start nodes, the first one is used
+        @return: the cell of the goal node reached, None if there is no path
+        '''
+        starts = list(self.OPEN)
+        if len(starts) == 0:
+            return None
+        start = starts[0]
+        # the kept state is only valid for the same goals
+        if self.REPLANNER is None or self.REPLANNER.goals != self.GOALS:
+            self.REPLANNER = Replanner(self, self.GOALS)
+        self.REPLANNER.set_start(start)
+        self.expansion_count += self.REPLANNER.search()
+
+        path = self.REPLANNER.get_path()
+        if path is None:
+            return None
+        nodes = self.NODES
+        for parent, cell in zip(path, path[1:]):
+            # the move is the difference of the coordinates, the difference of the cells wraps around on small maps
+            x, y = divmod(cell, self.size)
+            parent_X, parent_Y = divmod(parent, self.size)
+            action = self.ACTION_CODES[x - parent_X + 1][y - parent_Y + 1]
+            step = self.DIRECTIONS[self.DIRECTION_BITS[action]][3]
+            if cell in nodes:
+                nodes.update(cell, action, nodes.cost[parent] + step, self.heuristic(x, y), parent)
+            else:
+                nodes.add(cell, self.node_count, action, 0, nodes.cost[parent] + step, self.heuristic(x, y), parent)
+                self.node_count += 1
+        return path[-1]
+
+    def set_cells(self, changes):
+        '''
+        method used to change cells of the map, for example to add or remove ridges. The move masks of the changed
+        cells and of their neighbours are calculated again, and everything calculated from the old moves is removed:
+        the open area flags and the forced moves of jump point search around the cells, the distance fields, the
+        landmark tables and the abstract graph. The cells whose moves changed are given to the kept D* Lite state
+        @param changes: an iterable of (x, y, terrain) with the new terrain of each changed cell
+        @return: the list of the cells whose move masks changed
+        '''
+        if isinstance(self.MAP, MappedMap):
+            raise ValueError("the cells of a memory mapped map cannot be changed")
+        size = self.size
+        changes = list(changes)
+        for x, y, terrain in changes:
+            if not (0 <= x < size and 0 <= y < size):
+                raise ValueError("the changed cell " + str(x) + " " + str(y) + " is not on the map")
+        cells = set()
+        for x, y, terrain in changes:
+            self.MAP[x] = self.MAP[x][:y] + terrain + self.MAP[x][y + 1:]
+            # a move can only change when the cell is the cell of the move or one of the cells next to it
+            for i in range(max(0, x - 1), min(size, x + 2)):
+                for j in range(max(0, y - 1), min(size, y + 2)):
+                    cells.add(i * size + j)
 
-        # get the i and j values for all the actions around the current node
-        for i in range(-1,2):
-            for j in range(-1,2):
-                #  Case 0 : remove the possible action of not moving
-                if i != 0 or j != 0:
-                    # get the new coodinate
-                    new_X = node.coordinates[0] + i
-                    new_Y = node.coordinates[1] + j
-                    # check if the move to the new coordinate is a diagonal
-                    diagonal = self.check_diagonal(i,j)
+        changed = []
+        for cell in sorted(cells):
+            # the mask of a cell that was not expanded yet is calculated when it is needed
+            if isinstance(self.MOVES, MoveCache) and cell not in self.MOVES:
+                continue
+            mask = self.get_moves(cell)
+            if self.MOVES[cell] != mask:
+                self.MOVES[cell] = mask
+                changed.append(cell)
 
-                    # Case 1 (Out of Bounds)
-                    # Check whether the move will take the agent out of bounds
-                    if new_X >= 0 and new_Y >= 0 and new_X < len(self.MAP) and new_Y < len(self.MAP):
+        # the open area flags depend on the moves of the cell and of its neighbours, and the forced moves of a cell
+        # depend on the moves of the cells within two cells of it
+        for cell in changed:
+            x, y = divmod(cell, size)
+            for i in range(max(0, x - 2), min(size, x + 3)):
+                for j in range(max(0, y - 2), min(size, y + 3)):
+                    self.FREE[i * size + j] = 0
+                    for bit in range(len(self.DIRECTIONS)):
+                        self.FORCED.pop((i * size + j) * 8 + bit, None)
+        if len(changed) > 0:
+            self.FIELDS.clear()
+            self.LANDMARKS = None
+            self.LANDMARK_TABLES = None
+            self.GOAL_DISTANCES = []
+            self.HIERARCHY = None
+            if self.REPLANNER is not None:
+                self.REPLANNER.update_cells(changed)
+        return changed
 
-                        # Case 2 (Ridge)
-                        # Check whether the next move is a ridge or a diagonal with a ridge as a neighbour
-                        if not self.check_ridge(node.coordinates[0], node.coordinates[1], new_X, new_Y, diagonal):
+    def replan(self, changes, start=None):
+        '''
+        method used to search the graph again after cells of the map changed. The D* Lite state of the last search is
+        kept, so only the affected part of the search is repaired, the other procedures search the changed map again
+        @param changes: an iterable of (x, y, terrain) with the new terrain of each changed cell
+        @param start: the new start cell, None to keep the start cells of the last search
+        @return: an iterator over the output of the path or 'NO-PATH" if path doesn't exist
+        '''
+        changes = list(changes)
+        if start is not None:
+            starts = [start]
+        elif self.REPLANNER is not None:
+            starts = [self.REPLANNER.start]
+        else:
+            starts = list(self.STARTS)
+        for x, y, terrain in changes:
+            if x * self.size + y in starts or x * self.size + y in self.GOALS:
+                raise ValueError("the changed cell " + str(x) + " " + str(y) + " is a start or goal cell")
+        self.set_cells(changes)
+        self.reset()
+        for cell in starts:
+            self.add_start(cell)
+        return self.search()
 
-                            # calculate the cost for the move
-                            new_cost = node.cost + self.get_cost(diagonal)
+    def lower_bound(self, cell, targets):
+        '''
+        method used to calculate a lower bound of the cost from a cell to the nearest of the target cells. Without
+        ridges, the cheapest path between two cells takes diagonal moves for the longer of the two distances, and one
+        more straight move at a cost of one extra when the two distances do not have the same parity
+        @param cell: the cell on the map
+        @param targets: the list of target cells
+        @return: the lower bound of the cost
+        '''
+        x, y = divmod(cell, self.size)
+        best = None
+        for target in targets:
+            dx, dy = divmod(target, self.size)
+            dx = abs(dx - x)
+            dy = abs(dy - y)
+            bound = max(dx, dy) + (dx + dy) % 2
+            if best is None or bound < best:
+                best = bound
+        return best if best is not None else 0
 
-                            # Get the list of ancestor nodes
-                            ancestors = node.get_ancestors()
+    def balanced_priority(self, nodes, cell, sources):
+        '''
+        method used to calculate the priority of a node in a frontier of the bidirectional search. The estimate of a
+        node is half of the difference between its lower bound to the end of its own search and its lower bound back
+        to the sources of its search, so that the estimates of the two searches add up to zero and both searches grow
+        towards the middle. The estimate is doubled to keep it an integer. When it is equal, nodes generated by a
+        diagonal move are preferred, so the priority is twice the estimate and 1 more for the other nodes
+        @param nodes: the node store of the search, NODES or BACKWARD
+        @param cell: the cell of the node
+        @param sources: the cells the search started from
+        @return: the priority as an integer
+        '''
+        value = 2 * nodes.cost[cell] + nodes.heuristic[cell] - self.lower_bound(cell, sources)
+        if nodes.operator[cell] in self.BEST_OPERATORS:
+            return 2 * value
+        return 2 * value + 1
 
-                            # Case 3 (Check if its in the ancestor list)
-                            # check whether the new location is in the ancestor list
-                            if self.NODEMAP[new_X][new_Y] not in ancestors:
+    def get_natural_moves(self):
+        '''
+        determine the moves that jump point search follows after each move when no ridge is in the way. Any path can
+        be reordered, one pair of moves at a time, so that its moves follow the order of JUMP_ORDER: the diagonal moves
+        come first as they are the cheapest, and a pair of moves is never kept if a cheaper path joins the same two
+        cells. A move is followed only by itself or by a later move that does not form such a pair
+        @return: a list with the bits of the natural moves after the move of each bit
+        '''
+        order = [self.DIRECTION_BITS[NodeStore.OPERATORS.index(action)] for action in JUMP_ORDER]
 
-                                # check whether if there already exist a path
-                                if self.NODEMAP[new_X][new_Y] is not None:
+        # get the lowest cost between two cells with no more than two moves
+        best = {(0, 0): 0}
+        for i, j, action, step in self.DIRECTIONS:
+            best[(i, j)] = min(best.get((i, j), step), step)
+            for i2, j2, action2, step2 in self.DIRECTIONS:
+                best[(i + i2, j + j2)] = min(best.get((i + i2, j + j2), step + step2), step + step2)
 
-                                    if new_cost < self.NODEMAP[new_X][new_Y].cost :
-                                        # if less, then update the node to the new values
+        natural = []
+        for bit, (i, j, action, step) in enumerate(self.DIRECTIONS):
+            after = order[order.index(bit):]
+            natural.append([next_bit for next_bit in after
+                            if step + self.DIRECTIONS[next_bit][3] <=
+                            best[(i + self.DIRECTIONS[next_bit][0], j + self.DIRECTIONS[next_bit][1])]])
+        return natural
 
-                                        # update the actions
-                                        self.NODEMAP[new_X][new_Y].operator = self.ACTIONS[i+1][j+1]
-                                        # update the cost
-                                        self.NODEMAP[new_X][new_Y].cost = new_cost
-                                        # update the heuristic
-                                        self.NODEMAP[new_X][new_Y].heuristic = self.heuristic(new_X,new_Y)
-                                        # update the new f
-                                        self.NODEMAP[new_X][new_Y].f = self.NODEMAP[new_X][new_Y].cost + \
-                                                                       self.NODEMAP[new_X][new_Y].heuristic
-                                        # update the parent
-                                        self.NODEMAP[new_X][new_Y].parent = node
+    def get_alternative_moves(self):
+        '''
+        determine, for each pair of moves where the second move is not a natural move after the first, the paths that
+        make the pair unnecessary: the same two moves in the order of JUMP_ORDER, and the paths of no more than two
+        moves with a lower cost. The paths start from the cell before the first move and end on the cell after the
+        second move. When a ridge or the edge of the map blocks all of them, the second move is a forced move
+        @return: a list with a list for the move of each bit, which holds for the next move of each bit an empty list
+        if the next move is natural, None if the two moves cancel out, or the list of paths as tuples of move bits
+        '''
+        order = [self.DIRECTION_BITS[NodeStore.OPERATORS.index(action)] for action in JUMP_ORDER]
+        alternatives = []
+        for bit, (i, j, action, step) in enumerate(self.DIRECTIONS):
+            paths_after = []
+            for next_bit, (i2, j2, action2, step2) in enumerate(self.DIRECTIONS):
+                if next_bit in self.NATURAL[bit]:
+                    paths_after.append([])
+                    continue
+                if i + i2 == 0 and j + j2 == 0:
+                    paths_after.append(None)
+                    continue
+                paths = []
+                if order.index(next_bit) < order.index(bit):
+                    paths.append((next_bit, bit))
+                for bit3, (i3, j3, action3, step3) in enumerate(self.DIRECTIONS):
+                    if (i3, j3) == (i + i2, j + j2) and step3 < step + step2:
+                        paths.append((bit3,))
+                    for bit4, (i4, j4, action4, step4) in enumerate(self.DIRECTIONS):
+                        if (i3 + i4, j3 + j4) == (i + i2, j + j2) and step3 + step4 < step + step2:
+                            paths.append((bit3, bit4))
+                paths_after.append(paths)
+            alternatives.append(paths_after)
+        return alternatives
 
-                                        # if the path cost is less than the current, add the node to the open list
-                                        self.OPEN.append(self.NODEMAP[new_X][new_Y])
+    def is_free(self, cell):
+        '''
+        method used to check whether a cell is in an open area, where all eight moves are legal from the cell and from
+        each of its neighbours. Every path of no more than two moves from such a cell is legal
+        @param cell: the cell on the map
+        @return: True if the cell is in an open area
+        '''
+        free = self.FREE[cell]
+        if free == 0:
+            free = 2
+            if self.MOVES[cell] == 255:
+                free = 1
+                for i, j, action, step in self.DIRECTIONS:
+                    if self.MOVES[cell + i * self.size + j] != 255:
+                        free = 2
+                        break
+            self.FREE[cell] = free
+        return free == 1
 
-                                else:
-                                    # if a path doesnt exist
-                                    new_Node = Node(self.node_count,                # set the identifier
-                                                    self.ACTIONS[i + 1][j + 1],     # set the action
-                                                    0,                              # set the expansion order
-                                                    new_cost,                       # set the new cost
-                                                    self.heuristic(new_X, new_Y),   # calculate the heuristic
-                                                    node,                           # set the parent
-                                                    [new_X, new_Y]                  # set the x and y coordinates
-                                                    )
+    def get_forced(self, cell, bit):
+        '''
+        method used to find the forced moves of a cell reached by a move: the legal moves that are not natural after
+        the move and that no other path from the cell before the move can replace, because a ridge or the edge of the
+        map is in the way. A cell with forced moves is a jump point. There are none when the cell before the move is
+        in an open area. Otherwise the forced moves only depend on the moves of the cells around it, so they are kept
+        in FORCED
+        @param cell: the cell on the map
+        @param bit: the bit of the move that reached the cell
+        @return: the forced moves as a move mask
+        '''
+        directions = self.DIRECTIONS
+        size = self.size
+        parent = cell - directions[bit][0] * size - directions[bit][1]
+        if self.is_free(parent):
+            return 0
+        key = cell * 8 + bit
+        forced = self.FORCED.get(key)
+        if forced is None:
+            forced = 0
+            moves = self.MOVES[cell]
+            for next_bit, paths in enumerate(self.ALTERNATIVES[bit]):
+                # natural moves, moves back to the parent and illegal moves are never forced
+                if not paths or not moves >> next_bit & 1:
+                    continue
+                for path in paths:
+                    current = parent
+                    for path_bit in path:
+                        if not self.MOVES[current] >> path_bit & 1:
+                            break
+                        current += directions[path_bit][0] * size + directions[path_bit][1]
+                    else:
+                        # the path is legal, so the move is not needed
+                        break
+                else:
+                    forced |= 1 << next_bit
+            self.FORCED[key] = forced
+        return forced
 
-                                    # check whether the new node is a goal
-                                    if self.check_goal(new_X, new_Y):
-                                        # flag the node if it is a goal
-                                        new_Node.isGOAL = True
+    def jump(self, cell, bit):
+        '''
+        method used to move from a cell in one direction until a jump point is found. A jump point is a goal, a cell
+        with a forced move, or a cell from where one of the natural moves after this move finds a jump point
+        @param cell: the cell to jump from
+        @param bit: the bit of the move in DIRECTIONS
+        @return: the cell of the jump point, -1 if there is none
+        '''
+        i, j, action, step = self.DIRECTIONS[bit]
+        offset = i * self.size + j
+        natural = self.NATURAL[bit]
+        while self.MOVES[cell] >> bit & 1:
+            cell += offset
+            if cell in self.GOALS or self.get_forced(cell, bit):
+                return cell
+            # stop on the cell if the path can turn there
+            for next_bit in natural:
+                if next_bit != bit and self.jump(cell, next_bit) >= 0:
+                    return cell
+            if bit not in natural:
+                return -1
+        return -1
 
-                                    # set the new node on the node matrix
-                                    self.NODEMAP[new_X][new_Y] = new_Node
+    def expand_jump_points(self, cell):
+        '''
+        method used to expand the node for jump point search. The start node follows all the legal moves, other nodes
+        only follow the natural moves after the move that reached them and their forced moves. Each move jumps to the
+        next jump point in its direction, which becomes the child node
+        @param cell: the cell of the current node
+        @return: none
+        '''
+        nodes = self.NODES
+        current_X, current_Y = divmod(cell, self.size)
+        children = None
+        if self.trace.active:
+            children = self.CHILDREN.setdefault(cell, [])
 
-                                    # increment the node identifier count
-                                    self.node_count += 1
+        if nodes.parent[cell] < 0:
+            bits = range(len(self.DIRECTIONS))
+        else:
+            bit = self.DIRECTION_BITS[nodes.operator[cell]]
+            forced = self.get_forced(cell, bit)
+            bits = self.NATURAL[bit] + [next_bit for next_bit in range(len(self.DIRECTIONS)) if forced >> next_bit & 1]
 
-                                    # add the node to the open list
-                                    self.OPEN.append(self.NODEMAP[new_X][new_Y])
+        for bit in bits:
+            new_cell = self.jump(cell, bit)
+            if new_cell < 0:
+                continue
+            i, j, action, step = self.DIRECTIONS[bit]
+            new_X, new_Y = divmod(new_cell, self.size)
+            new_cost = nodes.cost[cell] + step * max(abs(new_X - current_X), abs(new_Y - current_Y))
 
-                                # add the node to the children list
-                                node.children.append(self.NODEMAP[new_X][new_Y])
+            if not self.check_ancestor(cell, new_cell):
+                if new_cell in nodes:
+                    if new_cost < nodes.cost[new_cell]:
+                        nodes.update(new_cell, action, new_cost, self.heuristic(new_X, new_Y), cell)
+                        if self.stats is not None:
+                            self.stats.reopenings += 1
+                        self.push(new_cell)
+                else:
+                    nodes.add(new_cell, self.node_count, action, 0, new_cost, self.heuristic(new_X, new_Y), cell)
+                    self.node_count += 1
+                    self.push(new_cell)
+                if children is not None:
+                    children.append(new_cell)
 
+    def add_jumped_cells(self, cell):
+        '''
+        method used to add the cells between the jump points on the path to a node, so that each node on the path is
+        one move from its parent
+        @param cell: the cell of the last jump point on the path
+        @return: none
+        '''
+        nodes = self.NODES
+        jump_points = []
+        while cell >= 0:
+            jump_points.append(cell)
+            cell = nodes.parent[cell]
+        jump_points.reverse()
 
+        for parent, jump_point in zip(jump_points, jump_points[1:]):
+            i, j, action, step = self.DIRECTIONS[self.DIRECTION_BITS[nodes.operator[jump_point]]]
+            offset = i * self.size + j
+            current = parent + offset
+            while current != jump_point:
+                x, y = divmod(current, self.size)
+                if current in nodes:
+                    nodes.update(current, action, nodes.cost[parent] + step, self.heuristic(x, y), parent)
+                else:
+                    nodes.add(current, self.node_count, action, 0, nodes.cost[parent] + step, self.heuristic(x, y),
+                              parent)
+                    self.node_count += 1
+                parent = current
+                current += offset
+            x, y = divmod(jump_point, self.size)
+            nodes.update(jump_point, action, nodes.cost[parent] + step, self.heuristic(x, y), parent)
 
     def check_diagonal(self,i,j):
         '''
@@ -311,102 +3078,389 @@ class SearchGraph:
         # If it not a ridge, then return false
         return False
 
-    def check_goal(self,new_X,new_Y):
+    def check_ancestor(self, cell, new_cell):
+        '''
+        method used to check whether the node on the new cell is an ancestor of the current node. Only explored
+        nodes can be ancestors, so the explored flag of the cell is checked first
+        @param cell: the cell of the current node
+        @param new_cell: the new cell on the map
+        @return: returns true if the node on the new cell is an ancestor of the current node
+        '''
+        if not self.CLOSED_MAP[new_cell] or new_cell not in self.NODES:
+            return False
+        return self.NODES.has_ancestor(cell, new_cell)
+
+    def check_goal(self,new_X,new_Y):
+        '''
+        method used to determine whether the coordinates point to a goal of the search
+        @param new_X: the new x coordinate on the map
+        @param new_Y: the new y coordinate on the map
+        @return: returns true of the coordinates point to a goal node
+        '''
+        if new_X * self.size + new_Y in self.GOALS:
+            return True
+        return False
+
+    def heuristic(self,x,y):
+        '''
+        method used to calculate the heuristic value given the current x and y coordinates
+        @param x: current x coordinate
+        @param y: current y coordinate
+        @return: returns the heuristic value
+        '''
+        # with the landmark tables loaded, use the landmark bound to the goals
+        if self.LANDMARKS is not None:
+            return self.landmark_bound(x * self.size + y)
+
+        # with many goals, find the nearest goal with the spatial index
+        if self.GOAL_INDEX is not None:
+            return self.GOAL_INDEX.nearest(x, y)
+
+        best = None
+        for goal_X, goal_Y in self.GOAL_COORDS:
+            # Calculate the difference in both x and y directions
+            dx = abs(x - goal_X)
+            dy = abs(y - goal_Y)
+
+            # keep the max of either the x or y direction for the nearest goal
+            if best is None or max(dx,dy) < best:
+                best = max(dx,dy)
+        return best
+
+    def get_distances(self, sources, operators=None, stats=None):
+        '''
+        method used to calculate the cost of the cheapest path from the nearest source cell to every cell on the map
+        with Dijkstra's algorithm. The cost of a move is 1 or 2, so the cells are kept in a ring of three buckets
+        indexed by their cost instead of a heap. As every move can be made in reverse at the same cost, the cost from
+        a cell to the nearest source is the same
+        @param sources: the list of source cells
+        @param operators: a bytearray to store the operator code of the first move from each cell towards the
+        sources, None if not needed
+        @param stats: the SearchStats to count the bucket operations in, None if not counted
+        @return: an array with the cost of each cell, UNREACHABLE for the cells that cannot be reached
+        '''
+        distances = array('I', [UNREACHABLE]) * (self.size * self.size)
+        buckets = [[], [], []]
+        pending = 0
+        for cell in sources:
+            distances[cell] = 0
+            buckets[0].append(cell)
+            pending += 1
+            if stats is not None:
+                stats.add_push(pending)
+
+        cost = 0
+        while pending > 0:
+            bucket = buckets[cost % 3]
+            while len(bucket) > 0:
+                cell = bucket.pop()
+                pending -= 1
+                # skip the cell if it was reached at a lower cost after it was added to the bucket
+                if distances[cell] != cost:
+                    if stats is not None:
+                        stats.add_pop(stale=True)
+                    continue
+                if stats is not None:
+                    stats.add_pop()
+                # the move mask only allows moves that stay on the map
+                for i, j, action, step in self.MOVE_TABLE[self.MOVES[cell]]:
+                    new_cell = cell + i * self.size + j
+                    if cost + step < distances[new_cell]:
+                        distances[new_cell] = cost + step
+                        if operators is not None:
+                            # the move back from the new cell is the opposite move
+                            operators[new_cell] = self.ACTION_CODES[1 - i][1 - j]
+                        buckets[(cost + step) % 3].append(new_cell)
+                        pending += 1
+                        if stats is not None:
+                            stats.add_push(pending)
+            cost += 1
+        return distances
+
+    def add_landmarks(self, count=8):
+        '''
+        choose the landmarks of the map and calculate the table of distances to each of them. Each new landmark is
+        the cell farthest from the landmarks chosen so far, and a cell that none of them can reach is taken first, so
+        every part of the map gets a landmark
+        @param count: the number of landmarks
+        @return: none
+        '''
+        landmarks = []
+        tables = []
+        # the distance from each cell to the nearest chosen landmark
+        nearest = None
+        for index in range(count):
+            if nearest is None:
+                # start from the farthest cell from the first open cell on the map
+                candidates = [cell for cell in range(self.size * self.size) if self.MOVES[cell]][:1]
+                if len(candidates) == 0:
+                    break
+                first = self.get_distances(candidates)
+                farthest = max((cell for cell in range(len(first)) if first[cell] != UNREACHABLE),
+                               key=first.__getitem__)
+            else:
+                # the cell farthest from the chosen landmarks, counting unreachable cells as the farthest
+                farthest = max((cell for cell in range(len(nearest)) if self.MOVES[cell]),
+                               key=nearest.__getitem__, default=-1)
+                if farthest < 0 or nearest[farthest] == 0:
+                    break
+            landmarks.append(farthest)
+            table = self.get_distances([farthest])
+            tables.append(table)
+            if nearest is None:
+                nearest = array('I', table)
+            else:
+                for cell in range(len(nearest)):
+                    if table[cell] < nearest[cell]:
+                        nearest[cell] = table[cell]
+        self.set_landmarks(landmarks, tables)
+
+    def set_landmarks(self, landmarks, tables):
+        '''
+        set the landmarks used by the heuristic
+        @param landmarks: the list of landmark cells
+        @param tables: the list of distance tables, one for each landmark, indexed by cell
+        @return: none
+        '''
+        self.LANDMARKS = landmarks
+        self.LANDMARK_TABLES = tables
+        self.set_landmark_goals()
+
+    def set_landmark_goals(self):
+        '''
+        look up the distances between the landmarks and each goal, used by landmark_bound for every node. A table
+        marks the cells that cannot be reached with the highest value of its type
+        @return: none
+        '''
+        if self.LANDMARKS is None:
+            return
+        self.GOAL_DISTANCES = [(goal, [(table, table[goal], (1 << 8 * table.itemsize) - 1)
+                                       for table in self.LANDMARK_TABLES])
+                               for goal in self.GOALS]
+
+    def landmark_bound(self, cell):
+        '''
+        method used to calculate a lower bound of the cost from a cell to the nearest goal with the landmarks. The
+        cost from the cell to a goal is at least the difference between their distances to any landmark, by the
+        triangle inequality, and at least the lower bound without ridges
+        @param cell: the cell on the map
+        @return: the lower bound of the cost
+        '''
+        best = None
+        for goal, distances in self.GOAL_DISTANCES:
+            bound = self.lower_bound(cell, [goal])
+            for table, distance, unreachable in distances:
+                cell_distance = table[cell]
+                # a landmark that cannot reach both cells gives no bound
+                if cell_distance != unreachable and distance != unreachable and abs(cell_distance - distance) > bound:
+                    bound = abs(cell_distance - distance)
+            if best is None or bound < best:
+                best = bound
+        return best if best is not None else 0
+
+    def map_checksum(self):
         '''
-        method used to determine whether the coordinates point to a goal on the map
-        @param new_X: the new x coordinate on the map
-        @param new_Y: the new y coordinate on the map
-        @return: returns true of the coordinates point to a goal node
+        method used to calculate a checksum of the terrain of the map, to check that tables calculated for a map
+        are used with the same map
+        @return: the CRC-32 of the rows of the map
         '''
-        if self.MAP[new_X][new_Y] == 'G':
-            return True
-        return False
+        checksum = 0
+        for row in self.MAP:
+            checksum = zlib.crc32(''.join(row).encode('ascii'), checksum)
+        return checksum
 
-    def heuristic(self,x,y):
+    def priority(self, cell):
         '''
-        method used to calculate the heuristic value given the current x and y coordinates
-        @param x: current x coordinate
-        @param y: current y coordinate
-        @return: returns the heuristic value
+        method used to calculate the priority of a node in the frontier for A star algorithm. Nodes with a lower f cost
+        come first and when the f cost is equal, nodes generated by a diagonal move are preferred, so the priority is
+        twice the f cost and 1 more for the other nodes
+        @param cell: the cell of the node
+        @return: the priority as an integer
         '''
-        # Calculate the difference in both x and y directions
-        dx = abs(x - self.GOAL_COORD[0])
-        dy = abs(y - self.GOAL_COORD[1])
+        nodes = self.NODES
+        f = nodes.cost[cell] + nodes.heuristic[cell]
+        # the anytime search inflates the heuristic by the weight of the current round, the first round of a search
+        # takes the weight of the options. The weight is taken in steps of 1 / WEIGHT_SCALE and the f cost is scaled
+        # by WEIGHT_SCALE, so that the priority stays an integer
+        if self.options['anytime']:
+            if self.weight is None:
+                self.weight = max(1, self.options['weight'])
+            f = nodes.cost[cell] * WEIGHT_SCALE + round(self.weight * WEIGHT_SCALE) * nodes.heuristic[cell]
+        if nodes.operator[cell] in self.BEST_OPERATORS:
+            return 2 * f
+        return 2 * f + 1
 
-        # Returns the max of either the x or y direction
-        return max(dx,dy)
+    def push(self, cell):
+        '''
+        method used to add a node to the frontier. For A star algorithm the node is added to the priority queue, or
+        re-prioritised in place if it is already in the frontier
+        @param cell: the cell of the node
+        @return: none
+        '''
+        stats = self.stats
+        if stats is not None:
+            start = time.perf_counter()
+        if self.trace.frontier:
+            self.trace.push(self, cell)
+        if isinstance(self.OPEN, PriorityQueue):
+            # the anytime search keeps a node improved after it was explored for its next round
+            if self.options['anytime'] and self.CLOSED_MAP[cell]:
+                self.INCONS.append(cell)
+            else:
+                self.OPEN.push(cell, self.priority(cell))
+        else:
+            self.OPEN.append(cell)
+        if stats is not None:
+            stats.add_time('ordering', start)
+            stats.add_push(len(self.OPEN))
 
-    def order(self):
+    def pop(self):
         '''
-        method used to order the frontier by reference for A star algorithm
-        @return: None
+        method used to take the next node from the frontier
+        @return: the cell of the node
         '''
-        self.OPEN.sort(key=lambda x: x, reverse=True)
+        if self.stats is None and not self.trace.frontier:
+            return self.OPEN.pop()
+        start = time.perf_counter()
+        cell = self.OPEN.pop()
+        if self.stats is not None:
+            self.stats.add_time('ordering', start)
+            self.stats.add_pop()
+        if self.trace.frontier:
+            self.trace.pop(self, cell)
+        return cell
 
 
     def search(self):
         '''
-        method used to run the search and determine a path to the goal
-        @return: the path as a string or 'NO-PATH" if path doesn't exist
+        method used to run the search and determine a path to the goal. When stats are kept, the time of the search and
+        of the output of the path are added to them
+        @return: an iterator over the output of the path or 'NO-PATH" if path doesn't exist
+        '''
+        if self.stats is None:
+            return self.run_search()
+        with self.stats.phase('search'):
+            output = self.run_search()
+        self.stats.add_search(self)
+        if output is not None and not isinstance(output, str):
+            output = self.stats.timed(output, 'output')
+        return output
+
+    def run_search(self):
+        '''
+        method used to run the search algorithm set in the options
+        @return: an iterator over the output of the path or 'NO-PATH" if path doesn't exist
         '''
         # record the start time
-        start = time.time()
+        start = time.perf_counter()
+
+        # with iterative deepening the search is a series of depth first searches with a growing bound
+        if self.options['deepen']:
+            return self.finish(self.deepen(), start)
+
+        # if the algorithm is A star, move the start node into a priority queue ordered by the f cost
+        if self.options['algorithm'] in ('A', 'J', 'B') and not isinstance(self.OPEN, PriorityQueue):
+            open_list = self.OPEN
+            self.OPEN = PriorityQueue(self.size * self.size, self.new_array('i', -1))
+            for cell in open_list:
+                self.push(cell)
+
+        # the anytime search runs rounds of weighted A star with a lower weight each time
+        if self.options['anytime']:
+            return self.finish(self.anytime(start), start)
+
+        # the bidirectional search runs its own loop over the forward and backward frontiers
+        if self.options['algorithm'] == 'B':
+            return self.finish(self.bidirectional(), start)
+
+        # the hierarchical search runs on the abstract graph of the clusters
+        if self.options['algorithm'] == 'H':
+            return self.finish(self.hierarchical(), start)
+
+        # the distance field search follows the moves of the field of the goals
+        if self.options['algorithm'] == 'F':
+            return self.finish(self.fieldsearch(), start)
+
+        # the incremental search repairs the state kept from the last search
+        if self.options['algorithm'] == 'L':
+            return self.finish(self.incremental(), start)
 
         # loop through the frontier list until its empty
+        stats = self.stats
         while len(self.OPEN) > 0 :
             # pop the current node from the frontier list
-            current_node = self.OPEN.pop()
+            current = self.pop()
 
             # if the algorithm is DLS, check whether the depth of the current node is less than the bound
-            if self.options['algorithm'] == 'D' and len(current_node) > self.options['bound']:
+            if self.options['algorithm'] == 'D' and self.NODES.depth[current] > self.options['bound']:
                 # if the path is more than the bound, skip the current node
                 continue
 
-            # using the current node, generate the path to the root as a string
-            generated_solution = current_node.get_operators_to_root()
-
-            # add the current node to the closed/explored list
-            self.CLOSED.append(current_node)
+            # add the current node to the closed/explored list, the list is only needed by the trace
+            self.CLOSED_MAP[current] = 1
+            if self.trace.active:
+                self.CLOSED.append(current)
 
             # expand the current node to get the possible children
-            self.expand(current_node)
+            if stats is not None:
+                start_expand = time.perf_counter()
+            if self.options['jump']:
+                self.expand_jump_points(current)
+            else:
+                self.expand(current)
+            if stats is not None:
+                stats.add_time('expand', start_expand)
 
             # update the expansion count of the current node
-            current_node.order_of_expansion = self.expansion_count
+            self.NODES.order_of_expansion[current] = self.expansion_count
 
             # increment the expansion node count
             self.expansion_count += 1
 
-            # after adding the child nodes to the frontier, check whether the algorithm is A, if so order the list
-            # based on cost
-            if self.options['algorithm'] == 'A':
-                # call the order method, that will order the nodes in the list by the f value
-                self.order()
-
             # based on the options selected by the user, display the current node
-            output = self.display(current_node)
+            if self.trace.active:
+                self.trace.record(self, current)
 
             # if the current node which we expanded is the goal
-            if current_node.isGOAL:
-                # set the bound to 0 to stop printing the nodes
-                self.options['display_node_expansion'] = 0
-                # print the path and cost
-                print(generated_solution + " " + str(current_node.cost))
-                # update the search options to state that the goal was reached
-                self.options['goal_reached'] = True
-
-                # check if the user wants to display the path as output on the screen
-                if self.options['display_output']:
-                    # display the path as output on the screen
-                    output = self.display(current_node)
-                    # check if the user wants to print the time taken for the search
-                    if self.options['show_time']:
-                        # get the ending time
-                        end = time.time()
-                        # print the time taken
-                        print("Time Taken for " + self.options['algorithm'] + ": " + str(end - start))
-                # return the generated path as solution
-                return output
+            if self.check_goal(*divmod(current, self.size)):
+                # fill in the cells skipped by the jumps so that the path has one operator for each move
+                if self.options['jump']:
+                    self.add_jumped_cells(current)
+                return self.finish(current, start)
+
+        return self.finish(None, start)
+
+    def finish(self, current, start):
+        '''
+        method used to report the result of the search
+        @param current: the cell of the goal node reached, None if there is no path
+        @param start: the time when the search started
+        @return: an iterator over the output of the path or 'NO-PATH" if path doesn't exist
+        '''
+        if current is not None:
+            output = None
+            # stop printing the nodes
+            self.trace.stop()
+            # using the current node, generate the path to the root as a string and print the path and cost
+            current_node = Node(self, current)
+            if self.options['display_output']:
+                print(current_node.get_operators_to_root() + " " + str(current_node.cost))
+            # update the search options to state that the goal was reached
+            self.options['goal_reached'] = True
+            self.solution = current
+
+            # check if the user wants to display the path as output on the screen
+            if self.options['display_output']:
+                # display the path as output on the screen
+                output = self.display(current_node)
+                # check if the user wants to print the time taken for the search
+                if self.options['show_time']:
+                    # get the ending time
+                    end = time.perf_counter()
+                    # print the time taken
+                    print("Time Taken for " + self.options['algorithm'] + ": " + str(end - start))
+            # return the generated path as solution
+            return output
 
         # check if the user wants to print the output on the screen
         if self.options['display_output'] :
@@ -415,127 +3469,897 @@ class SearchGraph:
             # check if the user wants to print the time
             if self.options['show_time']:
                 # get the ending time
-                end = time.time()
+                end = time.perf_counter()
                 # print the time taken
                 print("Time Taken for " + self.options['algorithm'] + ": " + str(end - start))
 
         # if no path exist, then return NO-PATH
         return "NO-PATH"
 
+    def deepen(self):
+        '''
+        method used to run the search by iterative deepening. Each iteration is a depth first search that only follows
+        the nodes within the bound: the depth of the node for DLS, and the f cost of the node for A star (IDA star). The
+        next bound is the lowest value that went over the current bound, so the bound grows until the goal is reached.
+        The search keeps the path to the node being expanded and the children of the nodes on the path, and a move back
+        onto the path is never followed. A TranspositionTable of TRANSPOSITION_SIZE slots keeps the depth or cost at
+        which the cells were reached in the iteration, and a node reached again is only explored again when the new
+        path is shorter or when its cell has left the table. Without the table the number of paths followed on a grid
+        grows exponentially with the depth. The nodes cut off by the bound are kept in a CutoffFrontier, and the next
+        iteration goes on from them instead of exploring the nodes within the last bound again, unless the frontier
+        went over FRONTIER_LIMIT records. The memory of the search then grows with the depth and not with the map. The
+        trace shows every node, so while it is printed the nodes are kept in the node store and every iteration starts
+        again from the start nodes
+        @return: the cell of the goal node reached, None if there is no path
+        '''
+        a_star = self.options['algorithm'] == 'A'
+        starts = list(self.OPEN)
+        if len(starts) == 0:
+            return None
+        # the DLS bound starts at the root and the A star bound at the estimated cost of the best start node
+        bound = min(self.heuristic(*divmod(cell, self.size)) for cell in starts) if a_star else 0
+        table = TranspositionTable(TRANSPOSITION_SIZE)
+        path = DeepeningPath()
+        frontier = None
+
+        while bound is not None:
+            self.options['bound'] = bound
+            next_bound = None
+            table.clear()
+            if self.trace.active:
+                self.restart_nodes(starts)
+
+            # go on from the nodes cut off in the last iteration, or start again from the start nodes
+            last_frontier = frontier
+            if last_frontier is None or last_frontier.dropped:
+                last_frontier = None
+            frontier = CutoffFrontier(FRONTIER_LIMIT)
+            if self.trace.active:
+                frontier.drop()
+            roots = starts if last_frontier is None else last_frontier.entries
+            # the nodes left on the path came from the frontier before the last one
+            path.truncate(0)
+            for index in reversed(range(len(roots))):
+                # set the path to the parent of the root
+                if last_frontier is None:
+                    path.truncate(0)
+                    cell, operator, cost = starts[index], 0, 0
+                    value = self.heuristic(*divmod(cell, self.size)) if a_star else 0
+                else:
+                    record = roots[index]
+                    last_frontier.set_path(path, record)
+                    cell = last_frontier.cell[record]
+                    operator = last_frontier.operator[record]
+                    cost = last_frontier.cost[record]
+                    value = last_frontier.values[index]
+
+                # skip the root if it was already reached in this iteration by a path as short as this one
+                length = cost if a_star else len(path)
+                known = table.get(cell)
+                if known is not None and known <= length:
+                    continue
+                table.put(cell, length)
+
+                # a node of the last frontier that is still over the bound is kept for the next iteration
+                if value > bound:
+                    if next_bound is None or value < next_bound:
+                        next_bound = value
+                    frontier.add(path, cell, operator, cost, value)
+                    continue
+
+                current, value = self.explore_within_bound(path, table, frontier, cell, operator, cost)
+                if current is not None:
+                    return current
+                if value is not None and (next_bound is None or value < next_bound):
+                    next_bound = value
+
+            bound = next_bound
+        return None
+
+    def restart_nodes(self, starts):
+        '''
+        method used to remove the nodes of the last iteration of iterative deepening from the node store and generate
+        the start nodes again, when the trace of the nodes is printed
+        @param starts: the cells of the start nodes
+        @return: none
+        '''
+        nodes = self.NODES
+        for cell in nodes.generated:
+            self.CLOSED_MAP[cell] = 0
+        nodes.reset()
+        self.CLOSED = []
+        self.CHILDREN = {}
+        for cell in starts:
+            nodes.add(cell, self.node_count, 0, 1, 0, self.heuristic(*divmod(cell, self.size)), -1)
+            self.node_count += 1
+
+    def explore_within_bound(self, path, table, frontier, cell, operator, cost):
+        '''
+        method used to run the depth first search of an iteration of iterative deepening from a node, after the path to
+        the parent of the node has been set. The open list holds the children of the nodes on the path, with the place
+        of their parent on the path, and a node is put on the path when it is taken from the open list
+        @param path: the DeepeningPath to the parent of the node
+        @param table: the TranspositionTable of the iteration
+        @param frontier: the CutoffFrontier that keeps the nodes cut off by the bound
+        @param cell: the cell of the node
+        @param operator: the code of the operator that generated the node
+        @param cost: the cost to reach the node
+        @return: the cell of the goal node reached, None if there is none within the bound, and the lowest value of
+        the nodes cut off by the bound, None if none was cut off
+        '''
+        nodes = self.NODES
+        a_star = self.options['algorithm'] == 'A'
+        bound = self.options['bound']
+        tracing = self.trace.active
+        next_bound = None
+        self.OPEN = []
+        parents = array('i', [len(path) - 1])           # the place on the path of the parent of each open node
+        operators = array('B', [operator])              # the operator code of each open node
+        costs = array('i', [cost])                      # the cost of each open node
+        self.push(cell)
+
+        # loop through the open list until the nodes within the bound are explored
+        while len(self.OPEN) > 0:
+            current = self.pop()
+            depth = parents.pop() + 1
+            operator = operators.pop()
+            cost = costs.pop()
+            # skip the node if a shorter path was found to it after it was added to the open list
+            known = table.get(current)
+            if known is not None and known < (cost if a_star else depth):
+                if self.stats is not None:
+                    self.stats.stale_pops += 1
+                continue
+            path.truncate(depth)
+            path.append(current, operator, cost)
+
+            children = None
+            if tracing:
+                self.CLOSED_MAP[current] = 1
+                self.CLOSED.append(current)
+                children = self.CHILDREN.setdefault(current, [])
+
+            if self.stats is not None:
+                start_expand = time.perf_counter()
+            current_X, current_Y = divmod(current, self.size)
+            for i, j, action, step in self.MOVE_TABLE[self.MOVES[current]]:
+                new_X = current_X + i
+                new_Y = current_Y + j
+                new_cell = new_X * self.size + new_Y
+                # never follow a move back onto the path
+                if new_cell in path.on_path:
+                    continue
+                new_cost = cost + step
+                new_length = new_cost if a_star else depth + 1
+
+                # skip the node if it was already reached in this iteration by a path as short as this one
+                known = table.get(new_cell)
+                if known is not None and known <= new_length:
+                    continue
+                table.put(new_cell, new_length)
+
+                # leave the node for the next iteration if it goes over the bound
+                heuristic = self.heuristic(new_X, new_Y)
+                value = new_cost + heuristic if a_star else new_length
+                if value > bound:
+                    if next_bound is None or value < next_bound:
+                        next_bound = value
+                    frontier.add(path, new_cell, action, new_cost, value)
+                    continue
+
+                if known is not None and self.stats is not None:
+                    self.stats.reopenings += 1
+                if tracing and new_cell in nodes:
+                    nodes.update(new_cell, action, new_cost, heuristic, current)
+                elif tracing:
+                    nodes.add(new_cell, self.node_count, action, 0, new_cost, heuristic, current)
+                if known is None:
+                    self.node_count += 1
+                self.push(new_cell)
+                parents.append(depth)
+                operators.append(action)
+                costs.append(new_cost)
+                if children is not None:
+                    children.append(new_cell)
+            if self.stats is not None:
+                self.stats.add_time('expand', start_expand)
+
+            # update the expansion count of the current node
+            if tracing:
+                nodes.order_of_expansion[current] = self.expansion_count
+            self.expansion_count += 1
+
+            # based on the options selected by the user, display the current node
+            if tracing:
+                self.trace.record(self, current)
+
+            # if the current node which we expanded is the goal, keep the nodes of the path for the output
+            if self.check_goal(current_X, current_Y):
+                for index, cell in enumerate(path.cells):
+                    parent = path.cells[index - 1] if index > 0 else -1
+                    heuristic = self.heuristic(*divmod(cell, self.size))
+                    if cell in nodes:
+                        nodes.update(cell, path.operators[index], path.costs[index], heuristic, parent)
+                    else:
+                        nodes.add(cell, index, path.operators[index], 0, path.costs[index], heuristic, parent)
+                return current, next_bound
+        return None, next_bound
+
+
+    def anytime(self, start):
+        '''
+        method used to run the search as anytime repairing A star (ARA star). Each round is a weighted A star search
+        that orders the frontier by g + weight * h, which finds a path quickly whose cost is within about the weight
+        times the lowest cost. The weight is then lowered by ARA_WEIGHT_STEP and the next round goes on from the nodes
+        of the last one: a node improved after it was explored in a round is kept aside in INCONS instead of being
+        explored again, and is put back in the frontier for the next round. The search stops when the round with
+        weight 1 is over, which leaves the path with the lowest cost, or when the deadline has passed after a path was
+        found. Searching the graph again goes on improving the path from where the search stopped
+        @param start: the time when the search started
+        @return: the cell of the goal node of the best path found, None if there is no path
+        '''
+        nodes = self.NODES
+        deadline = None
+        if self.options['deadline'] is not None:
+            deadline = start + self.options['deadline']
+        best = self.solution
+
+        while True:
+            # a round is over when no node in the frontier comes before the goal node of the best path
+            while len(self.OPEN) > 0 and (best is None or self.priority(self.OPEN.peek()) >> 1 <
+                                          (nodes.cost[best] + nodes.heuristic[best]) * WEIGHT_SCALE):
+                # give the best path so far when the time is over, the search goes on until a path is found
+                if best is not None and deadline is not None and time.perf_counter() > deadline:
+                    self.update_path_costs(best)
+                    return best
+
+                current = self.pop()
+                self.CLOSED_MAP[current] = 1
+                if self.trace.active:
+                    self.CLOSED.append(current)
+                if self.stats is not None:
+                    with self.stats.phase('expand'):
+                        self.expand(current)
+                else:
+                    self.expand(current)
+                nodes.order_of_expansion[current] = self.expansion_count
+                self.expansion_count += 1
+                if self.trace.active:
+                    self.trace.record(self, current)
+
+                # keep the goal node with the lowest cost
+                if self.check_goal(*divmod(current, self.size)) and \
+                        (best is None or nodes.cost[current] < nodes.cost[best]):
+                    best = current
+                    self.solution = current
+
+            # the path of the round with weight 1 has the lowest cost
+            if best is None or self.weight <= 1 or (deadline is not None and time.perf_counter() > deadline):
+                if best is not None:
+                    self.update_path_costs(best)
+                return best
+
+            # lower the weight, put the improved nodes back in the frontier and order it by the new weight
+            self.weight = max(1, self.weight - ARA_WEIGHT_STEP)
+            cells = list(self.OPEN) + self.INCONS
+            self.OPEN.clear()
+            self.INCONS = []
+            for cell in nodes.generated:
+                self.CLOSED_MAP[cell] = 0
+            for cell in cells:
+                self.push(cell)
+
+    def update_path_costs(self, cell):
+        '''
+        method used to recalculate the costs on the path to a node. A node on the path can be improved after its
+        children were generated, so the cost of the children is out of date until they are explored again
+        @param cell: the cell of the last node of the path
+        @return: none
+        '''
+        nodes = self.NODES
+        path = []
+        while cell >= 0:
+            path.append(cell)
+            cell = nodes.parent[cell]
+        for parent, cell in zip(reversed(path), reversed(path[:-1])):
+            step = self.DIRECTIONS[self.DIRECTION_BITS[nodes.operator[cell]]][3]
+            if nodes.cost[cell] != nodes.cost[parent] + step:
+                nodes.update(cell, nodes.operator[cell], nodes.cost[parent] + step, nodes.heuristic[cell], parent)
+
+    def get_open_cells(self):
+        '''
+        method used to get the cells of the open list in the order they are printed, the node to be expanded next first
+        @return: the list of cells
+        '''
+        cells = list(self.OPEN)
+        cells.reverse()
+        return cells
+
+    def get_open_string(self, cell):
+        '''
+        method used to convert a node of the open list to a string for printing
+        @param cell: the cell of the node
+        @return: the node as a string
+        '''
+        open_node = Node(self, cell)
+        return '(N' + str(open_node.identifier) + ':' + open_node.get_operators_to_root() \
+               + ' ' + str(open_node.cost) + ' ' + str(round(open_node.heuristic,2)) + ' ' + str(round(open_node.f,2)) +  ')'
+
+    def get_closed_string(self, cell):
+        '''
+        method used to convert a node of the closed list to a string for printing
+        @param cell: the cell of the node
+        @return: the node as a string
+        '''
+        closed_node = Node(self, cell)
+        return '(N' + str(closed_node.identifier) + ':' + closed_node.get_operators_to_root() + ' '\
+               + str(closed_node.order_of_expansion)\
+               + ' ' + str(closed_node.cost) + ' ' + str(round(closed_node.heuristic,2)) + ' ' + str(round(closed_node.f,2)) +  ')'
 
     def get_open_list_as_string(self):
         '''
-        method used to convert the open list to a string for printing
+        method used to convert the open list to a string for printing. The strings of the nodes are joined once instead
+        of adding each node to the front of the string, which copied the whole string for every node
         @return: the open list as a string
         '''
-        output = ''
-        for open_node in self.OPEN:
-            output = '(N' + str(open_node.identifier) + ':' + open_node.get_operators_to_root() \
-                      + ' ' + str(open_node.cost) + ' ' + str(round(open_node.heuristic,2)) + ' ' + str(round(open_node.f,2)) +  ')' + output
-        return output
+        return ''.join(self.get_open_string(cell) for cell in self.get_open_cells())
 
     def get_closed_list_as_string(self):
         '''
         method used to convert the closed list as a string for printing
         @return: the closed list as a string
         '''
-        output = ''
-        for closed_node in self.CLOSED:
-            output += '(N' + str(closed_node.identifier) + ':' + closed_node.get_operators_to_root() + ' '\
-                      + str(closed_node.order_of_expansion)\
-                      + ' ' + str(closed_node.cost) + ' ' + str(round(closed_node.heuristic,2)) + ' ' + str(round(closed_node.f,2)) +  ')'
-        return output
+        return ''.join(self.get_closed_string(cell) for cell in self.CLOSED)
 
 
     def display(self,current_node):
         '''
-        method used to display output to the user on the terminal
-        @param current_node: the reference to the current node
-        @return: none
-        '''
-        output = ''
-        # check whether the node expansion value is higher than the current node expansions printed value
-        if self.options['display_node_expansion'] > 0:
-            output += str(current_node) + '\n'
-
-            # print the open list as a string
-            output += 'OPEN:\t{'
-            output += self.get_open_list_as_string()
-            output += '}\n'
-
-            # print the close list as a string
-            output += 'CLOSED:\t{'
-            output += self.get_closed_list_as_string()
-            output += '}\n'
-
-            # decrement the number of node expansions to display in debug mode
-            self.options['display_node_expansion'] -= 1
-
-            # display the output
-            print(output)
-
-        # check if the goal state is reached
-        if self.options['goal_reached'] :
-            # loop via the parents to the root/start node
-            while current_node != None:
-                # print the map on to the screen
-                map = ''
-                if self.options['display_map']:
-                    for i in range(len(self.MAP)):
-                        for j in range(len(self.MAP[0])):
-                            if current_node.coordinates[0] == i and current_node.coordinates[1] == j and \
-                                    self.MAP[current_node.coordinates[0]][current_node.coordinates[1]] != 'G' and \
-                                    self.MAP[current_node.coordinates[0]][current_node.coordinates[1]] != 'S':
-                                map += '*'
-                            else:
-                                map += self.MAP[i][j]
-                        map += '\n'
-                # get the path to the root from the goal state
-                current_node.get_operators_to_root()
-                # display the output on to the screen
-                output = map  + '\n' +  current_node.get_operators_to_root() + ' ' + str(current_node.cost) + '\n\n' + output
-                # set the current node as the parent for traversal
-                current_node = current_node.parent
-
-            # return the output
-            return output
+        method used to generate the output of the path from the start to the goal. The map is copied once and the marker
+        is moved from step to step, so each step is rendered without rebuilding the whole map
+        @param current_node: the reference to the goal node
+        @return: an iterator over the output of each step on the path as a string
+        '''
+        # loop via the parents to the root/start node to get the path
+        path = []
+        current = current_node.cell
+        while current >= 0:
+            path.append(current)
+            current = self.NODES.parent[current]
+        path.reverse()
+
+        # copy the rows of the map once as strings
+        rows = [''.join(row) + '\n' for row in self.MAP]
+        operators = ''
+        goals = 0
+        for cell in path:
+            x, y = divmod(cell, self.size)
+            # get the path from the root to the current step
+            operator = NodeStore.OPERATORS[self.NODES.operator[cell]]
+            operators = operators + '-' + operator if operators else operator
+            if self.MAP[x][y] == 'G':
+                goals += 1
 
-def graphsearch(map, flag, procedure_name):
+            # print the map on to the screen with the marker on the current step
+            map = ''
+            if self.options['display_map']:
+                if self.MAP[x][y] != 'G' and self.MAP[x][y] != 'S':
+                    rows[x] = rows[x][:y] + '*' + rows[x][y + 1:]
+                map = ''.join(rows)
+                rows[x] = ''.join(self.MAP[x]) + '\n'
+
+            # display the output of the current step
+            yield map + '\n' + operators + '-G' * goals + ' ' + str(self.NODES.cost[cell]) + '\n\n'
+
+def load_graph(map, stats=None):
     '''
-    driver method used to initialize the graph and call the correct search function
-    @param map: the input map with the size on the first row
-    @param flag: the number of node expansions to display
-    @param procedure_name: name of the algorithm to use as specified by the user
-    @return: the solution as a string, if no solution then return 'NO-PATH'
+    method used to initialize the graph for a map and generate the start node
+    @param map: the input map with the size on the first row, a NumPy grid read by read_grid or a MappedMap
+    @param stats: the SearchStats to add the time taken to and to keep for the searches of the graph, None for none
+    @return: the search graph
     '''
+    start = time.perf_counter()
+    # check whether the map was opened as a memory mapped file by map_file or read as a NumPy grid by read_grid
+    if isinstance(map, MappedMap):
+        # initialize the Search Graph class using the map size and add the mapped map to the search graph, with the
+        # node data kept in TileArrays so that the memory grows with the nodes generated and not with the map
+        search_graph = SearchGraph(len(map), tiled=True)
+        search_graph.add_mapped_map(map)
+    elif numpy is not None and isinstance(map, numpy.ndarray):
+        # initialize the Search Graph class using the grid size and add the grid to the search graph
+        search_graph = SearchGraph(len(map))
+        search_graph.add_grid(map)
+    else:
+        # extract the map size
+        map_size = map[0]
+        # initialize the Search Graph class using the map size
+        search_graph = SearchGraph(map_size)
+        # add the map to the search graph and generate the start node
+        search_graph.add_map(map)
+    if stats is not None:
+        stats.add_time('add_map', start)
+        search_graph.stats = stats
+    return search_graph
 
-    # extract the map size
-    map_size = map[0]
-    # initialize the Search Graph class using the map size
-    search_graph = SearchGraph(map_size)
-    # add the map to the search graph and generate the start node
-    search_graph.add_map(map)
-    # set the graph node expansion value
-    search_graph.options['display_node_expansion'] = flag
-
+def set_procedure(search_graph, procedure_name, weight=None, deadline=None):
+    '''
+    method used to set the graph options for the algorithm specified by the user
+    @param search_graph: the search graph
+    @param procedure_name: name of the algorithm to use as specified by the user
+    @param weight: the weight of the heuristic in the first round of the ARA procedure, None for ARA_WEIGHT
+    @param deadline: the time in seconds for the ARA procedure, None to run until the lowest cost path is found
+    @return: none
+    '''
     # determine the search type and set the graph options
+    search_graph.options['deepen'] = procedure_name in ("ID", "IDA")
+    search_graph.options['jump'] = procedure_name == "J"
+    search_graph.options['anytime'] = procedure_name == "ARA"
+    search_graph.options['weight'] = ARA_WEIGHT if weight is None else weight
+    search_graph.options['deadline'] = deadline
     if procedure_name == "D":
-        bound = 5  # you have to determine its value
+        bound = DLS_BOUND  # you have to determine its value
         # print("your code for DLS goes here")
         search_graph.options['bound'] = bound
         search_graph.options['algorithm'] = 'D'
     elif procedure_name == "A":
         # print("your code for A/A* goes here")
         search_graph.options['algorithm'] = 'A'
+    elif procedure_name == "ID":
+        # DLS with the bound grown by iterative deepening
+        search_graph.options['algorithm'] = 'D'
+    elif procedure_name == "IDA":
+        # A star with the bound on the f cost grown by iterative deepening
+        search_graph.options['algorithm'] = 'A'
+    elif procedure_name == "J":
+        # A star over the jump points of the map
+        search_graph.options['algorithm'] = 'J'
+    elif procedure_name == "B":
+        # A star from the start and from the goal at the same time
+        search_graph.options['algorithm'] = 'B'
+    elif procedure_name == "H":
+        # A star on the abstract graph of the clusters of the map
+        search_graph.options['algorithm'] = 'H'
+    elif procedure_name == "F":
+        # the moves of the distance field of the goals
+        search_graph.options['algorithm'] = 'F'
+    elif procedure_name == "ARA":
+        # rounds of weighted A star with a lower weight each time
+        search_graph.options['algorithm'] = 'A'
+    elif procedure_name == "DL":
+        # D* Lite from the goals, kept between searches
+        search_graph.options['algorithm'] = 'L'
     else:
         print("invalid procedure name")
 
+JUMP_ORDER = ['RU', 'LD', 'LU', 'RD', 'U', 'D', 'L', 'R']  # the order of the moves on the paths of jump point search
+GOAL_INDEX_MIN = 16          # the number of goals from which the goals are put in a spatial index
+DLS_BOUND = 5                # the depth bound of the DLS search
+ARA_WEIGHT = 3               # the weight of the heuristic in the first round of the ARA search
+ARA_WEIGHT_STEP = 0.5        # the amount the weight is lowered by after each round of the ARA search
+UNREACHABLE = 0xFFFFFFFF     # the distance of a cell that cannot be reached in the distance tables
+ENTRANCE_SPACING = 8         # the number of cells between the entrances of a long opening between two clusters
+REFINE_WINDOW = 32           # the number of moves in a window of the path refined by hierarchical path finding
+TRANSPOSITION_SIZE = 1 << 16 # the number of slots of the transposition table of the iterative deepening search
+FRONTIER_LIMIT = 1 << 16     # the highest number of records of the frontier kept between the deepening iterations
+WEIGHT_SCALE = 1024          # the number of steps of the ARA weight in 1, the f costs of ARA are scaled by it
+CELL_MASK = 0xFFFFFFFF       # the bits of the cell in an entry of a PriorityQueue
+TILE_SHIFT = 6               # the tiles of a TileArray are runs of 1 << TILE_SHIFT cells
+TILE_CELLS = 1 << TILE_SHIFT # the number of cells of a tile
+TILE_MASK = TILE_CELLS - 1   # the bits of the place of a cell in its tile
+TILED_CELLS = 1 << 22        # the number of cells of a map from which the search graph uses TileArrays
+PASSABLE = bytes(0 if code == ord('X') else 1 for code in range(256))    # 0 for a ridge and 1 for other terrain
+
+PROCEDURES = ("D", "A", "ID", "IDA", "J", "B", "H", "F", "ARA", "DL")     # the names of the algorithms that can be used
+
+worker_graph = None     # the search graph of a parallelsearch process
+worker_memory = None    # the shared memory with the map of a parallelsearch process
+
+def map_digest(map):
+    '''
+    method used to calculate a digest of the content of a map, the same for every way the map can be read
+    @param map: the input map with the size on the first row, a NumPy grid read by read_grid or a MappedMap
+    @return: the SHA-256 digest of the size and the rows of the map as a string of hexadecimal digits
+    '''
+    if isinstance(map, MappedMap) or (numpy is not None and isinstance(map, numpy.ndarray)):
+        size = len(map)
+        rows = map
+    else:
+        size = int(map[0])
+        rows = map[1:size + 1]
+    digest = hashlib.sha256(str(size).encode('ascii') + b'\n')
+    for row in rows:
+        if numpy is not None and isinstance(row, numpy.ndarray):
+            digest.update(row.tobytes())
+        else:
+            digest.update(''.join(row)[:size].encode('ascii'))
+        digest.update(b'\n')
+    return digest.hexdigest()
+
+def file_digest(file_name):
+    '''
+    method used to calculate a digest of the content of a file, such as a landmark or hierarchy file
+    @param file_name: the name of the file, None if no file is used
+    @return: the SHA-256 digest of the file as a string of hexadecimal digits, None if there is no file
+    '''
+    if file_name is None:
+        return None
+    digest = hashlib.sha256()
+    try:
+        with open(file_name, 'rb') as file_handle:
+            for block in iter(lambda: file_handle.read(1024 * 1024), b''):
+                digest.update(block)
+    except FileNotFoundError:
+        # the file is calculated from the map by the search, the same for every search of the map
+        return None
+    return digest.hexdigest()
+
+def search_options(procedure_name, landmarks=None, hierarchy=None, weight=None):
+    '''
+    get the settings of a search that are part of the key of its result in the cache. The landmark and hierarchy
+    files are part of the key by their content, as a file calculated with other settings can change the path found
+    @param procedure_name: name of the algorithm to use as specified by the user
+    @param landmarks: the name of the landmark file, None if not used
+    @param hierarchy: the name of the hierarchy file, None if not used
+    @param weight: the weight of the first round of the ARA procedure, None for ARA_WEIGHT
+    @return: the depth bound and the other settings
+    '''
+    bound = DLS_BOUND if procedure_name == "D" else None
+    options = (landmarks is not None, file_digest(landmarks), hierarchy is not None, file_digest(hierarchy))
+    if procedure_name == "ARA":
+        return bound, options + (ARA_WEIGHT if weight is None else weight,)
+    return bound, options
+
+def is_cached(procedure_name, deadline=None):
+    '''
+    check if the results of a search can be kept in the cache. The result of the ARA procedure with a deadline
+    depends on how many rounds finish in time, so it is not kept
+    @param procedure_name: name of the algorithm to use as specified by the user
+    @param deadline: the time in seconds for the ARA procedure, None if not used
+    @return: True if the results can be kept
+    '''
+    return procedure_name != "ARA" or deadline is None
+
+def cache_solution(cache, key, printed, solution):
+    '''
+    method used to pass on the output of each step of a solution and add the solution to the cache once all of it was
+    written. The steps are only kept until they are longer than the longest solution kept by the cache
+    @param cache: the ResultCache
+    @param key: the key of the result
+    @param printed: the printed output of the search
+    @param solution: an iterator over the output of each step
+    @return: an iterator over the same output
+    '''
+    steps = []
+    length = 0
+    for step in solution:
+        if steps is not None:
+            length += len(step)
+            if length <= cache.result_size:
+                steps.append(step)
+            else:
+                steps = None
+        yield step
+    if steps is not None:
+        cache.put(key, [printed, ''.join(steps)])
+
+def cachedsearch(map, flag, procedure_name, cache, landmarks=None, hierarchy=None, weight=None, deadline=None,
+                 stats=None, trace=None):
+    '''
+    driver method used to answer a search from the cache. If the result is not in the cache, graphsearch is run with
+    its printed output captured, and the output and the solution are added to the cache once the solution was written.
+    The printed output of a result found in the cache is printed again, with the time taken to find it in the cache
+    instead of the time taken by the search that was run
+    @param map: the input map with the size on the first row, a NumPy grid read by read_grid or a MappedMap
+    @param flag: the number of node expansions to display
+    @param procedure_name: name of the algorithm to use as specified by the user
+    @param cache: the ResultCache
+    @param landmarks: the name of the landmark file for the heuristic, None to use the distance to the goal
+    @param hierarchy: the name of the hierarchy file for the hierarchical search, None to build it when needed
+    @param weight: the weight of the heuristic in the first round of the ARA procedure, None for ARA_WEIGHT
+    @param deadline: the time in seconds for the ARA procedure, None to run until the lowest cost path is found
+    @param stats: the SearchStats to add the times and counters of the search to if it is run, None for none
+    @param trace: the Trace of the node expansions if the search is run, None to print flag node expansions
+    @return: the solution as a string or an iterator over the output of each step, if no solution then 'NO-PATH'
+    '''
+    if not is_cached(procedure_name, deadline):
+        return graphsearch(map, flag, procedure_name, landmarks, hierarchy, weight, deadline, stats, trace)
+    start = time.perf_counter()
+    bound, options = search_options(procedure_name, landmarks, hierarchy, weight)
+    key = ResultCache.get_key(map_digest(map), procedure_name, bound, flag, options=options)
+    value = cache.get(key)
+    if value is not None:
+        printed, solution = value
+        # the time line is the last line printed, replace the time of the search by the time of the lookup
+        lines = printed.splitlines(True)
+        if len(lines) > 0 and lines[-1].startswith("Time Taken for "):
+            lines[-1] = lines[-1].split(": ")[0] + ": " + str(time.perf_counter() - start) + "\n"
+        sys.stdout.write(''.join(lines))
+        return solution
+
+    printed = io.StringIO()
+    with contextlib.redirect_stdout(printed):
+        solution = graphsearch(map, flag, procedure_name, landmarks, hierarchy, weight, deadline, stats, trace)
+    sys.stdout.write(printed.getvalue())
+    if solution is None or isinstance(solution, str):
+        cache.put(key, [printed.getvalue(), solution])
+        return solution
+    return cache_solution(cache, key, printed.getvalue(), solution)
+
+def graphsearch(map, flag, procedure_name, landmarks=None, hierarchy=None, weight=None, deadline=None, stats=None,
+                trace=None, changes=None):
+    '''
+    driver method used to initialize the graph and call the correct search function
+    @param map: the input map with the size on the first row
+    @param flag: the number of node expansions to display
+    @param procedure_name: name of the algorithm to use as specified by the user
+    @param landmarks: the name of the landmark file for the heuristic, None to use the distance to the goal
+    @param hierarchy: the name of the hierarchy file for the hierarchical search, None to build it when needed
+    @param weight: the weight of the heuristic in the first round of the ARA procedure, None for ARA_WEIGHT
+    @param deadline: the time in seconds for the ARA procedure, None to run until the lowest cost path is found
+    @param stats: the SearchStats to add the times and counters of the search to, None for none
+    @param trace: the Trace of the node expansions, such as a TraceWriter, None to print flag node expansions
+    @param changes: an iterable of (x, y, terrain) cell changes to make after the search, the solution is then the
+                    solution of the search again on the changed map, None to search once
+    @return: the solution as an iterator over the output of each step, if no solution then return 'NO-PATH'
+    '''
+    # initialize the graph and generate the start node
+    search_graph = load_graph(map, stats)
+    if landmarks is not None:
+        use_landmarks(search_graph, landmarks)
+    if hierarchy is not None:
+        use_hierarchy(search_graph, hierarchy)
+    # set the number of node expansions to display
+    search_graph.trace = trace if trace is not None else Trace(flag)
+    # set the graph options for the algorithm
+    set_procedure(search_graph, procedure_name, weight, deadline)
+
     # call the search function to search the solution
+    search_graph.trace.start(search_graph)
     solution = search_graph.search()
+    # change the cells and search again, D* Lite only repairs the part of the last search affected by the changes
+    if changes is not None:
+        solution = search_graph.replan(changes)
 
     # return the solution
     return solution
 
+def batchsearch(map, queries, flag, procedure_name, landmarks=None, hierarchy=None, cache=None, weight=None,
+                deadline=None, stats=None):
+    '''
+    driver method used to answer many queries on one map. The map is loaded once and the graph is reset between the
+    queries, so the map, the move masks and the allocated arrays are reused
+    @param map: the input map with the size on the first row, a NumPy grid read by read_grid or a MappedMap
+    @param queries: an iterable of (start x, start y, goal x, goal y) coordinates
+    @param flag: the number of node expansions to display for each query
+    @param procedure_name: name of the algorithm to use as specified by the user
+    @param landmarks: the name of the landmark file for the heuristic, None to use the distance to the goal
+    @param hierarchy: the name of the hierarchy file for the hierarchical search, None to build it when needed
+    @param cache: the ResultCache of the solutions, None to search every query
+    @param weight: the weight of the heuristic in the first round of the ARA procedure, None for ARA_WEIGHT
+    @param deadline: the time in seconds for each query of the ARA procedure, None to find the lowest cost paths
+    @param stats: the SearchStats to add the times and counters of the searches to, None for none
+    @return: an iterator over the solution of each query as a string with the path and the cost, or 'NO-PATH'
+    '''
+    if cache is not None and not is_cached(procedure_name, deadline):
+        cache = None
+    if cache is not None:
+        digest = map_digest(map)
+        bound, options = search_options(procedure_name, landmarks, hierarchy, weight)
+    # the graph is only loaded when a query is not in the cache
+    search_graph = None
+    for query in queries:
+        if cache is not None:
+            key = ResultCache.get_key(digest, procedure_name, bound, flag, tuple(query), options)
+            solution = cache.get(key)
+            if solution is not None:
+                yield solution
+                continue
+        if search_graph is None:
+            search_graph = load_graph(map, stats)
+            if landmarks is not None:
+                use_landmarks(search_graph, landmarks)
+            if hierarchy is not None:
+                use_hierarchy(search_graph, hierarchy)
+            set_procedure(search_graph, procedure_name, weight, deadline)
+            search_graph.options['display_output'] = False
+        solution = run_query(search_graph, query, flag)
+        if cache is not None:
+            cache.put(key, solution)
+        yield solution
+
+def run_query(search_graph, query, flag=0):
+    '''
+    method used to clear the last search on a graph and search it again for a new start and goal
+    @param search_graph: the search graph with the options of the algorithm set
+    @param query: the (start x, start y, goal x, goal y) coordinates
+    @param flag: the number of node expansions to display
+    @return: the solution as a string with the path and the cost, or 'NO-PATH'
+    '''
+    start_X, start_Y, goal_X, goal_Y = query
+    size = search_graph.size
+
+    # clear the last search and set the start and goal of the query
+    search_graph.reset()
+    search_graph.trace = Trace(flag)
+    if not (0 <= start_X < size and 0 <= start_Y < size and 0 <= goal_X < size and 0 <= goal_Y < size):
+        return "NO-PATH"
+    search_graph.add_start(start_X * size + start_Y)
+    search_graph.set_goals([goal_X * size + goal_Y])
+
+    search_graph.search()
+    if search_graph.solution is None:
+        return "NO-PATH"
+    goal_node = Node(search_graph, search_graph.solution)
+    return goal_node.get_operators_to_root() + " " + str(goal_node.cost)
+
+def parallelsearch(map, queries, procedure_name, workers=None, landmarks=None, hierarchy=None, weight=None,
+                   deadline=None):
+    '''
+    driver method used to answer many queries on one map with a pool of processes. The map and its move masks are
+    copied once into shared memory, which every process reads instead of receiving its own copy of the map
+    @param map: the input map with the size on the first row, a NumPy grid read by read_grid or a MappedMap
+    @param queries: an iterable of (start x, start y, goal x, goal y) coordinates
+    @param procedure_name: name of the algorithm to use as specified by the user
+    @param workers: the number of processes, by default the number of processors
+    @param landmarks: the name of the landmark file for the heuristic, None to use the distance to the goal
+    @param hierarchy: the name of the hierarchy file for the hierarchical search, None to build it when needed
+    @param weight: the weight of the heuristic in the first round of the ARA procedure, None for ARA_WEIGHT
+    @param deadline: the time in seconds for each query of the ARA procedure, None to find the lowest cost paths
+    @return: a list with the (solution, time taken in seconds) of each query, in the order of the queries
+    '''
+    search_graph = load_graph(map)
+    # write the landmark and hierarchy files once if needed, the processes read the same files
+    if landmarks is not None:
+        use_landmarks(search_graph, landmarks)
+    if hierarchy is not None:
+        use_hierarchy(search_graph, hierarchy)
+    size = search_graph.size
+    # the move masks of a memory mapped map are not precomputed, the processes compute them when needed
+    moves = not isinstance(search_graph.MOVES, MoveCache)
+    shared = shared_memory.SharedMemory(create=True, size=max(1, size * size * (2 if moves else 1)))
+    try:
+        # copy the map row by row, followed by the move masks
+        for x in range(size):
+            shared.buf[x * size:(x + 1) * size] = ''.join(search_graph.MAP[x]).encode('ascii')
+        if moves:
+            shared.buf[size * size:2 * size * size] = search_graph.MOVES
+        del search_graph
+
+        with ProcessPoolExecutor(max_workers=workers, initializer=start_worker,
+                                 initargs=(shared.name, size, moves, procedure_name, landmarks,
+                                           hierarchy, weight, deadline)) as executor:
+            return list(executor.map(solve_query, queries, chunksize=16))
+    finally:
+        shared.close()
+        shared.unlink()
+
+def start_worker(shared_name, size, moves, procedure_name, landmarks=None, hierarchy=None, weight=None,
+                 deadline=None):
+    '''
+    method used to initialize a process of parallelsearch with a search graph over the map in shared memory
+    @param shared_name: the name of the shared memory with the map and the move masks
+    @param size: the height and width of the map (size x size)
+    @param moves: flag to state whether the move masks are in the shared memory
+    @param procedure_name: name of the algorithm to use as specified by the user
+    @param landmarks: the name of the landmark file for the heuristic, None to use the distance to the goal
+    @param hierarchy: the name of the hierarchy file for the hierarchical search, None to build it when needed
+    @param weight: the weight of the heuristic in the first round of the ARA procedure, None for ARA_WEIGHT
+    @param deadline: the time in seconds for each query of the ARA procedure, None to find the lowest cost paths
+    @return: none
+    '''
+    global worker_graph, worker_memory
+    worker_memory = shared_memory.SharedMemory(name=shared_name)
+    worker_graph = SearchGraph(size)
+    worker_graph.MAP = MappedMap(worker_memory.buf, size, 0, size)
+    if moves:
+        worker_graph.MOVES = worker_memory.buf[size * size:2 * size * size]
+    else:
+        worker_graph.MOVES = MoveCache(worker_graph)
+    if landmarks is not None:
+        read_landmark_file(worker_graph, landmarks)
+    if hierarchy is not None:
+        read_hierarchy_file(worker_graph, hierarchy)
+    set_procedure(worker_graph, procedure_name, weight, deadline)
+    worker_graph.options['display_output'] = False
+
+def solve_query(query):
+    '''
+    method used by a process of parallelsearch to answer one query
+    @param query: the (start x, start y, goal x, goal y) coordinates
+    @return: the solution and the time taken in seconds
+    '''
+    start = time.perf_counter()
+    solution = run_query(worker_graph, query)
+    return solution, time.perf_counter() - start
+
+def parallel_graphsearch(file_names, procedure_name, workers=None, flag=0, weight=None, deadline=None):
+    '''
+    driver method used to search many input files with a pool of processes, one file for each task
+    @param file_names: the names of the input files
+    @param procedure_name: name of the algorithm to use as specified by the user
+    @param workers: the number of processes, by default the number of processors
+    @param flag: the number of node expansions to display for each file
+    @param weight: the weight of the heuristic in the first round of the ARA procedure, None for ARA_WEIGHT
+    @param deadline: the time in seconds for each file of the ARA procedure, None to find the lowest cost paths
+    @return: a list with the (solution, printed output, time taken in seconds) of each file, in the order of the files
+    '''
+    count = len(file_names)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(solve_file, file_names, [procedure_name] * count, [flag] * count, [weight] * count,
+                                 [deadline] * count))
+
+def solve_file(file_name, procedure_name, flag=0, weight=None, deadline=None):
+    '''
+    method used by a process of parallel_graphsearch to search one input file. The output printed by the search is
+    captured so that the output of different files is not mixed
+    @param file_name: the name of the input file
+    @param procedure_name: name of the algorithm to use as specified by the user
+    @param flag: the number of node expansions to display
+    @param weight: the weight of the heuristic in the first round of the ARA procedure, None for ARA_WEIGHT
+    @param deadline: the time in seconds for the ARA procedure, None to find the lowest cost path
+    @return: the solution as a string, the printed output and the time taken in seconds
+    '''
+    start = time.perf_counter()
+    printed = io.StringIO()
+    with contextlib.redirect_stdout(printed):
+        solution = graphsearch(read_from_file(file_name), flag, procedure_name, weight=weight, deadline=deadline)
+        if not isinstance(solution, str) and solution is not None:
+            solution = ''.join(solution)
+    return solution, printed.getvalue(), time.perf_counter() - start
+
+def read_queries(file_handle):
+    '''
+    read the queries for batchsearch, one query on each line as four integers: start x, start y, goal x and goal y.
+    Empty lines and lines starting with # are skipped. The queries are read while they are answered, so a line that
+    is not four integers raises a ValueError with the line number when it is reached
+    @param file_handle: the file to read the queries from
+    @return: an iterator over the queries as tuples of integers
+    '''
+    for line_number, line in enumerate(file_handle, 1):
+        line = line.strip()
+        if line and not line.startswith('#'):
+            values = line.split()
+            if len(values) != 4 or not all(re.match(r"-?\d+$", value) for value in values):
+                raise ValueError("line " + str(line_number) + " of the query file should be four integers: start x, "
+                                 "start y, goal x and goal y")
+            yield tuple(int(value) for value in values)
+
+def read_changes(file_handle):
+    '''
+    read the cell changes for graphsearch, one change on each line as the x and y of the cell and its new terrain, a
+    single character that is not S or G. Empty lines and lines starting with # are skipped
+    @param file_handle: the file to read the changes from
+    @return: the list of the changes as (x, y, terrain) tuples
+    '''
+    changes = []
+    for line_number, line in enumerate(file_handle, 1):
+        line = line.strip()
+        if line and not line.startswith('#'):
+            values = line.split()
+            if (len(values) != 3 or not all(re.match(r"\d+$", value) for value in values[:2])
+                    or len(values[2]) != 1 or values[2] in 'SG'):
+                raise ValueError("line " + str(line_number) + " of the change file should be two integers and a "
+                                 "terrain other than S or G: x y terrain")
+            changes.append((int(values[0]), int(values[1]), values[2]))
+    return changes
+
+def read_inputs(file_handle):
+    '''
+    read the input files for parallel_graphsearch, one pair of file names on each line: the input file and the output
+    file its solution is written to. Empty lines and lines starting with # are skipped
+    @param file_handle: the file to read the file names from
+    @return: the list of (input file, output file) pairs
+    '''
+    pairs = []
+    for line_number, line in enumerate(file_handle, 1):
+        line = line.strip()
+        if line and not line.startswith('#'):
+            names = line.split()
+            if len(names) != 2:
+                raise ValueError("line " + str(line_number) + " of the input list should be two file names: the "
+                                 "input file and the output file")
+            pairs.append((names[0], names[1]))
+    return pairs
+
 def read_from_file(file_name):
     # You can change the file reading function to suit the way
     # you want to parse the file
@@ -548,6 +4372,234 @@ def read_from_file(file_name):
 
     return map
 
+def read_grid(file_name):
+    '''
+    read the whole input file in bulk into a NumPy array of terrain codes (the ASCII value of each cell), without
+    going through the map cell by cell. As with add_map, each row is the first size characters of its line, so any
+    characters after them on the line are ignored
+    @param file_name: the name of the input file
+    @return: the map as a size x size uint8 array
+    '''
+    with open(file_name, 'rb') as file_handle:
+        data = file_handle.read()
+    # the first line is the size of the map and the rest of the file is the map
+    header, _, body = data.partition(b'\n')
+    size = int(header)
+    rows = body.split(b'\n', size)[:size]
+    for i, row in enumerate(rows + [b''] * (size - len(rows))):
+        if len(row.rstrip(b'\r')) == 0:
+            raise ValueError("the map has " + str(i) + " rows but its size is " + str(size))
+        if len(row.rstrip(b'\r')) < size:
+            raise ValueError("row " + str(i + 1) + " of the map is shorter than the map size " + str(size))
+    grid = numpy.frombuffer(b''.join([row[:size] for row in rows]), dtype=numpy.uint8)
+    return grid.reshape(size, size)
+
+def map_file(file_name):
+    '''
+    open a map file, in the text input format or the binary grid format, as a memory mapped map. The file is not read
+    into memory, the search only reads the cells it reaches
+    @param file_name: the name of the map file
+    @return: the map as a MappedMap
+    '''
+    with open(file_name, 'rb') as file_handle:
+        data = mmap.mmap(file_handle.fileno(), 0, access=mmap.ACCESS_READ)
+    if data[:len(MappedMap.MAGIC)] == MappedMap.MAGIC:
+        # binary grid: the size and the numbers of start and goal cells as 4 byte integers, the start and goal cells,
+        # and then size x size terrain codes
+        offset = len(MappedMap.MAGIC)
+        size, start_count, goal_count = struct.unpack_from('<3I', data, offset)
+        offset += 12
+        cells = list(struct.unpack_from('<' + str(start_count + goal_count) + 'I', data, offset))
+        offset += 4 * len(cells)
+        return MappedMap(data, size, offset, size, cells[:start_count], cells[start_count:])
+    # text map: the size on the first line followed by one line for each row
+    end = data.find(b'\n')
+    offset = end + 1
+    line_end = data.find(b'\n', offset)
+    if line_end < 0:
+        line_end = len(data)
+    return MappedMap(data, int(data[:end]), offset, line_end - offset + 1)
+
+def write_grid_file(map, file_name):
+    '''
+    write a map in the binary grid format: a magic string, the size of the map and the numbers of start and goal
+    cells as 4 byte integers, the start cells and the goal cells as 4 byte integers, and the terrain code of every
+    cell, row by row. With the start and goal cells in the header, map_file does not read the map to find them
+    @param map: the input map with the size on the first row
+    @param file_name: the name of the binary grid file
+    @return: none
+    '''
+    size = int(map[0])
+    starts = []
+    goals = []
+    for x, row in enumerate(map[1:size + 1]):
+        row = row[:size]
+        for terrain, cells in (('S', starts), ('G', goals)):
+            y = row.find(terrain)
+            while y >= 0:
+                cells.append(x * size + y)
+                y = row.find(terrain, y + 1)
+    with open(file_name, 'wb') as file_handle:
+        file_handle.write(MappedMap.MAGIC + struct.pack('<3I', size, len(starts), len(goals)))
+        file_handle.write(struct.pack('<' + str(len(starts) + len(goals)) + 'I', *(starts + goals)))
+        for row in map[1:size + 1]:
+            file_handle.write(row[:size].encode('ascii'))
+
+LANDMARK_MAGIC = b'PPALT\n\0\0'   # first bytes of the landmark table format
+
+def write_landmark_file(search_graph, file_name):
+    '''
+    write the landmarks of a search graph and their distance tables: a magic string, the size of the map, the
+    number of landmarks, the number of bytes of each distance and the checksum of the map as 4 byte integers, the
+    landmark cells and then one table for each landmark with the distance of every cell, row by row. The distances
+    are stored in 2 bytes when they all fit, with the highest value for the cells that cannot be reached
+    @param search_graph: the search graph with the landmarks added by add_landmarks
+    @param file_name: the name of the landmark file
+    @return: none
+    '''
+    tables = search_graph.LANDMARK_TABLES
+    itemsize = 4
+    if all(distance < 0xFFFF for table in tables for distance in table if distance != UNREACHABLE):
+        itemsize = 2
+    with open(file_name, 'wb') as file_handle:
+        file_handle.write(LANDMARK_MAGIC + struct.pack('<IIII', search_graph.size, len(tables), itemsize,
+                                                       search_graph.map_checksum()))
+        file_handle.write(array('i', search_graph.LANDMARKS).tobytes())
+        for table in tables:
+            if itemsize == 2:
+                table = array('H', (0xFFFF if distance == UNREACHABLE else distance for distance in table))
+            file_handle.write(table.tobytes())
+
+def read_landmark_file(search_graph, file_name):
+    '''
+    add the landmarks in a file written by write_landmark_file to a search graph. The file is memory mapped and the
+    tables are read from the mapped file, so processes that read the same file share its pages
+    @param search_graph: the search graph of the map the landmarks were calculated for
+    @param file_name: the name of the landmark file
+    @return: True if the landmarks were added, False if the file was written for another map
+    '''
+    with open(file_name, 'rb') as file_handle:
+        data = mmap.mmap(file_handle.fileno(), 0, access=mmap.ACCESS_READ)
+    offset = len(LANDMARK_MAGIC)
+    if data[:offset] != LANDMARK_MAGIC:
+        return False
+    size, count, itemsize, checksum = struct.unpack_from('<IIII', data, offset)
+    if size != search_graph.size or checksum != search_graph.map_checksum():
+        return False
+    offset += 16
+    landmarks = list(struct.unpack_from('<%di' % count, data, offset))
+    offset += 4 * count
+
+    cells = size * size
+    tables = []
+    for index in range(count):
+        table = memoryview(data)[offset:offset + cells * itemsize].cast('H' if itemsize == 2 else 'I')
+        tables.append(table)
+        offset += cells * itemsize
+    search_graph.set_landmarks(landmarks, tables)
+    return True
+
+def use_landmarks(search_graph, file_name, count=8):
+    '''
+    add the landmarks in a landmark file to a search graph. If the file is not present or was written for another
+    map, the landmarks are calculated and the file is written first, so the tables are only calculated once for a map
+    @param search_graph: the search graph
+    @param file_name: the name of the landmark file
+    @param count: the number of landmarks to calculate
+    @return: none
+    '''
+    try:
+        if read_landmark_file(search_graph, file_name):
+            return
+    except FileNotFoundError:
+        pass
+    search_graph.add_landmarks(count)
+    write_landmark_file(search_graph, file_name)
+
+def write_hierarchy_file(search_graph, file_name):
+    '''
+    write the abstract graph of a search graph: a magic string, the size of the map, the size of the clusters, the
+    number of entrances, the number of edges and the checksum of the map as 4 byte integers, the entrance cells, the
+    first entrance, last entrance, cost and number of operators of every edge, and then the operator codes of all the
+    edges
+    @param search_graph: the search graph with the abstract graph added by add_hierarchy
+    @param file_name: the name of the hierarchy file
+    @return: none
+    '''
+    hierarchy = search_graph.HIERARCHY
+    first = array('i')
+    last = array('i')
+    costs = array('i')
+    lengths = array('i')
+    operators = []
+    for entrance, edges in enumerate(hierarchy.edges):
+        for other, cost, path in edges:
+            first.append(entrance)
+            last.append(hierarchy.index[other])
+            costs.append(cost)
+            lengths.append(len(path))
+            operators.append(path)
+    with open(file_name, 'wb') as file_handle:
+        file_handle.write(Hierarchy.MAGIC + struct.pack('<IIIII', hierarchy.size, hierarchy.cluster_size,
+                                                        len(hierarchy.cells), len(first), hierarchy.checksum))
+        file_handle.write(array('i', hierarchy.cells).tobytes())
+        for column in (first, last, costs, lengths):
+            file_handle.write(column.tobytes())
+        file_handle.write(b''.join(operators))
+
+def read_hierarchy_file(search_graph, file_name):
+    '''
+    add the abstract graph in a file written by write_hierarchy_file to a search graph
+    @param search_graph: the search graph of the map the abstract graph was built for
+    @param file_name: the name of the hierarchy file
+    @return: True if the abstract graph was added, False if the file was written for another map
+    '''
+    with open(file_name, 'rb') as file_handle:
+        data = file_handle.read()
+    offset = len(Hierarchy.MAGIC)
+    if data[:offset] != Hierarchy.MAGIC:
+        return False
+    size, cluster_size, count, edge_count, checksum = struct.unpack_from('<IIIII', data, offset)
+    if size != search_graph.size or checksum != search_graph.map_checksum():
+        return False
+    offset += 20
+
+    hierarchy = Hierarchy(size, cluster_size)
+    hierarchy.checksum = checksum
+    cells = array('i')
+    cells.frombytes(data[offset:offset + 4 * count])
+    offset += 4 * count
+    for cell in cells:
+        hierarchy.add_entrance(cell)
+    columns = []
+    for index in range(4):
+        column = array('i')
+        column.frombytes(data[offset:offset + 4 * edge_count])
+        columns.append(column)
+        offset += 4 * edge_count
+    for first, last, cost, length in zip(*columns):
+        hierarchy.add_edge(first, last, cost, data[offset:offset + length])
+        offset += length
+    search_graph.HIERARCHY = hierarchy
+    return True
+
+def use_hierarchy(search_graph, file_name, cluster_size=16):
+    '''
+    add the abstract graph in a hierarchy file to a search graph. If the file is not present or was written for
+    another map, the abstract graph is built and the file is written first
+    @param search_graph: the search graph
+    @param file_name: the name of the hierarchy file
+    @param cluster_size: the height and width of the clusters when the abstract graph is built
+    @return: none
+    '''
+    try:
+        if read_hierarchy_file(search_graph, file_name):
+            return
+    except FileNotFoundError:
+        pass
+    search_graph.add_hierarchy(cluster_size)
+    write_hierarchy_file(search_graph, file_name)
+
 
 ###############################################################################
 ########### DO NOT CHANGE ANYTHING BELOW ######################################
@@ -555,7 +4607,11 @@ def read_from_file(file_name):
 
 def write_to_file(file_name, solution):
     file_handle = open(file_name, 'w')
-    file_handle.write(solution)
+    # the solution is either a string or an iterator over the output of each step
+    if isinstance(solution, str):
+        solution = [solution]
+    file_handle.writelines(solution)
+    file_handle.close()
 
 def main():
     # create a parser object
@@ -565,7 +4621,52 @@ def main():
     parser.add_argument("input_file_name", help="specifies the name of the input file", type=str)
     parser.add_argument("output_file_name", help="specifies the name of the output file", type=str)
     parser.add_argument("flag", help="specifies the number of steps that should be printed", type=int)
-    parser.add_argument("procedure_name", help="specifies the type of algorithm to be applied, can be D, A", type=str)
+    parser.add_argument("procedure_name", help="specifies the type of algorithm to be applied, can be D, A, "
+                                                   "ID (iterative deepening DLS), IDA (IDA star), J (jump point search), "
+                                                   "B (bidirectional A star), H (hierarchical A star), "
+                                                   "F (distance field of the goal), ARA (anytime weighted A star), "
+                                                   "DL (D* Lite)",
+                        type=str)
+    parser.add_argument("--mmap", help="memory map the input file instead of reading it into memory, a text map is "
+                                       "read once to find the start and goal but a binary grid written by "
+                                       "--write-grid is not",
+                        action="store_true")
+    parser.add_argument("--write-grid", help="write the input map, a text map, to this file in the binary grid "
+                                             "format before the search, to be searched later with --mmap", type=str)
+    parser.add_argument("--queries", help="answer the start and goal queries in this file (- for standard input) "
+                                          "on the input map, one query on each line as: start_x start_y goal_x goal_y",
+                        type=str)
+    parser.add_argument("--workers", help="answer the queries or search the input files with this number of "
+                                          "processes", type=int)
+    parser.add_argument("--inputs", help="search the input files listed in this file (- for standard input) as well "
+                                         "as the input file, with a pool of processes, one pair of file names on "
+                                         "each line as: input_file output_file", type=str)
+    parser.add_argument("--landmarks", help="estimate the cost to the goal with the landmark tables in this file, "
+                                            "calculated and written first if the file is not present", type=str)
+    parser.add_argument("--cache", help="keep the solutions in this directory and reuse them for the same map and "
+                                        "query", type=str)
+    parser.add_argument("--hierarchy", help="use the abstract graph in this file for the H procedure, built and "
+                                            "written first if the file is not present", type=str)
+    parser.add_argument("--weight", help="the weight of the heuristic in the first round of the ARA procedure",
+                        type=float)
+    parser.add_argument("--deadline", help="give the best path found by the ARA procedure after this number of "
+                                           "seconds", type=float)
+    parser.add_argument("--stats", help="write the time of each phase and the counters of the search as JSON to this "
+                                        "file (- for standard output)", type=str)
+    parser.add_argument("--trace", help="write the trace of the node expansions to this file (- for standard "
+                                        "output) while the search runs, instead of printing it, not used with "
+                                        "--queries, --workers or --cache", type=str)
+    parser.add_argument("--trace-format", help="the format of the trace file: text as printed, json for JSON lines or "
+                                               "delta for the changes of the open and closed lists (read with "
+                                               "tracereplay.py)",
+                        choices=TraceWriter.FORMATS + ('delta',), default='text')
+    parser.add_argument("--changes", help="change the cells in this file (- for standard input) after the search and "
+                                          "search again, D* Lite repairs its last search, one change on each line "
+                                          "as: x y terrain, not used with --mmap, --queries, --workers or --cache",
+                        type=str)
+    parser.add_argument("--profile", help="profile the search and the output, and write the profile to this file "
+                                          "name with .pstats added and the sampled stacks with .collapsed added",
+                        type=str)
 
 
     # get all the arguments
@@ -612,25 +4713,201 @@ def main():
     procedure_name = arguments.procedure_name
 
 
+    # keep the times and counters of the search if requested
+    stats = None
+    if arguments.stats is not None:
+        stats = SearchStats()
+    start = time.perf_counter()
+
+    # search many input files with a pool of processes if requested
+    if arguments.inputs is not None:
+        if procedure_name not in PROCEDURES:
+            print("invalid procedure name")
+            return -1
+        unused = [name for name, value in (("--queries", arguments.queries), ("--mmap", arguments.mmap or None),
+                                           ("--write-grid", arguments.write_grid),
+                                           ("--landmarks", arguments.landmarks), ("--hierarchy", arguments.hierarchy),
+                                           ("--cache", arguments.cache), ("--trace", arguments.trace),
+                                           ("--changes", arguments.changes), ("--profile", arguments.profile))
+                  if value is not None]
+        if len(unused) > 0:
+            print("Error: --inputs cannot be used with " + ", ".join(unused))
+            return -1
+        try:
+            with (sys.stdin if arguments.inputs == '-' else open(arguments.inputs)) as file_handle:
+                pairs = [(input_file_name, output_file_name)] + read_inputs(file_handle)
+            results = parallel_graphsearch([input_name for input_name, output_name in pairs], procedure_name,
+                                           arguments.workers, flag, arguments.weight, arguments.deadline)
+        except FileNotFoundError as error:
+            print("input file is not present: " + str(error.filename))
+            return -1
+        except ValueError as error:
+            print("Error: " + str(error))
+            return -1
+        # print the output of each file and write its solution, in the order of the files
+        for (input_name, output_name), (solution, printed, seconds) in zip(pairs, results):
+            print(input_name)
+            sys.stdout.write(printed)
+            if solution is not None:
+                write_to_file(output_name, solution)
+            if stats is not None:
+                stats.add_task(seconds)
+        if stats is not None:
+            if arguments.stats == '-':
+                print(stats.to_json())
+            else:
+                with open(arguments.stats, 'w') as file_handle:
+                    file_handle.write(stats.to_json() + '\n')
+        return
+
     try:
-        map = read_from_file(input_file_name) # get the map
+        # write the map in the binary grid format if requested
+        if arguments.write_grid is not None:
+            write_grid_file(read_from_file(input_file_name), arguments.write_grid)
+        # get the map, as a memory mapped file if requested or as a NumPy grid if NumPy is installed
+        if arguments.mmap:
+            map = map_file(input_file_name)
+        elif numpy is not None:
+            map = read_grid(input_file_name)
+        else:
+            map = read_from_file(input_file_name)
     except FileNotFoundError:
         print("input file is not present")
         return -1
+    except ValueError as error:
+        print("Error: " + str(error))
+        return -1
+    # read the cell changes to make after the search if requested
+    changes = None
+    if arguments.changes is not None:
+        # a memory mapped map cannot be changed, and the queries, the processes and the cache search the map as read
+        unused = [name for name, value in (("--mmap", arguments.mmap or None), ("--queries", arguments.queries),
+                                           ("--workers", arguments.workers), ("--cache", arguments.cache))
+                  if value is not None]
+        if len(unused) > 0:
+            print("Error: --changes cannot be used with " + ", ".join(unused))
+            return -1
+        try:
+            with (sys.stdin if arguments.changes == '-' else open(arguments.changes)) as file_handle:
+                changes = read_changes(file_handle)
+        except FileNotFoundError:
+            print("change file is not present")
+            return -1
+        except ValueError as error:
+            print("Error: " + str(error))
+            return -1
+    if stats is not None:
+        stats.add_time('parse', start)
     # print(map)
+    # keep the solutions on disk if requested
+    cache = None
+    if arguments.cache is not None:
+        cache = ResultCache(arguments.cache)
+
     solution_string = "" # contains solution
     write_flag = 0 # to control access to output file
 
-    # take a decision based upon the procedure name
-    if procedure_name == "D" or procedure_name == "A":
-        solution_string = graphsearch(map, flag, procedure_name)
-        write_flag = 1
-    else:
-        print("invalid procedure name")
+    # write the trace to a file while the search runs if requested
+    trace = None
+    if arguments.trace is not None:
+        # the searches of the queries and of the processes are not traced, and a result from the cache has no trace
+        unused = [name for name, value in (("--queries", arguments.queries), ("--workers", arguments.workers),
+                                           ("--cache", arguments.cache)) if value is not None]
+        if len(unused) > 0:
+            print("Error: --trace cannot be used with " + ", ".join(unused))
+            return -1
+        if arguments.trace_format == 'delta' and procedure_name not in DeltaTrace.PROCEDURES:
+            print("Error: the delta trace is only written for the procedures " + ", ".join(DeltaTrace.PROCEDURES))
+            return -1
+        trace_file = sys.stdout if arguments.trace == '-' else open(arguments.trace, 'w')
+        if arguments.trace_format == 'delta':
+            trace = DeltaTrace(flag, trace_file)
+        else:
+            trace = TraceWriter(flag, trace_file, arguments.trace_format)
+
+    # profile the search and the output if requested
+    profiler = None
+    if arguments.profile is not None:
+        profiler = Profiler(arguments.profile)
+        profiler.start()
+
+    # stop profiling even if the search fails
+    try:
+        # take a decision based upon the procedure name
+        if procedure_name in PROCEDURES and arguments.queries is not None:
+            # answer every query on the map and write one solution on each line
+            if arguments.queries == '-':
+                query_file = sys.stdin
+            else:
+                try:
+                    query_file = open(arguments.queries)
+                except FileNotFoundError:
+                    print("query file is not present")
+                    return -1
+            queries = read_queries(query_file)
+            if arguments.workers is not None:
+                try:
+                    queries = list(queries)
+                except ValueError as error:
+                    print("Error: " + str(error))
+                    return -1
+                solutions = []
+                for solution, seconds in parallelsearch(map, queries, procedure_name, arguments.workers,
+                                                        arguments.landmarks, arguments.hierarchy, arguments.weight,
+                                                        arguments.deadline):
+                    solutions.append(solution)
+                    # the time taken by each query is part of the stats, the processes do not keep any other stats
+                    if stats is not None:
+                        stats.add_task(seconds)
+            else:
+                solutions = batchsearch(map, queries, flag, procedure_name, arguments.landmarks,
+                                        arguments.hierarchy, cache, arguments.weight, arguments.deadline, stats)
+            solution_string = (solution + '\n' for solution in solutions)
+            write_flag = 1
+        elif procedure_name in PROCEDURES:
+            if cache is not None:
+                solution_string = cachedsearch(map, flag, procedure_name, cache, arguments.landmarks,
+                                               arguments.hierarchy, arguments.weight, arguments.deadline, stats,
+                                               trace)
+            else:
+                try:
+                    solution_string = graphsearch(map, flag, procedure_name, arguments.landmarks,
+                                                  arguments.hierarchy, arguments.weight, arguments.deadline, stats,
+                                                  trace, changes)
+                except ValueError as error:
+                    # a change of a cell that is not on the map or of a start or goal cell
+                    if changes is None:
+                        raise
+                    print("Error: " + str(error))
+                    return -1
+            write_flag = 1
+        else:
+            print("invalid procedure name")
+
+        # call function write to file only in case we have a solution
+        if write_flag == 1:
+            try:
+                write_to_file(output_file_name, solution_string)
+            except ValueError as error:
+                # the queries are read while the solutions are written
+                if arguments.queries is None:
+                    raise
+                print("Error: " + str(error))
+                return -1
+    finally:
+        if profiler is not None:
+            profiler.stop()
 
-    # call function write to file only in case we have a solution
-    if write_flag == 1:
-        write_to_file(output_file_name, solution_string)
+    if trace is not None and trace.file_handle is not sys.stdout:
+        trace.file_handle.close()
+
+    # write the stats after the output, so that the time of the output is included
+    if stats is not None:
+        if arguments.stats == '-':
+            print(stats.to_json())
+        else:
+            with open(arguments.stats, 'w') as file_handle:
+                file_handle.write(stats.to_json() + '\n')
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
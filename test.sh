@@ -45,4 +45,117 @@ python planpath.py INPUT/input7.txt OUTPUT/output7.txt 0 A
 echo 'input8.txt'
 python planpath.py INPUT/input8.txt OUTPUT/output8.txt 0 A
 echo 'input9.txt'
-python planpath.py INPUT/input9.txt OUTPUT/output9.txt 0 A
\ No newline at end of file
+python planpath.py INPUT/input9.txt OUTPUT/output9.txt 0 A
+
+echo 'Testing several goals....'
+echo ''
+
+# the nearest goal is one move down from the start, every procedure that finds the cheapest path should take it
+for procedure in A J IDA ARA B H F DL
+do
+    echo "input0.txt $procedure"
+    python planpath.py INPUT/input0.txt OUTPUT/output0.txt 0 $procedure | grep '^S-D-G 2$' > /dev/null || echo 'FAILED: expected S-D-G 2'
+done
+
+echo 'Testing several input files....'
+echo ''
+
+# the input files are searched by a pool of processes and the solutions are written in the same order as above
+printf 'INPUT/input%d.txt OUTPUT/output%d.txt\n' 2 2 3 3 4 4 5 5 6 6 7 7 8 8 9 9 | \
+    python planpath.py INPUT/input1.txt OUTPUT/output1.txt 0 A --inputs - --workers 2
+
+echo 'Testing the binary grid....'
+echo ''
+
+# a map written in the binary grid format and searched as a memory mapped file should give the same solution
+for i in 1 2 3 4 5 6 7 8 9
+do
+    echo "input$i.txt"
+    python planpath.py INPUT/input$i.txt OUTPUT/output$i.txt 0 A --write-grid INPUT/input$i.txt.grid > /dev/null
+    python planpath.py INPUT/input$i.txt.grid OUTPUT/output$i.txt.grid 0 A --mmap > /dev/null
+    cmp -s OUTPUT/output$i.txt OUTPUT/output$i.txt.grid || echo "FAILED: another solution from the grid of input$i.txt"
+    rm -f INPUT/input$i.txt.grid OUTPUT/output$i.txt.grid
+done
+
+echo 'Testing the changed cells....'
+echo ''
+
+# a ridge is put on every third cell of the middle row and the ridges of the first row are cleared, after the search
+# the replanned path should cost the same as the path of a new search on the changed map
+path_cost() {
+    # the cost of the path in an output file, the last field of the last line that is not empty
+    awk 'NF { cost = $NF } END { print cost }' "$1"
+}
+
+for procedure in DL A
+do
+    for i in 1 2 3 4 5 6 7 8 9
+    do
+        echo "input$i.txt $procedure"
+        awk '{ sub(/\r$/, "") }
+             NR == 1 { size = $1 }
+             NR > 1 { x = NR - 2
+                      for (y = 0; y < size; y++) {
+                          c = substr($0, y + 1, 1)
+                          if (c == "S" || c == "G") continue
+                          if (x == int(size / 2) && y % 3 == 1 && c != "X") print x, y, "X"
+                          else if (x == 0 && c == "X") print x, y, "R"
+                      } }' INPUT/input$i.txt > INPUT/input$i.txt.changes
+        awk '{ sub(/\r$/, "") }
+             FILENAME == ARGV[1] { terrain[$1 " " $2] = $3; next }
+             FNR == 1 { print; next }
+             { line = ""
+               for (y = 0; y < length($0); y++) {
+                   key = (FNR - 2) " " y
+                   line = line (key in terrain ? terrain[key] : substr($0, y + 1, 1))
+               }
+               print line }' INPUT/input$i.txt.changes INPUT/input$i.txt > INPUT/input$i.txt.changed
+        python planpath.py INPUT/input$i.txt OUTPUT/output$i.txt.changed 0 $procedure \
+            --changes INPUT/input$i.txt.changes > /dev/null
+        python planpath.py INPUT/input$i.txt.changed OUTPUT/output$i.txt.new 0 A > /dev/null
+        [ -n "$(path_cost OUTPUT/output$i.txt.new)" ] && \
+        [ "$(path_cost OUTPUT/output$i.txt.changed)" = "$(path_cost OUTPUT/output$i.txt.new)" ] || \
+            echo "FAILED: the replanned cost of input$i.txt is not the cost of a new search"
+        rm -f INPUT/input$i.txt.changes INPUT/input$i.txt.changed OUTPUT/output$i.txt.changed OUTPUT/output$i.txt.new
+    done
+done
+
+echo 'Testing the path costs....'
+echo ''
+
+# every procedure that finds the cheapest path, and every way to give A* its map or estimates, should find a path of
+# the same cost as A*. The landmark, hierarchy and cache files are written by the first run and read by the second
+for i in 1 2 3 4 5 6 7 8 9
+do
+    echo "input$i.txt"
+    python planpath.py INPUT/input$i.txt OUTPUT/output$i.txt 0 A > /dev/null
+    expected=$(path_cost OUTPUT/output$i.txt)
+    for options in J IDA B H F DL ARA "A --mmap" "A --landmarks OUTPUT/landmarks$i" "A --landmarks OUTPUT/landmarks$i" \
+                   "H --hierarchy OUTPUT/hierarchy$i" "H --hierarchy OUTPUT/hierarchy$i" "A --cache OUTPUT/cache" \
+                   "A --cache OUTPUT/cache"
+    do
+        python planpath.py INPUT/input$i.txt OUTPUT/output$i.txt.cost 0 $options > /dev/null
+        [ -n "$expected" ] && [ "$(path_cost OUTPUT/output$i.txt.cost)" = "$expected" ] || \
+            echo "FAILED: $options does not find a path of cost $expected on input$i.txt"
+    done
+    rm -f OUTPUT/output$i.txt.cost OUTPUT/landmarks$i OUTPUT/hierarchy$i
+done
+rm -rf OUTPUT/cache
+
+echo 'Testing the trace replay....'
+echo ''
+
+# the open and closed lists rebuilt from a delta trace should be printed the same as the trace of the search
+for procedure in D A J
+do
+    for i in 1 2 3 4 5 6 7 8 9
+    do
+        echo "input$i.txt $procedure"
+        python planpath.py INPUT/input$i.txt OUTPUT/output$i.txt 1000 $procedure --trace OUTPUT/trace$i.txt > /dev/null
+        python planpath.py INPUT/input$i.txt OUTPUT/output$i.txt 1000 $procedure --trace OUTPUT/trace$i.delta \
+            --trace-format delta > /dev/null
+        python tracereplay.py OUTPUT/trace$i.delta | cmp -s OUTPUT/trace$i.txt - || \
+            echo "FAILED: the replayed trace of input$i.txt is not the trace of the search"
+        rm -f OUTPUT/trace$i.txt OUTPUT/trace$i.delta
+    done
+done
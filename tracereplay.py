@@ -0,0 +1,183 @@
+'''
+Replay of the delta traces written by planpath with --trace-format delta. The first line of a delta trace is the state
+of the search when it starts and each following line holds the changes of the open list up to one node expansion, so
+the full open and closed lists at any node expansion are rebuilt by applying the records in order. The rebuilt records
+are printed in the same text format as the trace of planpath
+'''
+import argparse as ap
+import json
+import sys
+
+class TraceReplay:
+    '''
+    The TraceReplay Class keeps the nodes, the open list and the closed list of a search while the records of a delta
+    trace are applied to it. The open list of a priority frontier is ordered as in the priority queue of planpath: by
+    the f cost, then the nodes generated by a diagonal move, then the nodes pushed first
+    '''
+    def __init__(self, header):
+        '''
+        Method used to instantiate a class
+        @param header: the first line of the delta trace as a dictionary
+        '''
+        self.size = header['size']                                  # the height and width of the map
+        self.GOALS = set(header['goals'])                           # the cells of the goal nodes
+        self.OPERATORS = header['operators']                        # operator names indexed by operator code
+        self.BEST_OPERATORS = set(header['best_operators'])         # codes of the diagonal operators
+        self.priority = header['frontier'] == 'priority'            # whether the open list is a priority queue
+        # the data of each node by cell: identifier, parent, operator, cost, heuristic, f and order of expansion
+        self.NODES = {}
+        for cell, identifier, parent, operator, cost, heuristic, f, order in header['nodes']:
+            self.NODES[cell] = [identifier, parent, operator, cost, heuristic, f, order]
+        self.CHILDREN = {}                                          # the child cells of the nodes expanded
+        self.CLOSED = list(header['closed'])                        # the closed list in the order of expansion
+        self.push_count = 0                                         # number of pushes, used to break ties
+        self.step = 0                                               # the number of records applied
+        if self.priority:
+            # the priority of each cell of the open list, the nodes of the first line keep their order
+            self.OPEN = {}
+            for index, cell in enumerate(header['open']):
+                self.OPEN[cell] = self.get_priority(cell, -index - 1)
+        else:
+            # the open list as a stack, the node to be expanded next last
+            self.OPEN = list(header['open'])
+
+    def get_priority(self, cell, push_count):
+        '''
+        get the priority of a node in a priority frontier
+        @param cell: the cell of the node
+        @param push_count: the order of the push, used to break ties first in first out
+        @return: the priority as a tuple
+        '''
+        node = self.NODES[cell]
+        return (node[5], 0 if node[2] in self.BEST_OPERATORS else 1, push_count)
+
+    def apply(self, record):
+        '''
+        apply the changes of a record and add the node expanded to the closed list
+        @param record: one line of the delta trace after the first as a dictionary
+        @return: none
+        '''
+        for change in record['changes']:
+            cell = change[1]
+            if change[0] == '-':
+                if self.priority:
+                    del self.OPEN[cell]
+                elif self.OPEN.pop() != cell:
+                    raise ValueError("step " + str(record['step']) + ": cell " + str(cell) + " is not next in the "
+                                     "open list")
+                continue
+            # a node pushed or re-prioritised takes the data of the change and keeps its order of expansion
+            identifier, parent, operator, cost, heuristic, f = change[2:]
+            order = self.NODES[cell][6] if cell in self.NODES else 0
+            self.NODES[cell] = [identifier, parent, operator, cost, heuristic, f, order]
+            if self.priority:
+                self.OPEN[cell] = self.get_priority(cell, self.push_count)
+                self.push_count += 1
+            else:
+                self.OPEN.append(cell)
+
+        cell = record['closed']
+        self.NODES[cell][6] = record['order_of_expansion']
+        self.CHILDREN[cell] = record['children']
+        self.CLOSED.append(cell)
+        self.step = record['step']
+
+    def get_operators_to_root(self, cell):
+        '''
+        generate the path from the start to a node as a string, a goal on the path is marked at the end of the path
+        @param cell: the cell of the node
+        @return: the path as a string
+        '''
+        operators = []
+        goals = 0
+        while cell >= 0:
+            node = self.NODES[cell]
+            operators.append(self.OPERATORS[node[2]])
+            if cell in self.GOALS:
+                goals += 1
+            cell = node[1]
+        return '-'.join(reversed(operators)) + '-G' * goals
+
+    def get_open_cells(self):
+        '''
+        get the cells of the open list in the order they are printed, the node to be expanded next first
+        @return: the list of cells
+        '''
+        if self.priority:
+            return sorted(self.OPEN, key=self.OPEN.get)
+        return self.OPEN[::-1]
+
+    def get_node_string(self, cell, order=False):
+        '''
+        convert a node of the open or closed list to a string for printing
+        @param cell: the cell of the node
+        @param order: True to add the order of expansion, as in the closed list
+        @return: the node as a string
+        '''
+        identifier, parent, operator, cost, heuristic, f, order_of_expansion = self.NODES[cell]
+        fields = [str(cost), str(heuristic), str(f)]
+        if order:
+            fields.insert(0, str(order_of_expansion))
+        return '(N' + str(identifier) + ':' + self.get_operators_to_root(cell) + ' ' + ' '.join(fields) + ')'
+
+    def __str__(self):
+        '''
+        convert the last node expanded, the open list and the closed list to a string in the text format of the trace
+        @return: the record as a string
+        '''
+        cell = self.CLOSED[-1]
+        identifier, parent, operator, cost, heuristic, f, order_of_expansion = self.NODES[cell]
+        children = ','.join('N' + str(self.NODES[child][0]) + ':' + self.get_operators_to_root(child)
+                            for child in self.CHILDREN[cell])
+        open_list = ''.join(self.get_node_string(open_cell) for open_cell in self.get_open_cells())
+        closed_list = ''.join(self.get_node_string(closed_cell, True) for closed_cell in self.CLOSED)
+        return ''.join(['N', str(identifier), ':', self.get_operators_to_root(cell), '\t',
+                        ' '.join([str(order_of_expansion), str(cost), str(heuristic), str(f)]), '\n',
+                        'Children:\t{', children, '}\n',
+                        'OPEN:\t{', open_list, '}\n',
+                        'CLOSED:\t{', closed_list, '}\n'])
+
+def replay(file_handle, steps=None):
+    '''
+    apply the records of a delta trace and yield the full view of the search at the steps asked for. The file is read
+    one line at a time and only up to the last step asked for
+    @param file_handle: the delta trace file
+    @param steps: the node expansions to rebuild counting from 1, None for all of them
+    @return: an iterator over the step and the TraceReplay at that step
+    '''
+    header = file_handle.readline()
+    if not header:
+        raise ValueError("the delta trace is empty")
+    trace = TraceReplay(json.loads(header))
+    if steps is not None:
+        steps = set(steps)
+        last = max(steps) if steps else 0
+    for line in file_handle:
+        if steps is not None and trace.step >= last:
+            break
+        trace.apply(json.loads(line))
+        if steps is None or trace.step in steps:
+            yield trace.step, trace
+
+def main():
+    parser = ap.ArgumentParser(description="rebuild the open and closed lists of a delta trace of planpath and print "
+                                           "them in the text format of the trace")
+    parser.add_argument("trace", help="the delta trace file written with --trace-format delta", type=str)
+    parser.add_argument("steps", help="the node expansions to print counting from 1, all of them if none are given",
+                        nargs='*', type=int)
+    arguments = parser.parse_args()
+
+    for step in arguments.steps:
+        if step < 1:
+            parser.error("the steps should be at least 1")
+
+    with open(arguments.trace) as file_handle:
+        try:
+            for step, trace in replay(file_handle, arguments.steps or None):
+                # the printed records end with an empty line
+                print(trace)
+        except (ValueError, KeyError) as error:
+            sys.exit("invalid delta trace: " + str(error))
+
+if __name__ == "__main__":
+    main()